@@ -1,30 +1,30 @@
-import os
 import re
 
-ROOT_DIR = r"d:\Worx\_MyProjz\ms_platform"
+from tools.config import CONFIG
+from tools.csrewrite import CsRule, rewrite_tree
 
-def process_file(file_path):
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
+ROOT_DIR = CONFIG['root']
 
+# Cross-cutting edits applied to every service solution. Each rule is a precompiled
+# regex plus the files (relative to ROOT_DIR) it is allowed to touch.
+RULES = [
     # Regex to match:
     # if (app.Environment.IsDevelopment())
     # {
     #     app.UseSwagger();
     # }
-    
     # We want to replace it with just app.UseSwagger();
-    
-    pattern = re.compile(r"if\s*\(\s*app\.Environment\.IsDevelopment\(\)\s*\)\s*\{\s*app\.UseSwagger\(\);\s*\}", re.MULTILINE | re.DOTALL)
-    
-    new_content = pattern.sub("app.UseSwagger();", content)
-    
-    if new_content != content:
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(new_content)
-        print(f"Updated {file_path}")
+    CsRule(
+        "swagger-in-all-environments",
+        re.compile(r"if\s*\(\s*app\.Environment\.IsDevelopment\(\)\s*\)\s*\{\s*app\.UseSwagger\(\);\s*\}", re.MULTILINE | re.DOTALL),
+        "app.UseSwagger();",
+        paths="*.API/Program.cs",
+    ),
+]
 
-for root, dirs, files in os.walk(ROOT_DIR):
-    for name in files:
-        if name == "Program.cs" and ".API" in root:
-            process_file(os.path.join(root, name))
+if __name__ == "__main__":
+    changed, skipped = rewrite_tree(ROOT_DIR, RULES)
+    for path, applied in sorted(changed.items()):
+        print(f"Updated {path} ({', '.join(applied)})")
+    for path, reason in sorted(skipped.items()):
+        print(f"Skipped {path} ({reason})")
@@ -1,74 +1,69 @@
-import json
-import re
+import argparse
 
-# 1. Update Postman Collection
-collection_path = r"d:\Worx\_MyProjz\ms_platform\docs\postman\Gateway_Collection.postman_collection.json"
+from tools.engine import COLLECTION_PATH, README_PATH, RuleSet, run
+from tools.index import route_matches
+from tools.profile import add_profile_arguments, profile_from_args, report
+from tools.readme import run_readme
+
+ANALYTICS_STATS_ROUTE = 'auth/api/Analytics/app-user-stats'
 
-with open(collection_path, 'r', encoding='utf-8') as f:
-    data = json.load(f)
+rules = RuleSet("patch_analytics_auth")
 
-def update_postman_auth(item):
-    if 'item' in item:
-        for sub_item in item['item']:
-            update_postman_auth(sub_item)
-    elif 'request' in item:
-        req = item['request']
-        url = req.get('url', {})
-        if isinstance(url, dict):
-            raw_url = url.get('raw', '')
-            if '/auth/api/Analytics/app-user-stats' in raw_url:
-                # Update Description
-                desc = req.get('description', '')
-                req['description'] = desc.replace(
-                    "Publicly accessible endpoint (No authentication required).",
-                    "Requires 'DashboardRead' policy."
-                )
-                
-                # Add Auth Block if missing
-                if 'auth' not in req:
-                    req['auth'] = {
-                        "type": "bearer",
-                        "bearer": [
-                            {
-                                "key": "token",
-                                "value": "{{jwt_token}}",
-                                "type": "string"
-                            }
-                        ]
-                    }
+PUBLIC_ENDPOINT = "Publicly accessible endpoint (No authentication required)."
+DASHBOARD_POLICY = "Requires 'DashboardRead' policy."
 
-        # Also update response originalRequest
-        if 'response' in item and isinstance(item['response'], list):
-            for resp in item['response']:
-                orig_req = resp.get('originalRequest', {})
-                orig_url = orig_req.get('url', {})
-                if isinstance(orig_url, dict):
-                    orig_raw = orig_url.get('raw', '')
-                    if '/auth/api/Analytics/app-user-stats' in orig_raw:
-                        desc = orig_req.get('description', '')
-                        orig_req['description'] = desc.replace(
-                            "Publicly accessible endpoint (No authentication required).",
-                            "Requires 'DashboardRead' policy."
-                        )
+def require_dashboard_policy(request):
+    desc = request.get('description', '')
+    request['description'] = desc.replace(PUBLIC_ENDPOINT, DASHBOARD_POLICY)
+
+# 1. Update Postman Collection
+@rules.rule(route=ANALYTICS_STATS_ROUTE)
+def update_postman_auth(item, ctx):
+    req = item['request']
+    # Update Description
+    require_dashboard_policy(req)
 
-update_postman_auth(data)
+    # Add Auth Block if missing
+    if 'auth' not in req:
+        req['auth'] = {
+            "type": "bearer",
+            "bearer": [
+                {
+                    "key": "token",
+                    "value": "{{jwt_token}}",
+                    "type": "string"
+                }
+            ]
+        }
 
-with open(collection_path, 'w', encoding='utf-8') as f:
-    json.dump(data, f, indent=2)
+# Also update response originalRequest
+@rules.rule(route=ANALYTICS_STATS_ROUTE, examples=True)
+def update_example_auth(item, ctx):
+    for resp in item['response']:
+        orig_req = resp.get('originalRequest', {})
+        if route_matches(orig_req, ANALYTICS_STATS_ROUTE):
+            require_dashboard_policy(orig_req)
 
-print("Postman collection updated with Analytics auth.")
+@rules.section(route=ANALYTICS_STATS_ROUTE, method='GET')
+def update_readme_auth(section):
+    if section.field('Authorization Context') == PUBLIC_ENDPOINT:
+        section.set_field('Authorization Context', DASHBOARD_POLICY)
 
-# 2. Update README.md
-readme_path = r"d:\Worx\_MyProjz\ms_platform\Gateway\README.md"
-with open(readme_path, 'r', encoding='utf-8') as f:
-    readme_content = f.read()
+def patch_readme(readme_path, dry_run=None, profile=None):
+    return run_readme(readme_path, rules, dry_run=dry_run, profile=profile)
 
-# Use regex to find the specific section for app-user-stats and replace its authorization context
-pattern = r"(\*\*Get App User Stats\*\*\s*This endpoint executes the `GetAppUserStats` operation\.\s*\*\*Authorization Context:\*\*\s*)Publicly accessible endpoint \(No authentication required\)\."
-replacement = r"\1Requires 'DashboardRead' policy."
-readme_content = re.sub(pattern, replacement, readme_content)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Require the DashboardRead policy for the analytics stats endpoint.")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profile = profile_from_args(args)
 
-with open(readme_path, 'w', encoding='utf-8') as f:
-    f.write(readme_content)
+    ctx = run(COLLECTION_PATH, rules, profile=profile)
+    print("Postman collection updated with Analytics auth." if ctx.written else "Postman collection already up to date.")
 
-print("README.md updated with Analytics auth.")
+    # 2. Update README.md
+    if patch_readme(README_PATH, profile=profile):
+        print("README.md updated with Analytics auth.")
+    else:
+        print("README.md already up to date.")
+    report(profile, args)
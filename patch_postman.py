@@ -1,10 +1,9 @@
-import json
-import os
+import argparse
 
-collection_path = r"d:\Worx\_MyProjz\ms_platform\docs\postman\Gateway_Collection.postman_collection.json"
+from tools.engine import COLLECTION_PATH, RuleSet, run
+from tools.profile import add_profile_arguments, profile_from_args, report
 
-with open(collection_path, 'r', encoding='utf-8') as f:
-    data = json.load(f)
+rules = RuleSet("patch_postman")
 
 def ensure_header(request, key, value):
     headers = request.get('header', [])
@@ -49,92 +48,54 @@ def remove_path_variable(request, var_name):
     raw = raw.replace(f"/:{var_name}", "")
     url['raw'] = raw
 
-def process_item(item):
-    if 'item' in item:
-        for sub_item in item['item']:
-            process_item(sub_item)
-    elif 'request' in item:
-        req = item['request']
-        url = req.get('url', {})
-        if isinstance(url, dict):
-            raw_url = url.get('raw', '')
-            
-            # Auth endpoints
-            if '/auth/api/' in raw_url:
-                header_added = False
-                
-                # Check for query appId
-                query = url.get('query', [])
-                if any(q.get('key') == 'appId' for q in query):
-                    remove_query_param(req, 'appId')
-                    ensure_header(req, 'App-Id', '{{appId}}')
-                    header_added = True
-                
-                # Check for path :appId
-                variables = url.get('variable', [])
-                if any(v.get('key') == 'appId' for v in variables) or '/:appId' in raw_url:
-                    remove_path_variable(req, 'appId')
-                    ensure_header(req, 'App-Id', '{{appId}}')
-                    header_added = True
-                    
-                # Other endpoints that use AppId in header but maybe didn't strictly have query
-                # Add to all Auth requests if User said "whenever we need the appid in the request to be passed.. use the app-id from the header"
-                # For safety, only add to the specific ones modified or if body had it.
-                body = req.get('body', {}).get('raw', '')
-                if body and '"appId"' in body:
-                    # They still might use body. We didn't change body properties except AddUserToAppRequest 
-                    pass
-        
-        # We also need to add App-Id headers for AddUserToAppRequest which had it in body.
-        # But maybe the python logic is simpler just to ensure it's in the headers for Auth?
-        if 'request' in item and isinstance(item['request'].get('url'), dict):
-             raw_url = item['request']['url'].get('raw', '')
-             if '/auth/api/Auth/users/' in raw_url and '/apps' in raw_url and item['request'].get('method') == 'POST':
-                 ensure_header(item['request'], 'App-Id', '{{appId}}')
-
-process_item(data)
+# Auth endpoints: move appId from the query string / path into the App-Id header
+@rules.rule(route='auth/api')
+def move_auth_appid_to_header(item, ctx):
+    req = item['request']
+    url = req.get('url', {})
+    if not isinstance(url, dict): return
 
-# Pass 2: Iterate stringified bodies and strip any raw JSON 'AppId'/'appId' properties natively
-def strip_appid_from_body(item):
-    if 'item' in item:
-        for sub_item in item['item']:
-            strip_appid_from_body(sub_item)
-            
-    # Clean standard request body
-    if 'request' in item:
-        body = item['request'].get('body', {})
-        clean_raw_body(body)
+    # Check for query appId
+    query = url.get('query', [])
+    if any(q.get('key') == 'appId' for q in query):
+        remove_query_param(req, 'appId')
+        ensure_header(req, 'App-Id', '{{appId}}')
 
-    # Clean example response -> originalRequest bodies
-    if 'response' in item and isinstance(item['response'], list):
-        for resp in item['response']:
-            orig_req = resp.get('originalRequest', {})
-            orig_body = orig_req.get('body', {})
-            clean_raw_body(orig_body)
+    # Check for path :appId
+    variables = url.get('variable', [])
+    if any(v.get('key') == 'appId' for v in variables) or '/:appId' in url.get('raw', ''):
+        remove_path_variable(req, 'appId')
+        ensure_header(req, 'App-Id', '{{appId}}')
 
-def clean_raw_body(body):
-    if not isinstance(body, dict): return
-    if body.get('mode') == 'raw':
-        raw_str = body.get('raw', '')
-        # Case insensitive check for efficiency before parsing
-        if raw_str and ('"AppId"' in raw_str or '"appId"' in raw_str):
-            try:
-                payload = json.loads(raw_str)
-                changed = False
-                if 'AppId' in payload:
-                    del payload['AppId']
-                    changed = True
-                if 'appId' in payload:
-                    del payload['appId']
-                    changed = True
-                if changed:
-                    body['raw'] = json.dumps(payload, indent=4)
-            except json.JSONDecodeError:
-                pass
+# We also need to add App-Id headers for AddUserToAppRequest which had it in body.
+@rules.rule(route='auth/api/Auth/users/{id}/apps', method='POST')
+def add_user_to_app_header(item, ctx):
+    ensure_header(item['request'], 'App-Id', '{{appId}}')
 
-strip_appid_from_body(data)
+def clean_raw_body(view):
+    payload = view.data
+    if not isinstance(payload, dict): return
+    changed = False
+    if 'AppId' in payload:
+        del payload['AppId']
+        changed = True
+    if 'appId' in payload:
+        del payload['appId']
+        changed = True
+    if changed:
+        view.mark_dirty()
 
-with open(collection_path, 'w', encoding='utf-8') as f:
-    json.dump(data, f, indent=2)
+# Strip any raw JSON 'AppId'/'appId' properties from request and example originalRequest bodies
+@rules.rule()
+def strip_appid_from_body(item, ctx):
+    for view in ctx.request_bodies(item):
+        clean_raw_body(view)
 
-print("Postman collection updated successfully.")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move appId into the App-Id header for Auth endpoints.")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profile = profile_from_args(args)
+    ctx = run(COLLECTION_PATH, rules, profile=profile)
+    print("Postman collection updated." if ctx.written else "Postman collection already up to date.")
+    report(profile, args)
@@ -1,46 +1,31 @@
+import argparse
 import re
 
-readme_path = r"d:\Worx\_MyProjz\ms_platform\Gateway\README.md"
+from tools.engine import README_PATH, RuleSet
+from tools.profile import add_profile_arguments, profile_from_args, report
+from tools.readme import run_readme
 
-with open(readme_path, 'r', encoding='utf-8') as f:
-    lines = f.readlines()
+rules = RuleSet("patch_readme")
 
-new_lines = []
-is_auth_endpoint = False
-in_json_body = False
+APP_ID_LINE = re.compile(r'^.*"(?:AppId|appId)".*\n', re.M)
+# Dangling comma left before a closing brace once the last member was dropped
+DANGLING_COMMA = re.compile(r',(\s*\})')
 
-for line in lines:
-    if line.startswith('#### '):
-        is_auth_endpoint = '/auth/api/' in line
-        new_lines.append(line)
-        continue
-    
-    if line.strip() == '```json':
-        in_json_body = True
-        new_lines.append(line)
-        continue
-    
-    if line.strip() == '```':
-        in_json_body = False
-        new_lines.append(line)
-        continue
-    
-    if is_auth_endpoint and in_json_body:
-        # If line contains "AppId":
-        if '"AppId"' in line or '"appId"' in line:
-            # We skip this line
-            continue
-            
-    # Quick cleanup if the previous line ended with a comma and the next line is a closing brace
-    # and we just skipped the actual last element.
-    # Actually, a simpler way is just to fix up dangling commas before '}' over the whole string later
-    new_lines.append(line)
+def strip_app_id(payload):
+    cleaned = APP_ID_LINE.sub('', payload)
+    if cleaned == payload:
+        return payload
+    return DANGLING_COMMA.sub(r'\1', cleaned)
 
-content = "".join(new_lines)
-# Fix dangling commas
-content = re.sub(r',\s*\}', '\n  }', content)
+# Auth endpoints take the app from the App-Id header, so drop it from the documented payloads
+@rules.section(route='auth/api')
+def strip_app_id_from_payloads(section):
+    section.map_fences(strip_app_id)
 
-with open(readme_path, 'w', encoding='utf-8') as f:
-    f.write(content)
-
-print("README payloads cleaned.")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drop AppId from the Auth payloads documented in the README.")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profile = profile_from_args(args)
+    print("README payloads cleaned." if run_readme(README_PATH, rules, profile=profile) else "README already clean.")
+    report(profile, args)
@@ -1,42 +1,28 @@
-import json
-import re
+import argparse
+import os
 
-postman_path = r"d:\Worx\_MyProjz\ms_platform\docs\postman\Gateway_Collection.postman_collection.json"
-readme_path = r"d:\Worx\_MyProjz\ms_platform\Gateway\README.md"
+from tools.config import CONFIG
+from tools.substitute import Substitution, substitute_file
 
-wissler_app_id = "00000000-0000-0000-0000-000000000012"
-vis1_id = "00000000-0000-0000-0000-000000000001"
-vis2_id = "00000000-0000-0000-0000-000000000002"
+postman_path = CONFIG['collection']
+readme_path = CONFIG['readme']
 
-# 1. Update Postman Collection
-with open(postman_path, 'r', encoding='utf-8') as f:
-    text = f.read()
-
-# Replace any par_app_id3 variables or values
-text = text.replace('{{par_app_id3}}', wissler_app_id)
-text = text.replace('{{user_id}}', vis1_id)
-text = text.replace('userId={{user_id}}', f'userId={vis1_id}')
-text = text.replace('reporterId=demo_value', f'reporterId={vis1_id}')
-text = text.replace('reportedId=demo_value', f'reportedId={vis2_id}')
-text = text.replace('appId=demo_value', f'appId={wissler_app_id}')
-text = text.replace('days=demo_value', 'days=7') 
+# Seed IDs (e.g. the Wissler app ID) and the placeholder -> value table live in the config file
+default_config = os.path.join(os.path.dirname(os.path.abspath(__file__)), "patch_seeds.json")
 
-with open(postman_path, 'w', encoding='utf-8') as f:
-    f.write(text)
+parser = argparse.ArgumentParser(description="Replace placeholder values with seed IDs in the Postman collection and README.")
+parser.add_argument('--config', default=default_config, help="JSON file with 'variables' and 'replacements'")
+args = parser.parse_args()
 
-# 2. Update README.md
-with open(readme_path, 'r', encoding='utf-8') as f:
-    text = f.read()
+substitution = Substitution.from_config(args.config)
 
-text = text.replace('{{par_app_id3}}', wissler_app_id)
-text = text.replace('{{user_id}}', vis1_id)
-text = text.replace('userId={{user_id}}', f'userId={vis1_id}')
-text = text.replace('reporterId=demo_value', f'reporterId={vis1_id}')
-text = text.replace('reportedId=demo_value', f'reportedId={vis2_id}')
-text = text.replace('appId=demo_value', f'appId={wissler_app_id}')
-text = text.replace('days=demo_value', 'days=7') 
+# 1. Update Postman Collection
+collection_count = substitute_file(postman_path, substitution)
 
-with open(readme_path, 'w', encoding='utf-8') as f:
-    f.write(text)
+# 2. Update README.md
+readme_count = substitute_file(readme_path, substitution)
 
-print("Values successfully replaced in Postman and README.")
+if collection_count or readme_count:
+    print(f"Values replaced in Postman ({collection_count}) and README ({readme_count}).")
+else:
+    print("No placeholder values left to replace.")
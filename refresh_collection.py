@@ -0,0 +1,54 @@
+# Full refresh: run every collection patch script's rules in one parse/traverse/write pass.
+import argparse
+
+import inject_real_data
+import patch_analytics_auth
+import patch_postman
+import patch_readme
+import tmp_patch_apps_postman
+
+from tools.engine import COLLECTION_PATH, README_PATH, run
+from tools.profile import add_profile_arguments, profile_from_args, report
+from tools.readme import run_readme
+from tools.stream import run_stream
+from tools.writer import DRY_RUN_MODES
+
+RULE_SETS = [
+    patch_postman.rules,
+    inject_real_data.rules,
+    patch_analytics_auth.rules,
+    tmp_patch_apps_postman.rules,
+    patch_readme.rules,
+]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply all collection patch rules in a single pass.")
+    parser.add_argument('--dry-run', choices=DRY_RUN_MODES,
+                        help="print the collection changes as a JSON Patch or unified diff instead of writing")
+    parser.add_argument('--stream', action='store_true',
+                        help="process the collection item by item with bounded memory (for very large collections)")
+    parser.add_argument('--all-sections', action='store_true',
+                        help="regenerate every README endpoint section, not only those of changed requests")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    if args.stream and args.dry_run:
+        parser.error("--stream writes as it goes and cannot be combined with --dry-run")
+
+    profile = profile_from_args(args)
+    if args.stream:
+        ctx = run_stream(COLLECTION_PATH, *RULE_SETS, profile=profile)
+    else:
+        ctx = run(COLLECTION_PATH, *RULE_SETS, dry_run=args.dry_run, profile=profile)
+    for name, count in ctx.matched.items():
+        print(f"{name}: {count} item(s)")
+
+    changed = None if args.all_sections else ctx.changed
+    if args.dry_run:
+        print(ctx.output)
+        # README edits are plain text, so they are always previewed as a unified diff
+        print(run_readme(README_PATH, *RULE_SETS, changed=changed, dry_run='diff', profile=profile))
+    else:
+        print("Postman collection refreshed." if ctx.written else "Postman collection already up to date.")
+        readme_written = run_readme(README_PATH, *RULE_SETS, changed=changed, profile=profile)
+        print("README refreshed." if readme_written else "README already up to date.")
+    report(profile, args)
@@ -1,74 +1,67 @@
-import json
-import os
+import argparse
+import copy
 
-collection_path = r"d:\Worx\_MyProjz\ms_platform\docs\postman\Gateway_Collection.postman_collection.json"
+from tools.engine import COLLECTION_PATH, RuleSet, run
+from tools.profile import add_profile_arguments, profile_from_args, report
 
-with open(collection_path, 'r', encoding='utf-8') as f:
-    data = json.load(f)
+rules = RuleSet("tmp_patch_apps_postman")
 
-def process_item(item):
-    if 'item' in item:
-        for sub_item in item['item']:
-            process_item(sub_item)
-    elif 'request' in item:
-        url = item['request'].get('url', {})
-        if isinstance(url, dict):
-            raw_url = url.get('raw', '')
-            
-            # Update responses for Apps endpoints
-            if '/apps/api/Apps' in raw_url:
-                if 'response' in item and isinstance(item['response'], list):
-                    for resp in item['response']:
-                        if 'body' in resp:
-                            try:
-                                body_json = json.loads(resp['body'])
-                                if isinstance(body_json, list) and len(body_json) > 0 and 'Name' in body_json[0] and 'BaseUrl' in body_json[0]:
-                                    for app in body_json:
-                                        app['DefaultCountry'] = 'US'
-                                    resp['body'] = json.dumps(body_json, indent=4)
-                                elif isinstance(body_json, dict) and 'Name' in body_json and 'BaseUrl' in body_json:
-                                    body_json['DefaultCountry'] = 'US'
-                                    resp['body'] = json.dumps(body_json, indent=4)
-                            except:
-                                pass
+# The new structured Get Packages response (replaces the old array response or "Success" object)
+PACKAGES_RESPONSE = {
+    "subscriptions": [
+        {
+            "id": "2eed470d-7934-4edc-9bf5-0a1093b88fd2",
+            "name": "Weekly",
+            "description": "Premium Access",
+            "price": 5.0,
+            "period": 1,
+            "currency": "USD",
+            "packageType": 0,
+            "coinsAmount": 0
+        }
+    ],
+    "coins": [
+        {
+            "id": "3eed470d-7934-4edc-9bf5-0a1093b88fd3",
+            "name": "50 Coins",
+            "description": "50 Virtual Coins",
+            "price": 5.0,
+            "period": 0,
+            "currency": "USD",
+            "packageType": 1,
+            "coinsAmount": 50
+        }
+    ]
+}
 
-            # Update Get Packages response
-            if '/packages' in raw_url:
-                if 'response' in item and isinstance(item['response'], list):
-                    for resp in item['response']:
-                        if 'body' in resp:
-                            # Replace the old array response or "Success" object with the new structured response
-                            new_body = {
-                                "subscriptions": [
-                                    {
-                                        "id": "2eed470d-7934-4edc-9bf5-0a1093b88fd2",
-                                        "name": "Weekly",
-                                        "description": "Premium Access",
-                                        "price": 5.0,
-                                        "period": 1,
-                                        "currency": "USD",
-                                        "packageType": 0,
-                                        "coinsAmount": 0
-                                    }
-                                ],
-                                "coins": [
-                                    {
-                                        "id": "3eed470d-7934-4edc-9bf5-0a1093b88fd3",
-                                        "name": "50 Coins",
-                                        "description": "50 Virtual Coins",
-                                        "price": 5.0,
-                                        "period": 0,
-                                        "currency": "USD",
-                                        "packageType": 1,
-                                        "coinsAmount": 50
-                                    }
-                                ]
-                            }
-                            resp['body'] = json.dumps(new_body, indent=4)
+# Update responses for Apps endpoints
+@rules.rule(route='apps/api/Apps')
+def add_default_country(item, ctx):
+    for view in ctx.response_bodies(item):
+        body_json = view.data
+        if isinstance(body_json, list) and len(body_json) > 0 and isinstance(body_json[0], dict) and 'Name' in body_json[0] and 'BaseUrl' in body_json[0]:
+            apps = body_json
+        elif isinstance(body_json, dict) and 'Name' in body_json and 'BaseUrl' in body_json:
+            apps = [body_json]
+        else:
+            continue
+        for app in apps:
+            if isinstance(app, dict) and app.get('DefaultCountry') != 'US':
+                app['DefaultCountry'] = 'US'
+                view.mark_dirty()
 
-process_item(data)
+# Update Get Packages response
+@rules.rule(route='**/packages')
+def structured_packages_response(item, ctx):
+    for view in ctx.response_bodies(item):
+        if view.data != PACKAGES_RESPONSE:
+            view.set(copy.deepcopy(PACKAGES_RESPONSE))
 
-with open(collection_path, 'w', encoding='utf-8') as f:
-    json.dump(data, f, indent=2)
-
-print("Postman collection updated successfully.")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Add DefaultCountry and structured package responses to the Apps examples.")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profile = profile_from_args(args)
+    ctx = run(COLLECTION_PATH, rules, profile=profile)
+    print("Postman collection updated." if ctx.written else "Postman collection already up to date.")
+    report(profile, args)
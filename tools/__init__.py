@@ -0,0 +1 @@
+"""Shared helpers for the repo maintenance scripts (Postman collection, README, logs)."""
@@ -0,0 +1,93 @@
+"""Parsed-body cache for the raw JSON strings embedded in the collection.
+
+Request bodies (``body.raw``) and example responses (``response[].body``) are
+JSON documents stored as strings. A BodyView parses its string at most once,
+hands the same object to every rule, and is re-serialised on flush only if a
+rule marked it dirty, so untouched bodies keep their exact original text.
+"""
+import json
+
+_UNPARSED = object()
+_INVALID = object()
+
+
+class BodyView:
+    __slots__ = ('owner', 'key', 'dirty', '_data', '_cache')
+
+    def __init__(self, owner, key, cache):
+        self.owner = owner
+        self.key = key
+        self.dirty = False
+        self._data = _UNPARSED
+        self._cache = cache
+
+    @property
+    def text(self):
+        return self.owner.get(self.key, '')
+
+    def _parse(self):
+        self._data = _INVALID
+        text = self.text
+        if text and isinstance(text, str):
+            try:
+                self._data = json.loads(text)
+                self._cache.parsed += 1
+            except json.JSONDecodeError:
+                pass
+
+    @property
+    def valid(self):
+        if self._data is _UNPARSED:
+            self._parse()
+        return self._data is not _INVALID
+
+    @property
+    def data(self):
+        """Parsed JSON, or None if the body is empty or not valid JSON."""
+        return self._data if self.valid else None
+
+    def set(self, value):
+        self._data = value
+        self._dirty()
+
+    def mark_dirty(self):
+        # Call after mutating .data in place
+        if self.valid:
+            self._dirty()
+
+    def _dirty(self):
+        if not self.dirty:
+            self.dirty = True
+            self._cache.dirtied += 1
+
+    def flush(self):
+        if not self.dirty:
+            return False
+        self.owner[self.key] = json.dumps(self._data, indent=4)
+        self.dirty = False
+        self._cache.serialized += 1
+        return True
+
+
+class BodyCache:
+    def __init__(self):
+        self.views = {}
+        self.parsed = 0
+        self.dirtied = 0
+        self.serialized = 0
+
+    def view(self, owner, key):
+        view = self.views.get((id(owner), key))
+        if view is None:
+            view = self.views[(id(owner), key)] = BodyView(owner, key, self)
+        return view
+
+    def flush(self):
+        """Write dirty bodies back into their owning dicts. Returns how many were re-serialised."""
+        return sum(1 for view in self.views.values() if view.flush())
+
+    def release(self):
+        """Flush, then forget every view so the bodies they reference can be freed."""
+        flushed = self.flush()
+        self.views.clear()
+        return flushed
@@ -0,0 +1,443 @@
+"""MSBuild / dotnet build log parser, diagnostics index and build history.
+
+The captured build outputs (``build_errors.txt``, ``errors.txt``,
+``errors2.txt``...) are UTF-16 or UTF-8 console logs. Every
+``path(line,col): error CSxxxx: message [project.csproj]`` line appears twice:
+once while the project builds, and again in the summary after ``Build FAILED.``.
+``parse_log`` streams a log once (through ``tools.logs.iter_lines``) and
+collects:
+
+- diagnostics, deduplicated on (code, file, line, column, project), with the
+  ``1:7>`` node prefixes of parallel builds stripped. Paths are made relative
+  to the repository, and diagnostics with no ``[project]`` suffix are
+  attributed through the project graph in ``tools.buildplan``,
+- per-project times where the log has them: the Project Performance Summary
+  (``-clp:PerformanceSummary`` or detailed verbosity), terminal logger
+  ``Project succeeded (1.2s)`` lines and ``Restored X.csproj (in N ms)``,
+- projects that produced output, the result and ``Time Elapsed``.
+
+``DiagnosticIndex`` answers queries by project, file and code (globs allowed).
+``record`` appends builds to a compact history (``.buildlog-history.json``)
+and reports what is new and what was fixed since the previous build. A
+diagnostic's identity is its project, file, code and message, not its line,
+so edits that only shift lines do not show up as churn.
+
+    python -m tools.buildlog show build_errors.txt errors.txt --group-by code
+    python -m tools.buildlog show --code 'CS86*' --project Auth.Application
+    python -m tools.buildlog record build_errors.txt
+    python -m tools.buildlog diff errors.txt errors2.txt
+    python -m tools.buildlog history
+"""
+import argparse
+import datetime
+import fnmatch
+import json
+import os
+import re
+from collections import Counter
+
+from tools.config import CONFIG
+from tools.logs import iter_lines
+from tools.writer import atomic_write
+
+HISTORY_FILE = '.buildlog-history.json'
+HISTORY_VERSION = 1
+KEEP_BUILDS = 100
+
+DIAGNOSTIC = re.compile(
+    r'^\s*(?:\d+(?::\d+)?>)?(?P<origin>.*?)'
+    r'(?:\((?P<line>\d+)(?:,(?P<col>\d+))?(?:,\d+,\d+)?\))?\s?:\s+'
+    r'(?:(?P<subcategory>[^:\[]*?)\s+)?(?P<severity>error|warning)\s+(?P<code>[A-Za-z]+\d+)\s*:\s?'
+    r'(?P<message>.*?)(?:\s+\[(?P<project>[^\[\]]+?\.\w+proj)(?:::[^\]]*)?\])?\s*$')
+PERF_HEADER = re.compile(r'^\s*Project Performance Summary:\s*$')
+PERF_LINE = re.compile(r'^\s*(?P<ms>\d+) ms\s+(?P<project>\S.*?\.\w+proj)\s+(?P<calls>\d+) calls?\s*$')
+TERMINAL = re.compile(r'^\s*(?P<project>[\w.]+)(?:\s+net[\w.-]+)?\s+(?P<result>succeeded|failed)\b.*?'
+                      r'\((?P<seconds>\d+(?:\.\d+)?)s\)(?:\s+\u2192\s+(?P<output>\S.*))?')
+RESTORED = re.compile(r'^\s*Restored (?P<project>.+?\.\w+proj) \(in (?P<ms>\d+) ms\)')
+OUTPUT = re.compile(r'^\s*(?P<project>[\w.]+) -> (?P<output>\S.*)$')
+ELAPSED = re.compile(r'^\s*Time Elapsed (\d+):(\d+):(\d+(?:\.\d+)?)')
+RESULT = re.compile(r'^\s*Build (succeeded|FAILED)\.')
+
+
+def project_name(path):
+    """'D:\\...\\Auth.Application\\Auth.Application.csproj' -> 'Auth.Application'."""
+    return os.path.splitext(re.split(r'[\\/]', path)[-1])[0]
+
+
+class _Paths:
+    """Maps absolute paths from another machine onto repository-relative ones."""
+
+    def __init__(self, root):
+        self.root = root
+        self.top = {name.lower(): name for name in os.listdir(root)} if os.path.isdir(root) else {}
+        self._graph = None
+
+    def relative(self, path):
+        parts = [p for p in re.split(r'[\\/]', path) if p]
+        for i, part in enumerate(parts):
+            if part.lower() in self.top and i + 1 < len(parts):
+                return '/'.join([self.top[part.lower()]] + parts[i + 1:])
+        return '/'.join(parts)
+
+    def owner(self, rel):
+        if self._graph is None:
+            from tools.buildplan import BuildGraph, scan
+            self._graph = BuildGraph.from_entries(scan(self.root))
+        project = self._graph.owner(rel)
+        return project_name(project) if project else None
+
+
+class Diagnostic:
+    __slots__ = ('severity', 'code', 'file', 'line', 'col', 'project', 'message')
+
+    def __init__(self, severity, code, file, line, col, project, message):
+        self.severity = severity
+        self.code = code
+        self.file = file
+        self.line = line
+        self.col = col
+        self.project = project
+        self.message = message
+
+    @property
+    def key(self):
+        return self.code, self.file, self.line, self.col, self.project
+
+    @property
+    def identity(self):
+        """What makes two diagnostics 'the same' across builds: no line numbers."""
+        return self.severity, self.code, self.project or '', self.file, self.message
+
+    def location(self):
+        if self.line is None:
+            return self.file
+        return f"{self.file}({self.line},{self.col})" if self.col is not None else f"{self.file}({self.line})"
+
+    def to_dict(self):
+        return {'severity': self.severity, 'code': self.code, 'file': self.file, 'line': self.line, 'col': self.col,
+                'project': self.project, 'message': self.message}
+
+
+class Build:
+    def __init__(self, source):
+        self.source = source
+        self.diagnostics = {}
+        self.duplicates = 0
+        self.lines = 0
+        self.result = None
+        self.elapsed_s = None
+        self.project_ms = {}
+        self.restore_ms = {}
+        self.outputs = {}
+
+    def counts(self):
+        c = Counter(d.severity for d in self.diagnostics.values())
+        return {'errors': c['error'], 'warnings': c['warning']}
+
+    def summary(self):
+        return {'source': self.source, 'result': self.result, 'elapsed_s': self.elapsed_s, **self.counts(),
+                'duplicates_dropped': self.duplicates, 'lines': self.lines,
+                'project_ms': dict(sorted(self.project_ms.items(), key=lambda kv: -kv[1])),
+                'restore_ms': self.restore_ms, 'built': sorted(self.outputs)}
+
+
+def parse_log(path, paths=None):
+    """Stream one build log into a Build."""
+    paths = paths or _Paths(CONFIG['root'])
+    build = Build(path)
+    in_perf = False
+    for line in iter_lines(path):
+        build.lines += 1
+        if in_perf:
+            m = PERF_LINE.match(line)
+            if m:
+                name = project_name(m.group('project'))
+                build.project_ms[name] = int(m.group('ms'))
+                continue
+            if line.strip():
+                in_perf = False
+            else:
+                continue
+        if ' error ' in line or ' warning ' in line:
+            m = DIAGNOSTIC.match(line)
+            if m:
+                file = paths.relative(m.group('origin').strip()) if m.group('origin').strip() else ''
+                project = project_name(m.group('project')) if m.group('project') else None
+                if project is None and m.group('line'):
+                    project = paths.owner(file)
+                diagnostic = Diagnostic(m.group('severity'), m.group('code'), file,
+                                        int(m.group('line')) if m.group('line') else None,
+                                        int(m.group('col')) if m.group('col') else None,
+                                        project, m.group('message').strip())
+                if diagnostic.key in build.diagnostics:
+                    build.duplicates += 1
+                else:
+                    build.diagnostics[diagnostic.key] = diagnostic
+                continue
+        if PERF_HEADER.match(line):
+            in_perf = True
+            continue
+        m = TERMINAL.match(line)
+        if m:
+            # The performance summary, when present, is more precise; it comes later and overwrites this
+            build.project_ms[m.group('project')] = round(float(m.group('seconds')) * 1000)
+            if m.group('output'):
+                build.outputs[m.group('project')] = paths.relative(m.group('output'))
+            continue
+        m = RESTORED.match(line)
+        if m:
+            build.restore_ms[project_name(m.group('project'))] = int(m.group('ms'))
+            continue
+        m = OUTPUT.match(line)
+        if m:
+            build.outputs[m.group('project')] = paths.relative(m.group('output'))
+            continue
+        m = ELAPSED.match(line)
+        if m:
+            h, mi, s = m.groups()
+            build.elapsed_s = round(int(h) * 3600 + int(mi) * 60 + float(s), 3)
+            continue
+        m = RESULT.match(line)
+        if m:
+            build.result = 'succeeded' if m.group(1) == 'succeeded' else 'failed'
+    return build
+
+
+def merge(builds):
+    """One Build from several logs of the same build (e.g. a full log and a filtered copy)."""
+    merged = Build(', '.join(b.source for b in builds))
+    for b in builds:
+        for key, d in b.diagnostics.items():
+            if key in merged.diagnostics:
+                merged.duplicates += 1
+            else:
+                merged.diagnostics[key] = d
+        merged.duplicates += b.duplicates
+        merged.lines += b.lines
+        merged.project_ms.update(b.project_ms)
+        merged.restore_ms.update(b.restore_ms)
+        merged.outputs.update(b.outputs)
+        merged.result = merged.result or b.result
+        merged.elapsed_s = merged.elapsed_s if merged.elapsed_s is not None else b.elapsed_s
+    return merged
+
+
+class DiagnosticIndex:
+    def __init__(self, diagnostics):
+        self.diagnostics = sorted(diagnostics, key=lambda d: (d.project or '', d.file, d.line or 0, d.col or 0, d.code))
+        self.by_project, self.by_file, self.by_code = {}, {}, {}
+        for i, d in enumerate(self.diagnostics):
+            self.by_project.setdefault(d.project or '', []).append(i)
+            self.by_file.setdefault(d.file, []).append(i)
+            self.by_code.setdefault(d.code, []).append(i)
+
+    @staticmethod
+    def _lookup(index, pattern):
+        if pattern is None:
+            return None
+        if pattern in index:
+            return set(index[pattern])
+        return {i for key, rows in index.items() if fnmatch.fnmatchcase(key, pattern) for i in rows}
+
+    def query(self, project=None, file=None, code=None, severity=None):
+        selected = None
+        for index, pattern in ((self.by_code, code), (self.by_project, project), (self.by_file, file)):
+            rows = self._lookup(index, pattern)
+            if rows is not None:
+                selected = rows if selected is None else selected & rows
+        rows = range(len(self.diagnostics)) if selected is None else sorted(selected)
+        return [self.diagnostics[i] for i in rows if severity is None or self.diagnostics[i].severity == severity]
+
+    @staticmethod
+    def group(diagnostics, by):
+        counts = Counter()
+        for d in diagnostics:
+            counts[(d.project or '?') if by == 'project' else d.file if by == 'file' else f"{d.code} {d.severity}"] += 1
+        return counts
+
+
+def compare(old, new):
+    """(new, fixed) diagnostics between two lists, matched on identity (a multiset, so repeats count)."""
+    old_ids = Counter(d.identity for d in old)
+    new_ids = Counter(d.identity for d in new)
+    added, fixed = new_ids - old_ids, old_ids - new_ids
+    pick = lambda items, wanted: [d for d in items if wanted[d.identity] > 0 and not wanted.subtract([d.identity])]
+    return pick(new, added), pick(old, fixed)
+
+
+# History: builds keep (descriptor id, line, col) triples; descriptors are interned identities
+
+def load_history(path):
+    if not os.path.exists(path):
+        return {'version': HISTORY_VERSION, 'descriptors': [], 'builds': []}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def history_diagnostics(history, build):
+    descriptors = history['descriptors']
+    return [Diagnostic(*descriptors[i][:2], descriptors[i][3], line, col, descriptors[i][2] or None, descriptors[i][4])
+            for i, line, col in build['diagnostics']]
+
+
+def save_history(path, history, keep=KEEP_BUILDS):
+    builds = history['builds'][-keep:]
+    # Re-intern so descriptors only referenced by pruned builds are dropped
+    ids, descriptors = {}, []
+    for build in builds:
+        triples = []
+        for i, line, col in build['diagnostics']:
+            descriptor = tuple(history['descriptors'][i])
+            if descriptor not in ids:
+                ids[descriptor] = len(descriptors)
+                descriptors.append(list(descriptor))
+            triples.append([ids[descriptor], line, col])
+        build['diagnostics'] = triples
+    history.update(descriptors=descriptors, builds=builds)
+    atomic_write(path, json.dumps(history, separators=(',', ':')))
+
+
+def record(history, build, name=None):
+    """Append a parsed build; returns (new, fixed) against the previous recorded build."""
+    previous = history_diagnostics(history, history['builds'][-1]) if history['builds'] else []
+    current = list(build.diagnostics.values())
+    ids = {tuple(d): i for i, d in enumerate(history['descriptors'])}
+    triples = []
+    for d in current:
+        descriptor = d.identity
+        if descriptor not in ids:
+            ids[descriptor] = len(history['descriptors'])
+            history['descriptors'].append(list(descriptor))
+        triples.append([ids[descriptor], d.line, d.col])
+    entry = build.summary()
+    del entry['lines'], entry['duplicates_dropped']
+    entry.update(name=name or os.path.basename(build.source),
+                 recorded=datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+                 diagnostics=triples)
+    history['builds'].append(entry)
+    return compare(previous, current)
+
+
+def format_diagnostic(d, width=140):
+    text = f"{d.severity[0].upper()} {d.code:<8} {d.project or '?':<28} {d.location()}: {d.message}"
+    return text if len(text) <= width else text[:width - 3] + '...'
+
+
+def format_changes(new, fixed):
+    lines = [f"+ {format_diagnostic(d)}" for d in new] + [f"- {format_diagnostic(d)}" for d in fixed]
+    lines.append(f"{len(new)} new, {len(fixed)} fixed")
+    return '\n'.join(lines)
+
+
+def format_build(build, diagnostics, group_by=None):
+    s = build.summary()
+    lines = [f"{s['source']}: {s['result'] or 'unknown result'}, {s['errors']} errors, {s['warnings']} warnings "
+             f"({s['duplicates_dropped']} duplicate lines dropped)"
+             + (f", {s['elapsed_s']}s" if s['elapsed_s'] is not None else '')]
+    if group_by:
+        for name, n in DiagnosticIndex.group(diagnostics, group_by).most_common():
+            lines.append(f"{n:>6}  {name}")
+    else:
+        lines.extend(format_diagnostic(d) for d in diagnostics)
+    if s['project_ms']:
+        lines.append('')
+        lines.append('Project times:')
+        lines.extend(f"{ms:>8} ms  {name}" for name, ms in s['project_ms'].items())
+    if s['restore_ms']:
+        lines.append('Restore: ' + ', '.join(f"{name} {ms} ms" for name, ms in s['restore_ms'].items()))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Index, query and track diagnostics from MSBuild logs.")
+    parser.add_argument('--history', default=os.path.join(CONFIG['root'], HISTORY_FILE))
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    show = commands.add_parser('show', help="deduplicated diagnostics of logs (default: the last recorded build)")
+    show.add_argument('logs', nargs='*')
+    show.add_argument('--project', help="project name or glob")
+    show.add_argument('--file', help="repository-relative file path or glob")
+    show.add_argument('--code', help="diagnostic code or glob, e.g. 'CS86*'")
+    show.add_argument('--severity', choices=('error', 'warning'))
+    show.add_argument('--group-by', choices=('project', 'file', 'code'), help="print counts instead of diagnostics")
+
+    rec = commands.add_parser('record', help="add a build to the history and report new/fixed diagnostics")
+    rec.add_argument('logs', nargs='+', help="logs of one build (merged)")
+    rec.add_argument('--name')
+    rec.add_argument('--keep', type=int, default=KEEP_BUILDS, help="builds kept in the history")
+
+    dif = commands.add_parser('diff', help="new and fixed diagnostics between two logs")
+    dif.add_argument('old')
+    dif.add_argument('new')
+
+    commands.add_parser('history', help="list recorded builds")
+    args = parser.parse_args(argv)
+
+    paths = _Paths(CONFIG['root'])
+    if args.command == 'show':
+        if args.logs:
+            build = merge([parse_log(p, paths) for p in args.logs])
+            diagnostics = build.diagnostics.values()
+        else:
+            history = load_history(args.history)
+            if not history['builds']:
+                parser.error("no logs given and no recorded builds")
+            entry = history['builds'][-1]
+            build = Build(entry['name'])
+            build.result, build.elapsed_s = entry['result'], entry['elapsed_s']
+            build.project_ms, build.restore_ms = entry['project_ms'], entry['restore_ms']
+            diagnostics = history_diagnostics(history, entry)
+            build.diagnostics = {d.key: d for d in diagnostics}
+        selected = DiagnosticIndex(diagnostics).query(args.project, args.file, args.code, args.severity)
+        if args.json:
+            result = build.summary()
+            if args.group_by:
+                result['groups'] = dict(DiagnosticIndex.group(selected, args.group_by).most_common())
+            else:
+                result['diagnostics'] = [d.to_dict() for d in selected]
+            print(json.dumps(result, indent=2))
+        else:
+            print(format_build(build, selected, args.group_by))
+    elif args.command == 'record':
+        history = load_history(args.history)
+        build = merge([parse_log(p, paths) for p in args.logs])
+        new, fixed = record(history, build, args.name)
+        save_history(args.history, history, args.keep)
+        if args.json:
+            print(json.dumps({'build': build.summary(), 'new': [d.to_dict() for d in new],
+                              'fixed': [d.to_dict() for d in fixed]}, indent=2))
+        else:
+            counts = build.counts()
+            print(f"recorded build {len(history['builds'])}: {counts['errors']} errors, {counts['warnings']} warnings")
+            print(format_changes(new, fixed))
+    elif args.command == 'diff':
+        old, new = parse_log(args.old, paths), parse_log(args.new, paths)
+        added, fixed = compare(list(old.diagnostics.values()), list(new.diagnostics.values()))
+        if args.json:
+            print(json.dumps({'new': [d.to_dict() for d in added], 'fixed': [d.to_dict() for d in fixed]}, indent=2))
+        else:
+            print(format_changes(added, fixed))
+    else:
+        history = load_history(args.history)
+        rows = []
+        previous = []
+        for number, entry in enumerate(history['builds'], 1):
+            current = history_diagnostics(history, entry)
+            added, fixed = compare(previous, current)
+            previous = current
+            errors = sum(1 for d in current if d.severity == 'error')
+            rows.append({'build': number, 'name': entry['name'], 'recorded': entry['recorded'], 'result': entry['result'],
+                         'elapsed_s': entry['elapsed_s'], 'errors': errors, 'warnings': len(current) - errors,
+                         'new': len(added), 'fixed': len(fixed)})
+        if args.json:
+            print(json.dumps(rows, indent=2))
+        else:
+            for r in rows:
+                print(f"{r['build']:>4}  {r['recorded']}  {r['name']:<28} {r['result'] or '?':<9} "
+                      f"{r['errors']:>4} errors {r['warnings']:>4} warnings  +{r['new']} -{r['fixed']}"
+                      + (f"  {r['elapsed_s']}s" if r['elapsed_s'] is not None else ''))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,319 @@
+"""Affected-project build planner for the .NET solutions.
+
+Every ``.csproj`` under the repo root is parsed into a node of a dependency
+DAG (``ProjectReference`` edges, package references kept for reporting),
+``.sln`` files map projects to solutions, and each Dockerfile is tied to the
+project it publishes and to its docker-compose service. Given changed files
+(``git diff --name-only`` or an explicit list) the planner finds the projects
+that own them, everything that transitively references those projects, the
+solutions and images that contain them, and the order to build them in:
+waves of projects whose dependencies are all in earlier waves, so each wave
+can build in parallel.
+
+A file belongs to the project whose directory is its nearest ancestor (the
+SDK compiles everything under the project directory). ``Directory.Build.*``,
+``Directory.Packages.props``, ``global.json`` and ``NuGet.config`` affect
+every project below them. Files outside any project and image (docs, the
+Python tooling, logs) affect nothing.
+
+Parsed files are cached in ``.buildplan-cache.json`` keyed on path, size,
+mtime and SHA-256, so planning after the first run reads no project files
+unless they changed.
+
+    python -m tools.buildplan --base origin/main
+    python -m tools.buildplan --files Payments/Payments.Infrastructure/Persistence/PaymentsDbContext.cs --json
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+
+from tools.compose import dockerfile as compose_dockerfile, parse_compose_text
+from tools.config import CONFIG
+from tools.csrewrite import SKIP_DIRS
+from tools.writer import atomic_write
+
+CACHE_FILE = '.buildplan-cache.json'
+CACHE_VERSION = 2
+GLOBAL_FILES = {'directory.build.props', 'directory.build.targets', 'directory.packages.props',
+                'global.json', 'nuget.config'}
+
+_SLN_PROJECT = re.compile(r'^Project\("\{[^}]+\}"\)\s*=\s*"([^"]+)",\s*"([^"]+\.csproj)"', re.M)
+_DOCKER_PROJECT = re.compile(r'dotnet\s+(?:publish|build)\s+"?([^"\s]+\.csproj)"?', re.I)
+_DOCKER_WORKDIR = re.compile(r'^WORKDIR\s+"?([^"\s]+)"?', re.M | re.I)
+_DOCKER_COPY = re.compile(r'^COPY\s+\["([^"]+\.csproj)"', re.M | re.I)
+
+
+def _rel(path):
+    return os.path.normpath(path).replace(os.sep, '/')
+
+
+def _resolve(base_dir, include):
+    # Project files use Windows separators: ..\..\Shared\Shared.Kernel\Shared.Kernel.csproj
+    return _rel(os.path.join(base_dir, include.replace('\\', '/')))
+
+
+def parse_csproj(text, rel_path):
+    root = ET.fromstring(text.lstrip('﻿'))
+    base = os.path.dirname(rel_path)
+    references, packages = [], {}
+    for el in root.iter():
+        tag = el.tag.rsplit('}', 1)[-1]
+        include = el.get('Include')
+        if tag == 'ProjectReference' and include:
+            references.append(_resolve(base, include))
+        elif tag == 'PackageReference' and include:
+            packages[include] = el.get('Version') or (el.findtext('Version') or '')
+    return {'sdk': root.get('Sdk', ''), 'references': sorted(set(references)), 'packages': packages}
+
+
+def parse_sln(text, rel_path):
+    base = os.path.dirname(rel_path)
+    return {'projects': sorted(_resolve(base, path) for _, path in _SLN_PROJECT.findall(text))}
+
+
+def parse_dockerfile(text, rel_path):
+    """The project a Dockerfile publishes, resolved from its WORKDIR when the path is relative."""
+    project = None
+    workdir = ''
+    for line in text.splitlines():
+        m = _DOCKER_WORKDIR.match(line.strip())
+        if m:
+            workdir = m.group(1)
+            continue
+        m = _DOCKER_PROJECT.search(line)
+        if m:
+            path = m.group(1)
+            if '/' not in path and workdir.startswith('/src/'):
+                path = workdir[len('/src/'):].strip('/') + '/' + path
+            project = _rel(path)
+    return {'project': project, 'copies': sorted(_rel(p) for p in _DOCKER_COPY.findall(text))}
+
+
+_PARSERS = {'.csproj': parse_csproj, '.sln': parse_sln}
+
+
+def _parser_for(name):
+    if name == 'Dockerfile':
+        return parse_dockerfile
+    return _PARSERS.get(os.path.splitext(name)[1])
+
+
+def scan(root, cache_path=None):
+    """Parse every project, solution and Dockerfile under root, reusing cached entries. Returns the entries dict."""
+    cache_path = cache_path or os.path.join(root, CACHE_FILE)
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        cached = cache.get('files', {}) if cache.get('version') == CACHE_VERSION else {}
+    except (OSError, ValueError):
+        cached = {}
+    entries = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith('.')]
+        for name in filenames:
+            parser = _parser_for(name)
+            if parser is None and name.lower() not in GLOBAL_FILES and name != 'docker-compose.yml':
+                continue
+            path = os.path.join(dirpath, name)
+            rel = _rel(os.path.relpath(path, root))
+            st = os.stat(path)
+            entry = cached.get(rel)
+            if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+                entries[rel] = entry
+                continue
+            with open(path, 'rb') as f:
+                raw = f.read()
+            digest = hashlib.sha256(raw).hexdigest()
+            if entry and entry['sha256'] == digest:
+                entry.update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+                entries[rel] = entry
+                continue
+            text = raw.decode('utf-8-sig', errors='replace')
+            if name == 'docker-compose.yml':
+                # service -> Dockerfile, through the same compose parser as tools.compose
+                services = parse_compose_text(text)
+                data = {'services': {name: compose_dockerfile(svc) for name, svc in services.items()
+                                     if compose_dockerfile(svc)}}
+            else:
+                data = parser(text, rel) if parser else {}
+            entries[rel] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': digest, 'data': data}
+    if entries != cached:
+        atomic_write(cache_path, json.dumps({'version': CACHE_VERSION, 'files': entries}, sort_keys=True))
+    return entries
+
+
+class CycleError(ValueError):
+    pass
+
+
+class BuildGraph:
+    def __init__(self, projects, solutions, images, globals_):
+        self.projects = projects            # csproj -> {'sdk', 'references', 'packages'}
+        self.solutions = solutions          # sln -> [csproj]
+        self.images = images                # service (or Dockerfile) -> {'dockerfile', 'project'}
+        self.globals = globals_             # Directory.Build.props & co.
+        self.dependents = {p: set() for p in projects}
+        for project, info in projects.items():
+            for ref in info['references']:
+                if ref in self.dependents:
+                    self.dependents[ref].add(project)
+        self._dirs = sorted(((os.path.dirname(p), p) for p in projects), key=lambda d: -len(d[0]))
+
+    @classmethod
+    def from_entries(cls, entries):
+        projects, solutions, images, dockerfiles, services = {}, {}, {}, {}, {}
+        globals_ = []
+        for rel, entry in entries.items():
+            name = rel.rsplit('/', 1)[-1]
+            if rel.endswith('.csproj'):
+                projects[rel] = entry['data']
+            elif rel.endswith('.sln'):
+                solutions[rel] = entry['data']['projects']
+            elif name == 'Dockerfile':
+                dockerfiles[rel] = entry['data']
+            elif name == 'docker-compose.yml':
+                services.update(entry['data']['services'])
+            else:
+                globals_.append(rel)
+        by_dockerfile = {v: k for k, v in services.items()}
+        for rel, data in dockerfiles.items():
+            images[by_dockerfile.get(rel, rel)] = {'dockerfile': rel, 'project': data['project']}
+        return cls(projects, solutions, images, globals_)
+
+    def owner(self, path):
+        """The project whose directory contains path, or None."""
+        for directory, project in self._dirs:
+            if path == project or path.startswith(directory + '/'):
+                return project
+        return None
+
+    def closure(self, project):
+        """The project and everything it references, transitively."""
+        seen = set()
+        stack = [project]
+        while stack:
+            p = stack.pop()
+            if p in seen or p not in self.projects:
+                continue
+            seen.add(p)
+            stack.extend(self.projects[p]['references'])
+        return seen
+
+    def affected(self, changed):
+        """(directly changed projects, all affected projects, affected images) for changed repo-relative paths."""
+        direct = set()
+        images = set()
+        for path in changed:
+            name = path.rsplit('/', 1)[-1]
+            if name.lower() in GLOBAL_FILES:
+                scope = os.path.dirname(path)
+                direct.update(p for p in self.projects if not scope or p.startswith(scope + '/'))
+                continue
+            owner = self.owner(path)
+            if owner:
+                direct.add(owner)
+            for image, info in self.images.items():
+                dockerfile_dir = os.path.dirname(info['dockerfile'])
+                if path == info['dockerfile'] or (info['project'] is None and path.startswith(dockerfile_dir + '/')):
+                    images.add(image)
+        affected = set()
+        stack = list(direct)
+        while stack:
+            p = stack.pop()
+            if p not in affected:
+                affected.add(p)
+                stack.extend(self.dependents.get(p, ()))
+        images.update(image for image, info in self.images.items() if info['project'] in affected)
+        return direct, affected, images
+
+    def waves(self, projects=None):
+        """Topological layers of the given projects (default all); dependencies outside the set are ignored."""
+        projects = set(self.projects if projects is None else projects)
+        pending = {p: {r for r in self.projects[p]['references'] if r in projects} for p in projects}
+        waves = []
+        while pending:
+            ready = sorted(p for p, deps in pending.items() if not deps)
+            if not ready:
+                raise CycleError(f"ProjectReference cycle among: {', '.join(sorted(pending))}")
+            waves.append(ready)
+            for p in ready:
+                del pending[p]
+            for deps in pending.values():
+                deps.difference_update(ready)
+        return waves
+
+    def missing_references(self):
+        return sorted((p, r) for p, info in self.projects.items() for r in info['references'] if r not in self.projects)
+
+
+def changed_files(root, base=None, head=None):
+    """Repo-relative paths changed between base and head (or in the working tree, including untracked files)."""
+    def git(*args):
+        return subprocess.run(['git', *args], cwd=root, check=True, capture_output=True, text=True).stdout.split('\n')
+
+    if base:
+        files = git('diff', '--name-only', f"{base}...{head or 'HEAD'}")
+    else:
+        files = git('diff', '--name-only', 'HEAD') + git('ls-files', '--others', '--exclude-standard')
+    return sorted({f for f in files if f})
+
+
+def plan(graph, changed):
+    direct, affected, images = graph.affected(changed)
+    return {
+        'changed_files': len(changed),
+        'changed_projects': sorted(direct),
+        'affected_projects': sorted(affected),
+        'solutions': sorted(s for s, members in graph.solutions.items() if affected.intersection(members)),
+        'images': sorted(images),
+        'waves': graph.waves(affected),
+        'total_projects': len(graph.projects),
+        'total_images': len(graph.images),
+    }
+
+
+def format_plan(result):
+    lines = [f"{result['changed_files']} changed file(s) -> {len(result['affected_projects'])}/{result['total_projects']} "
+             f"project(s), {len(result['images'])}/{result['total_images']} image(s)"]
+    if result['changed_projects']:
+        lines.append('changed: ' + ', '.join(result['changed_projects']))
+    for i, wave in enumerate(result['waves'], 1):
+        lines.append(f"wave {i}: " + ', '.join(wave))
+    if result['solutions']:
+        lines.append('solutions: ' + ', '.join(result['solutions']))
+    if result['images']:
+        lines.append('images: ' + ', '.join(result['images']))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plan the minimal .NET build for a set of changed files.")
+    parser.add_argument('--root', default=CONFIG['root'])
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--base', help="diff base (e.g. origin/main); default: working tree against HEAD")
+    source.add_argument('--files', nargs='+', help="explicit changed paths, relative to the root ('-' reads stdin)")
+    source.add_argument('--all', action='store_true', help="plan a full build of every project")
+    parser.add_argument('--head', help="diff head when --base is given (default HEAD)")
+    parser.add_argument('--json', action='store_true', help="print the plan as JSON")
+    args = parser.parse_args(argv)
+
+    graph = BuildGraph.from_entries(scan(args.root))
+    for project, ref in graph.missing_references():
+        print(f"warning: {project} references missing {ref}", file=sys.stderr)
+    if args.all:
+        changed = [p for p in graph.projects]
+    elif args.files:
+        changed = sys.stdin.read().split() if args.files == ['-'] else args.files
+    else:
+        changed = changed_files(args.root, args.base, args.head)
+    result = plan(graph, [_rel(f) for f in changed])
+    print(json.dumps(result, indent=2) if args.json else format_plan(result))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,563 @@
+"""Startup planner and health-gated starter for docker-compose.yml.
+
+The compose file is parsed into a DAG of services (``depends_on`` edges,
+list or mapping form). PyYAML is used when installed; otherwise a small
+indentation parser reads the subset this repo's compose file uses. The plan
+reports:
+
+- cycles (which compose would refuse to start),
+- redundant edges, i.e. dependencies already implied through another
+  dependency (``gateway-api -> seq`` is implied by ``gateway-api ->
+  ms-auth-api -> seq``),
+- parallel start waves (longest path from the roots),
+- the critical path given per-service startup times, and the stack's cold
+  start three ways: ``serial`` (one service at a time), ``wave_barrier``
+  (each wave waits for the whole previous wave to be healthy, an upper bound
+  for any dependency-respecting start) and ``dag`` (each edge gated on its
+  own condition, as described below: the expected figure).
+
+Startup times are estimates by image until a measured run is fed back with
+``--durations report.json``.
+
+Each edge is gated on its own ``depends_on`` condition, as ``docker compose
+up`` does: ``service_started`` (the list form) waits for the dependency's
+container to be started, ``service_healthy`` and
+``service_completed_successfully`` wait for its probe to pass.
+``--wait-healthy`` gates every edge on health instead, which is what a test
+environment wants when the services crash-loop until their dependencies are
+reachable.
+
+``--up`` drives the startup itself. Every service starts as soon as all its
+dependency gates open, with no barrier between waves. The probes are ``tcp``
+(default: first published port), ``http``, ``docker`` (container health
+status) or ``stub`` (simulated startup time, no Docker needed). The report
+shows, per service, how long it waited on dependencies and how long it took
+to become healthy.
+
+    python -m tools.compose
+    python -m tools.compose --up --stub --time-scale 0.01
+    python -m tools.compose --up --probes probes.json --json > startup.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from collections import Counter
+
+from tools.config import CONFIG
+
+try:
+    import yaml
+except ImportError:  # optional: the fallback parser covers this repo's compose file
+    yaml = None
+
+COMPOSE_FILE = 'docker-compose.yml'
+
+# Rough cold-start seconds by image, used until measured durations are supplied
+DEFAULT_STARTUP = [
+    ('mcr.microsoft.com/mssql', 25.0),
+    ('rabbitmq', 12.0),
+    ('postgis', 8.0),
+    ('mongo', 5.0),
+    ('datalust/seq', 5.0),
+    ('minio', 3.0),
+    ('redis', 1.0),
+    ('xabarilcoding/healthchecksui', 4.0),
+]
+DEFAULT_BUILT_STARTUP = 6.0
+DEFAULT_OTHER_STARTUP = 3.0
+
+
+def _scalar(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+        return value[1:-1]
+    return value
+
+
+def _parse_subset(text):
+    """services -> {key: value} for scalar keys, ``build``, and list or mapping ``depends_on``/``ports``."""
+    services = {}
+    service = key = None
+    in_services = False
+    for line in text.splitlines():
+        stripped = line.split(' #', 1)[0].rstrip() if not line.lstrip().startswith('#') else ''
+        if not stripped.strip():
+            continue
+        indent = len(stripped) - len(stripped.lstrip())
+        content = stripped.strip()
+        if indent == 0:
+            in_services = content == 'services:'
+            service = None
+            continue
+        if not in_services:
+            continue
+        if indent == 2:
+            service = services.setdefault(content.rstrip(':'), {})
+            key = None
+        elif service is None:
+            continue
+        elif indent == 4:
+            name, _, value = content.partition(':')
+            if content.startswith('- ') or not _:
+                continue
+            key = name.strip()
+            value = value.strip()
+            if value.startswith('[') and value.endswith(']'):
+                service[key] = [_scalar(v) for v in value[1:-1].split(',') if v.strip()]
+            elif value:
+                service[key] = _scalar(value)
+            else:
+                service[key] = None
+        elif key is not None:
+            # Nested under a key: list items, mapping entries, or one more level (depends_on: x: condition: y)
+            if content.startswith('- '):
+                if not isinstance(service[key], list):
+                    service[key] = []
+                service[key].append(_scalar(content[2:]))
+            elif indent == 6:
+                name, _, value = content.partition(':')
+                if not isinstance(service[key], dict):
+                    service[key] = {}
+                service[key][name.strip()] = _scalar(value) if value.strip() else {}
+            elif isinstance(service[key], dict) and service[key]:
+                last = next(reversed(service[key]))
+                if isinstance(service[key][last], dict):
+                    name, _, value = content.partition(':')
+                    service[key][last][name.strip()] = _scalar(value)
+    return services
+
+
+def parse_compose_text(text):
+    """Service name -> compose service mapping (PyYAML when available)."""
+    if yaml is not None:
+        return (yaml.safe_load(text) or {}).get('services') or {}
+    return _parse_subset(text)
+
+
+def load_compose(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_compose_text(f.read())
+
+
+def dependencies(service):
+    """depends_on as name -> condition (the list form means service_started)."""
+    deps = service.get('depends_on') or {}
+    if isinstance(deps, list):
+        return {d: 'service_started' for d in deps}
+    return {name: (spec or {}).get('condition', 'service_started') if isinstance(spec, dict) else 'service_started'
+            for name, spec in deps.items()}
+
+
+def dockerfile(service):
+    build = service.get('build')
+    if isinstance(build, dict) and build.get('dockerfile'):
+        return os.path.normpath(os.path.join(build.get('context') or '.', build['dockerfile'])).replace(os.sep, '/')
+    return None
+
+
+def published_ports(service):
+    ports = []
+    for spec in service.get('ports') or []:
+        parts = str(spec).split(':')
+        if len(parts) >= 2 and parts[-2].isdigit():
+            ports.append(int(parts[-2]))
+    return ports
+
+
+def default_startup(service):
+    image = service.get('image') or ''
+    for prefix, seconds in DEFAULT_STARTUP:
+        if image.startswith(prefix):
+            return seconds
+    return DEFAULT_BUILT_STARTUP if service.get('build') else DEFAULT_OTHER_STARTUP
+
+
+class StartupGraph:
+    def __init__(self, services, wait_healthy=False):
+        self.services = services
+        # service -> {dependency: condition}
+        self.deps = {name: {d: 'service_healthy' if wait_healthy else condition
+                            for d, condition in dependencies(svc).items()}
+                     for name, svc in services.items()}
+        self.unknown = sorted((s, d) for s, ds in self.deps.items() for d in ds if d not in services)
+        for s, d in self.unknown:
+            del self.deps[s][d]
+
+    def cycles(self):
+        """Strongly connected components with more than one service (or a self-dependency)."""
+        index, low, stack, on_stack, found = {}, {}, [], set(), []
+        counter = [0]
+
+        def visit(v):
+            index[v] = low[v] = counter[0]
+            counter[0] += 1
+            stack.append(v)
+            on_stack.add(v)
+            for w in self.deps[v]:
+                if w not in index:
+                    visit(w)
+                    low[v] = min(low[v], low[w])
+                elif w in on_stack:
+                    low[v] = min(low[v], index[w])
+            if low[v] == index[v]:
+                component = []
+                while True:
+                    w = stack.pop()
+                    on_stack.discard(w)
+                    component.append(w)
+                    if w == v:
+                        break
+                if len(component) > 1 or v in self.deps[v]:
+                    found.append(sorted(component))
+
+        for v in sorted(self.deps):
+            if v not in index:
+                visit(v)
+        return found
+
+    def _implied(self, service, dependency, condition):
+        """Whether another path already holds service back until dependency's gate opens.
+
+        Any path means the dependency at least started; it was ready only if the last hop
+        into it waits for the same condition.
+        """
+        seen = set()
+        stack = [d for d in self.deps[service] if d != dependency]
+        while stack:
+            v = stack.pop()
+            if v in seen:
+                continue
+            seen.add(v)
+            for w, c in self.deps[v].items():
+                if w == dependency and (condition == 'service_started' or c == condition):
+                    return True
+                stack.append(w)
+        return False
+
+    def redundant_edges(self):
+        """Edges (service, dependency) implied by another path; removing them keeps the start order."""
+        return sorted((s, d) for s, ds in self.deps.items() for d, c in ds.items() if self._implied(s, d, c))
+
+    def order(self):
+        """Services with dependencies first; raises ValueError on a cycle."""
+        pending = {s: set(ds) for s, ds in self.deps.items()}
+        ordered = []
+        while pending:
+            ready = sorted(s for s, ds in pending.items() if not ds)
+            if not ready:
+                raise ValueError(f"depends_on cycle among: {', '.join(sorted(pending))}")
+            ordered.extend(ready)
+            for s in ready:
+                del pending[s]
+            for ds in pending.values():
+                ds.difference_update(ready)
+        return ordered
+
+    def waves(self):
+        level = {}
+        for s in self.order():
+            level[s] = 1 + max((level[d] for d in self.deps[s]), default=-1)
+        waves = [[] for _ in range(max(level.values(), default=-1) + 1)]
+        for s in sorted(level):
+            waves[level[s]].append(s)
+        return waves
+
+    @staticmethod
+    def _gate(times, dependency, condition):
+        """When a dependency lets its dependents start: once started, or once ready."""
+        start, ready = times[dependency]
+        return start if condition == 'service_started' else ready
+
+    def schedule(self, durations):
+        """Earliest (start, ready) per service when each starts once its dependency gates open."""
+        times = {}
+        for s in self.order():
+            start = max((self._gate(times, d, c) for d, c in self.deps[s].items()), default=0.0)
+            times[s] = (start, start + durations[s])
+        return times
+
+    def critical_path(self, durations):
+        times = self.schedule(durations)
+        if not times:
+            return [], 0.0
+        node = max(times, key=lambda s: (times[s][1], s))
+        path = [node]
+        while self.deps[node]:
+            deps = self.deps[node]
+            node = max(deps, key=lambda d: (self._gate(times, d, deps[d]), d))
+            path.append(node)
+        return path[::-1], max(t[1] for t in times.values())
+
+
+def plan(services, durations=None, wait_healthy=False):
+    graph = StartupGraph(services, wait_healthy)
+    durations = {s: (durations or {}).get(s, default_startup(svc)) for s, svc in services.items()}
+    cycles = graph.cycles()
+    result = {
+        'services': len(services),
+        'edges': sum(len(d) for d in graph.deps.values()),
+        'conditions': dict(Counter(c for ds in graph.deps.values() for c in ds.values())),
+        'unknown_dependencies': graph.unknown,
+        'cycles': cycles,
+        'redundant_edges': graph.redundant_edges(),
+    }
+    if cycles:
+        return result
+    waves = graph.waves()
+    path, total = graph.critical_path(durations)
+    result.update({
+        'waves': waves,
+        'critical_path': path,
+        'durations_s': durations,
+        'cold_start_s': {
+            'serial': round(sum(durations.values()), 2),
+            # Upper bound: a health barrier after every wave, whatever the edges' conditions
+            'wave_barrier': round(sum(max(durations[s] for s in wave) for wave in waves), 2),
+            'dag': round(total, 2),
+        },
+    })
+    return result
+
+
+# Probes: `await probe.ready()` polls until the service is healthy or raises TimeoutError
+
+class TcpProbe:
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+
+    async def check(self):
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), 2.0)
+        except (OSError, asyncio.TimeoutError):
+            return False
+        writer.close()
+        return True
+
+    def __repr__(self):
+        return f"tcp:{self.host}:{self.port}"
+
+
+class HttpProbe:
+    def __init__(self, url):
+        self.url = url
+
+    async def check(self):
+        from tools.http import Client
+        client = Client(1, 2.0)
+        try:
+            response = await client.request('GET', self.url, {}, b'')
+            return response.status < 500
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            return False
+        finally:
+            await client.close()
+
+    def __repr__(self):
+        return f"http:{self.url}"
+
+
+class DockerProbe:
+    """Healthy when the container reports healthy (or is simply running, if it has no healthcheck)."""
+
+    def __init__(self, container):
+        self.container = container
+
+    async def check(self):
+        proc = await asyncio.create_subprocess_exec(
+            'docker', 'inspect', '-f', '{{.State.Status}} {{if .State.Health}}{{.State.Health.Status}}{{end}}',
+            self.container, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL)
+        out, _ = await proc.communicate()
+        status = out.decode().split()
+        return bool(status) and status[0] == 'running' and (len(status) == 1 or status[1] == 'healthy')
+
+    def __repr__(self):
+        return f"docker:{self.container}"
+
+
+class StubProbe:
+    """Becomes ready a fixed time after the service was started; for testing the driver without Docker."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.started = None
+
+    def begin(self):
+        self.started = time.monotonic()
+
+    async def check(self):
+        return self.started is not None and time.monotonic() - self.started >= self.seconds
+
+    def __repr__(self):
+        return f"stub:{self.seconds:.3f}s"
+
+
+def make_probe(name, service, spec=None):
+    spec = spec or {}
+    kind = spec.get('probe', 'tcp')
+    if kind == 'http':
+        return HttpProbe(spec['url'])
+    if kind == 'docker':
+        return DockerProbe(spec.get('container') or service.get('container_name') or name)
+    if kind == 'stub':
+        return StubProbe(float(spec['seconds']))
+    ports = published_ports(service)
+    port = spec.get('port') or (ports[0] if ports else None)
+    if port is None:
+        # Nothing to connect to: fall back to the container state
+        return DockerProbe(service.get('container_name') or name)
+    return TcpProbe(spec.get('host', 'localhost'), int(port))
+
+
+async def wait_ready(probe, interval=0.5, timeout=180.0):
+    deadline = time.monotonic() + timeout
+    while not await probe.check():
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"{probe!r} not ready after {timeout}s")
+        await asyncio.sleep(interval)
+
+
+async def docker_start(compose_file, name):
+    proc = await asyncio.create_subprocess_exec(
+        'docker', 'compose', '-f', compose_file, 'up', '-d', '--no-deps', name,
+        stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE)
+    _, err = await proc.communicate()
+    if proc.returncode:
+        raise RuntimeError(f"docker compose up {name} failed: {err.decode(errors='replace').strip()}")
+
+
+async def start_stack(services, probes, start=None, interval=0.5, timeout=180.0, wait_healthy=False):
+    """Start every service as soon as its dependency gates open. Returns per-service timings."""
+    graph = StartupGraph(services, wait_healthy)
+    graph.order()  # fail fast on cycles
+    started_events = {s: asyncio.Event() for s in services}
+    ready = {s: asyncio.Event() for s in services}
+    timings = {}
+    t0 = time.monotonic()
+
+    async def bring_up(name):
+        await asyncio.gather(*((started_events if c == 'service_started' else ready)[d].wait()
+                               for d, c in graph.deps[name].items()))
+        started = time.monotonic()
+        probe = probes[name]
+        if start is not None:
+            await start(name)
+        if isinstance(probe, StubProbe):
+            probe.begin()
+        started_events[name].set()
+        await wait_ready(probe, interval, timeout)
+        done = time.monotonic()
+        timings[name] = {'start_s': round(started - t0, 3), 'ready_s': round(done - t0, 3),
+                         'startup_s': round(done - started, 3), 'probe': repr(probe)}
+        ready[name].set()
+
+    await asyncio.gather(*(bring_up(s) for s in services))
+    return timings
+
+
+def startup_report(services, timings, wait_healthy=False):
+    graph = StartupGraph(services, wait_healthy)
+    durations = {s: t['startup_s'] for s, t in timings.items()}
+    path, total = graph.critical_path(durations)
+    return {
+        'wall_s': round(max(t['ready_s'] for t in timings.values()), 3) if timings else 0.0,
+        'serial_s': round(sum(durations.values()), 3),
+        'critical_path': path,
+        'critical_path_s': round(total, 3),
+        'services': dict(sorted(timings.items(), key=lambda kv: kv[1]['ready_s'])),
+    }
+
+
+def format_plan(result):
+    conditions = ', '.join(f"{n} {c}" for c, n in sorted(result['conditions'].items()))
+    lines = [f"{result['services']} services, {result['edges']} depends_on edges" + (f" ({conditions})" if conditions else '')]
+    for s, d in result['unknown_dependencies']:
+        lines.append(f"unknown dependency: {s} -> {d}")
+    for cycle in result['cycles']:
+        lines.append('CYCLE: ' + ' <-> '.join(cycle))
+    if result['redundant_edges']:
+        lines.append('redundant edges: ' + ', '.join(f"{s} -> {d}" for s, d in result['redundant_edges']))
+    if result['cycles']:
+        return '\n'.join(lines)
+    for i, wave in enumerate(result['waves'], 1):
+        slowest = max(wave, key=lambda s: result['durations_s'][s])
+        lines.append(f"wave {i} ({result['durations_s'][slowest]:g}s, {slowest}): {', '.join(wave)}")
+    cold = result['cold_start_s']
+    lines.append(f"critical path ({cold['dag']:g}s): " + ' -> '.join(
+        f"{s} {result['durations_s'][s]:g}s" for s in result['critical_path']))
+    lines.append(f"cold start: {cold['dag']:g}s with per-edge depends_on gates (expected); "
+                 f"upper bounds: {cold['wave_barrier']:g}s with a health barrier after each wave, "
+                 f"{cold['serial']:g}s serial")
+    return '\n'.join(lines)
+
+
+def format_startup(report):
+    lines = [f"{'service':<22} {'start':>8} {'startup':>8} {'ready':>8}  probe"]
+    for name, t in report['services'].items():
+        lines.append(f"{name:<22} {t['start_s']:>8.2f} {t['startup_s']:>8.2f} {t['ready_s']:>8.2f}  {t['probe']}")
+    lines.append('')
+    lines.append(f"stack ready in {report['wall_s']:.2f}s (serial would take {report['serial_s']:.2f}s); "
+                 f"critical path {report['critical_path_s']:.2f}s: {' -> '.join(report['critical_path'])}")
+    return '\n'.join(lines)
+
+
+def _load_durations(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    # Accept either {service: seconds} or a previous --up --json report
+    if 'services' in data and isinstance(data['services'], dict):
+        return {s: t['startup_s'] for s, t in data['services'].items()}
+    return {s: float(v) for s, v in data.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plan (and optionally drive) a parallel docker-compose startup.")
+    parser.add_argument('--file', default=os.path.join(CONFIG['root'], COMPOSE_FILE))
+    parser.add_argument('--durations', help="JSON of per-service startup seconds, or a previous --up --json report")
+    parser.add_argument('--wait-healthy', action='store_true',
+                        help="gate every depends_on edge on the dependency's health, whatever its condition")
+    parser.add_argument('--up', action='store_true', help="start the stack, gating each service on its dependencies' probes")
+    parser.add_argument('--probes', help="JSON: service -> {probe: tcp|http|docker|stub, host, port, url, container, seconds}")
+    parser.add_argument('--stub', action='store_true',
+                        help="with --up, simulate every service with a stub probe and start nothing")
+    parser.add_argument('--time-scale', type=float, default=1.0, help="multiply stub startup times (e.g. 0.01)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="random +/- fraction applied to stub startup times")
+    parser.add_argument('--interval', type=float, default=0.5, help="probe polling interval in seconds")
+    parser.add_argument('--timeout', type=float, default=180.0, help="per-service health timeout in seconds")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--json', action='store_true', help="print the plan or startup report as JSON")
+    args = parser.parse_args(argv)
+
+    services = load_compose(args.file)
+    durations = _load_durations(args.durations) if args.durations else None
+    result = plan(services, durations, args.wait_healthy)
+    if not args.up or result['cycles']:
+        print(json.dumps(result, indent=2) if args.json else format_plan(result))
+        if result['cycles']:
+            raise SystemExit(1)
+        return
+
+    specs = {}
+    if args.probes:
+        with open(args.probes, 'r', encoding='utf-8') as f:
+            specs = json.load(f)
+    if args.stub:
+        rng = random.Random(args.seed)
+        probes = {s: StubProbe(result['durations_s'][s] * args.time_scale * (1 + rng.uniform(-args.jitter, args.jitter)))
+                  for s in services}
+        start = None
+        interval = min(args.interval, max(0.001, min(p.seconds for p in probes.values()) / 10)) if probes else args.interval
+    else:
+        probes = {s: make_probe(s, svc, specs.get(s)) for s, svc in services.items()}
+        start = lambda name: docker_start(args.file, name)
+        interval = args.interval
+    timings = asyncio.run(start_stack(services, probes, start, interval, args.timeout, args.wait_healthy))
+    report = startup_report(services, timings, args.wait_healthy)
+    print(json.dumps(report, indent=2) if args.json else format_startup(report))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""Paths used by the patch scripts and tools.
+
+Defaults are relative to the repository root (the directory above ``tools``).
+An optional JSON file overrides them: ``tools.json`` at the repository root,
+or the file named by ``MS_PLATFORM_CONFIG``. ``MS_PLATFORM_<KEY>`` environment
+variables override both::
+
+    {"collection": "docs/postman/Gateway_Collection.postman_collection.json",
+     "readme": "Gateway/README.md"}
+
+    MS_PLATFORM_COLLECTION=/tmp/collection.json python refresh_collection.py
+
+Relative ``collection``/``readme`` paths resolve against ``root``; a relative
+``root`` resolves against the directory of the config file that set it.
+"""
+import json
+import os
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONFIG_FILE = 'tools.json'
+
+DEFAULTS = {
+    'root': '.',
+    'collection': os.path.join('docs', 'postman', 'Gateway_Collection.postman_collection.json'),
+    'readme': os.path.join('Gateway', 'README.md'),
+}
+
+
+def load_config(path=None, environ=None):
+    """Absolute paths keyed by name, merged from the defaults, the config file and the environment."""
+    environ = os.environ if environ is None else environ
+    path = path or environ.get('MS_PLATFORM_CONFIG') or os.path.join(REPO_ROOT, CONFIG_FILE)
+    values = dict(DEFAULTS)
+    base = REPO_ROOT
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            values.update(json.load(f))
+        base = os.path.dirname(os.path.abspath(path))
+    root = environ.get('MS_PLATFORM_ROOT')
+    root = os.path.abspath(root) if root else os.path.normpath(os.path.join(base, values['root']))
+    config = {'root': root}
+    for key, value in values.items():
+        if key == 'root':
+            continue
+        value = environ.get(f"MS_PLATFORM_{key.upper()}", value)
+        config[key] = value if os.path.isabs(value) else os.path.normpath(os.path.join(root, value))
+    return config
+
+
+CONFIG = load_config()
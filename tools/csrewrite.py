@@ -0,0 +1,142 @@
+"""Rule-driven, parallel rewriter for the C# sources of every service solution.
+
+Rules are precompiled regexes scoped to files by a path glob (relative to the
+repo root, ``/``-separated, fnmatch syntax). ``rewrite_tree`` walks the tree
+once, fans the candidate ``.cs`` files out to a process pool and rewrites each
+file atomically if any rule changed it.
+
+A cache file records each file's size, mtime and SHA-256 together with a
+fingerprint of the rule set. Files whose size and mtime are unchanged since
+the last run with the same rules are skipped without being read; files that
+were touched but still hash the same are skipped without running the rules.
+Files that are not UTF-8 (UTF-16, ANSI code pages) are left alone and
+reported as skipped, with the reason. They are not cached, so they are
+reported on every run until they are converted.
+"""
+import fnmatch
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from tools.writer import atomic_open, atomic_write
+
+CACHE_FILE = '.csrewrite-cache.json'
+SKIP_DIRS = {'bin', 'obj', 'node_modules', '.git', '.vs'}
+
+
+class CsRule:
+    def __init__(self, name, pattern, replacement, paths='*.cs'):
+        self.name = name
+        self.pattern = pattern
+        self.replacement = replacement
+        self.paths = paths
+
+    def applies_to(self, rel_path):
+        return fnmatch.fnmatchcase(rel_path, self.paths)
+
+    def fingerprint(self):
+        return f"{self.name}\0{self.pattern.pattern}\0{self.pattern.flags}\0{self.replacement}\0{self.paths}"
+
+
+def rules_fingerprint(rules):
+    return hashlib.sha256('\n'.join(r.fingerprint() for r in rules).encode('utf-8')).hexdigest()
+
+
+_worker_rules = None
+
+
+def _init_worker(rules):
+    # Rules are pickled to each worker once, not once per file
+    global _worker_rules
+    _worker_rules = rules
+
+
+def _rewrite_file(job):
+    """(rel_path, cache entry, rule names applied, reason the file was skipped or None)."""
+    path, rel_path, known_hash = job
+    with open(path, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()
+    applied = []
+    if digest != known_hash:
+        # newline='' semantics: keep CRLF/BOM exactly as they are in the file
+        try:
+            content = raw.decode('utf-8')
+        except UnicodeDecodeError as exc:
+            if raw[:2] in (b'\xff\xfe', b'\xfe\xff'):
+                return rel_path, None, applied, "UTF-16 (byte-order mark), not UTF-8"
+            return rel_path, None, applied, f"not UTF-8: {exc.reason} at byte {exc.start}"
+        new_content = content
+        for rule in _worker_rules:
+            if rule.applies_to(rel_path):
+                new_content, count = rule.pattern.subn(rule.replacement, new_content)
+                if count:
+                    applied.append(rule.name)
+        if new_content != content:
+            with atomic_open(path, newline='') as out:
+                out.write(new_content)
+            digest = hashlib.sha256(new_content.encode('utf-8')).hexdigest()
+    st = os.stat(path)
+    return rel_path, {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': digest}, applied, None
+
+
+def iter_sources(root, extension='.cs'):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+        for name in filenames:
+            if name.endswith(extension):
+                path = os.path.join(dirpath, name)
+                yield path, os.path.relpath(path, root).replace(os.sep, '/')
+
+
+def load_cache(cache_path, fingerprint):
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    # A different rule set invalidates every entry
+    return cache.get('files', {}) if cache.get('rules') == fingerprint else {}
+
+
+def rewrite_tree(root, rules, cache_path=None, workers=None):
+    """Apply the rules to every matching .cs file under root.
+
+    Returns ({relative path: [rule names applied]}, {relative path: reason skipped}).
+    """
+    rules = list(rules)
+    fingerprint = rules_fingerprint(rules)
+    cache_path = cache_path or os.path.join(root, CACHE_FILE)
+    cache = load_cache(cache_path, fingerprint)
+
+    files = {}
+    jobs = []
+    for path, rel_path in iter_sources(root):
+        if not any(r.applies_to(rel_path) for r in rules):
+            continue
+        entry = cache.get(rel_path)
+        st = os.stat(path)
+        if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            files[rel_path] = entry
+            continue
+        jobs.append((path, rel_path, entry['sha256'] if entry else None))
+
+    changed, skipped = {}, {}
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        _init_worker(rules)
+        results = list(map(_rewrite_file, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(rules,)) as pool:
+            results = list(pool.map(_rewrite_file, jobs, chunksize=max(1, len(jobs) // (4 * workers))))
+    for rel_path, entry, applied, reason in results:
+        if reason:
+            skipped[rel_path] = reason
+            continue
+        files[rel_path] = entry
+        if applied:
+            changed[rel_path] = applied
+
+    atomic_write(cache_path, json.dumps({'rules': fingerprint, 'files': files}, indent=1, sort_keys=True))
+    return changed, skipped
@@ -0,0 +1,255 @@
+"""Single-pass rule engine for the Gateway Postman collection.
+
+Each patch script registers its edits as rules (a match predicate plus a
+transform). The engine parses the collection once, visits every request item
+once, applies every matching rule to it and writes the result once. Raw JSON
+bodies are shared between rules through a BodyCache, and the result goes through the format-preserving
+writer, so only the spans that actually changed are rewritten (or, in dry-run
+mode, reported as a JSON Patch / unified diff). Passing a ``tools.profile.Profile``
+records per-rule timings and counters. The routes of the items that
+changed are kept on the RunContext so the README sections documenting them
+can be regenerated (see ``tools.readme``).
+"""
+import json
+import os
+import time
+
+from tools.bodies import BodyCache
+from tools.config import CONFIG
+from tools.index import RouteIndex, route_key, route_matches
+from tools.profile import NULL_PROFILE
+from tools.readme import SectionRule
+from tools.writer import SourceDocument, diff, write_json
+
+COLLECTION_PATH = CONFIG['collection']
+README_PATH = CONFIG['readme']
+
+
+class Rule:
+    """A transform applied to every request item the rule selects.
+
+    ``route`` (plus optional ``method``/``examples``) selects items through the
+    RouteIndex; ``match`` is a predicate evaluated per item. When both are
+    given the route narrows the candidates and ``match`` refines them.
+    ``transform(item, ctx)`` receives the RunContext of the current pass.
+    """
+
+    def __init__(self, name, match, transform, route=None, method=None, examples=False, rule_set=None):
+        self.name = name
+        self.rule_set = rule_set
+        self.match = match
+        self.transform = transform
+        self.route = route
+        self.method = method
+        self.examples = examples
+
+    def selects(self, item):
+        """Per-item equivalent of the index lookup, for passes that have no RouteIndex."""
+        if self.route is not None:
+            requests = []
+            if self.examples is not True:
+                requests.append(item['request'])
+            if self.examples is not False:
+                requests.extend(r for r in iter_requests(item) if r is not item['request'])
+            if not any(route_matches(r, self.route, self.method) for r in requests):
+                return False
+        return self.match(item)
+
+    def __repr__(self):
+        return f"Rule({self.name!r})"
+
+
+class RuleSet:
+    """Ordered group of rules contributed by one script, plus its README section rules."""
+
+    def __init__(self, name):
+        self.name = name
+        self.rules = []
+        self.sections = []
+
+    def rule(self, match=None, route=None, method=None, examples=False, name=None):
+        # Decorator: @rules.rule(route='auth/api') or @rules.rule(match=lambda item: ...)
+        def register(transform):
+            self.rules.append(Rule(name or transform.__name__, match or match_all, transform,
+                                   route=route, method=method, examples=examples, rule_set=self.name))
+            return transform
+        return register
+
+    def section(self, route=None, method=None, name=None):
+        # Decorator: @rules.section(route='auth/api') registers a README edit, transform(section)
+        def register(transform):
+            self.sections.append(SectionRule(name or transform.__name__, transform, route=route, method=method,
+                                             rule_set=self.name))
+            return transform
+        return register
+
+    def __iter__(self):
+        return iter(self.rules)
+
+    def __len__(self):
+        return len(self.rules)
+
+
+def match_all(item):
+    return True
+
+
+def iter_requests(item):
+    """Yield the item's request followed by every example response's originalRequest."""
+    if 'request' in item and isinstance(item['request'], dict):
+        yield item['request']
+    responses = item.get('response')
+    if isinstance(responses, list):
+        for resp in responses:
+            orig_req = resp.get('originalRequest') if isinstance(resp, dict) else None
+            if isinstance(orig_req, dict):
+                yield orig_req
+
+
+def iter_raw_bodies(item):
+    for request in iter_requests(item):
+        body = request.get('body')
+        if isinstance(body, dict) and body.get('mode') == 'raw':
+            yield body
+
+
+def iter_items(node):
+    """Depth-first walk yielding every request item (folders are descended, not yielded)."""
+    for child in node.get('item', []):
+        if 'item' in child:
+            yield from iter_items(child)
+        if 'request' in child:
+            yield child
+
+
+class RunContext:
+    """State shared by all rules during one pass over the collection."""
+
+    def __init__(self, index=None):
+        self.index = index
+        self.bodies = BodyCache()
+        self.matched = {}
+        self.changed = set()
+        self.written = False
+        self.output = None
+
+    def request_bodies(self, item):
+        """Views over the raw JSON bodies of the request and its example originalRequests."""
+        return [self.bodies.view(body, 'raw') for body in iter_raw_bodies(item)]
+
+    def response_bodies(self, item):
+        """Views over the example response bodies."""
+        responses = item.get('response')
+        if not isinstance(responses, list):
+            return []
+        return [self.bodies.view(resp, 'body') for resp in responses if isinstance(resp, dict) and 'body' in resp]
+
+
+def changed_routes(changes, data):
+    """Route keys of the request items touched by the ``diff`` changes (removed items excluded)."""
+    routes = set()
+    for _, path in changes:
+        node, item = data, None
+        i = 0
+        while i + 1 < len(path) and path[i] == 'item':
+            children = node.get('item')
+            if not isinstance(children, list) or not isinstance(path[i + 1], int) or path[i + 1] >= len(children):
+                break
+            node = children[path[i + 1]]
+            if 'request' in node:
+                item = node
+            i += 2
+        if item is not None and isinstance(item['request'], dict):
+            routes.add(route_key(item['request']))
+    return routes
+
+
+def load_collection(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def apply_rules(data, rules, only=None, profile=None):
+    """Run every rule over the collection in one traversal and flush dirty bodies. Returns the RunContext.
+
+    ``only`` restricts the traversal to those items; routed rules are still resolved
+    against the whole collection.
+    """
+    rules = list(rules)
+    items = list(iter_items(data))
+    ctx = RunContext()
+    # Routed rules look their handful of items up once instead of testing every item
+    targets = {}
+    if any(r.route is not None for r in rules):
+        started = time.perf_counter()
+        ctx.index = RouteIndex.build(items)
+        for r in rules:
+            if r.route is not None:
+                targets[r.name] = {id(i) for i in ctx.index.items(r.route, r.method, r.examples)}
+        if profile:
+            profile.phases['index'] = profile.phases.get('index', 0.0) + time.perf_counter() - started
+
+    ctx.matched = {r.name: 0 for r in rules}
+    if only is not None:
+        only = {id(i) for i in only}
+        items = [i for i in items if id(i) in only]
+    stats = {r.name: profile.rule(r) for r in rules} if profile else None
+    bodies = ctx.bodies
+    for item in items:
+        for r in rules:
+            if r.route is not None and id(item) not in targets[r.name]:
+                continue
+            if stats is None:
+                if r.match(item):
+                    r.transform(item, ctx)
+                    ctx.matched[r.name] += 1
+                continue
+            s = stats[r.name]
+            parsed, dirtied = bodies.parsed, bodies.dirtied
+            started = time.perf_counter()
+            if r.match(item):
+                r.transform(item, ctx)
+                ctx.matched[r.name] += 1
+                s.matched += 1
+            s.seconds += time.perf_counter() - started
+            s.visited += 1
+            s.parsed += bodies.parsed - parsed
+            s.dirtied += bodies.dirtied - dirtied
+    if profile:
+        profile.count('items', len(items))
+        with profile.phase('flush'):
+            bodies.flush()
+        profile.count('bodies_parsed', bodies.parsed)
+        profile.count('bodies_serialized', bodies.serialized)
+    else:
+        bodies.flush()
+    return ctx
+
+
+def run(path, *rule_sets, dry_run=None, profile=None):
+    """Apply the rule sets to the collection at path; the file is left untouched if nothing changed.
+
+    With ``dry_run`` ('patch' or 'diff') nothing is written and ``ctx.output`` holds the changes.
+    """
+    profile = profile or NULL_PROFILE
+    rules = [r for rs in rule_sets for r in rs]
+    with profile.phase('parse'):
+        with open(path, 'r', encoding='utf-8') as f:
+            source = SourceDocument.parse(f.read())
+        # Rules edit a working copy; the source keeps the original values and spans for the diff
+        data = json.loads(source.text)
+    with profile.phase('rules'):
+        ctx = apply_rules(data, rules, profile=profile or None)
+    with profile.phase('diff'):
+        changes = list(diff(source.value, data))
+        ctx.changed = changed_routes(changes, data)
+    with profile.phase('write'):
+        result = write_json(path, source, data, dry_run, changes)
+    if dry_run:
+        ctx.output = result
+    else:
+        ctx.written = result
+    profile.count('bytes_read', os.path.getsize(path))
+    profile.count('bytes_written', os.path.getsize(path) if ctx.written else 0)
+    return ctx
+
@@ -0,0 +1,162 @@
+"""Minimal asyncio HTTP/1.1 client with pooled keep-alive connections, plus the
+message framing helpers shared with the local stub server.
+
+Only what the load generator and snapshot capture need: Content-Length and
+chunked bodies, keep-alive reuse, and a bounded pool of connections per
+target (scheme, host, port).
+"""
+import asyncio
+import ssl
+from urllib.parse import urlsplit
+
+MAX_LINE = 1 << 16
+
+
+class Response:
+    __slots__ = ('status', 'reason', 'headers', 'body')
+
+    def __init__(self, status, reason, headers, body):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+    def keep_alive(self):
+        return self.headers.get('connection', '').lower() != 'close'
+
+
+async def read_head(reader):
+    """Start line and lower-cased headers of the next message, or (None, None) on a clean EOF."""
+    line = await reader.readline()
+    if not line:
+        return None, None
+    start = line.decode('latin-1').rstrip('\r\n')
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise asyncio.IncompleteReadError(line, None)
+        if line in (b'\r\n', b'\n'):
+            return start, headers
+        if len(line) > MAX_LINE:
+            raise ValueError("HTTP header line too long")
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+
+async def read_body(reader, headers, until_eof=False):
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b';', 1)[0].strip() or b'0', 16)
+            if size == 0:
+                # Trailers end with an empty line
+                while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    pass
+                return b''.join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+    if 'content-length' in headers:
+        return await reader.readexactly(int(headers['content-length']))
+    return await reader.read() if until_eof else b''
+
+
+def encode_message(start_line, headers, body=b''):
+    head = [start_line]
+    head.extend(f"{name}: {value}" for name, value in headers.items())
+    return ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body
+
+
+class ConnectionPool:
+    """Keep-alive connections to one target; at most ``size`` are open at a time."""
+
+    def __init__(self, host, port, use_ssl=False, size=8, timeout=30.0):
+        self.host = host
+        self.port = port
+        self.ssl = ssl.create_default_context() if use_ssl else None
+        self.timeout = timeout
+        self._idle = []
+        self._slots = asyncio.Semaphore(size)
+        self.opened = 0
+
+    async def _connect(self):
+        self.opened += 1
+        return await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+
+    async def _exchange(self, conn, payload, method):
+        reader, writer = conn
+        writer.write(payload)
+        await writer.drain()
+        start, headers = await read_head(reader)
+        if start is None:
+            raise ConnectionResetError("Connection closed before response")
+        _, status, reason = (start.split(' ', 2) + [''])[:3]
+        no_body = method == 'HEAD' or status.startswith('1') or status in ('204', '304')
+        body = b'' if no_body else await read_body(reader, headers, until_eof=headers.get('connection', '').lower() == 'close')
+        return Response(int(status), reason, headers, body)
+
+    async def request(self, method, target, headers=None, body=b''):
+        headers = dict(headers or {})
+        headers.setdefault('Host', self.host if self.port in (80, 443) else f"{self.host}:{self.port}")
+        headers['Content-Length'] = str(len(body))
+        payload = encode_message(f"{method} {target} HTTP/1.1", headers, body)
+        async with self._slots:
+            reused = bool(self._idle)
+            conn = self._idle.pop() if reused else await self._connect()
+            try:
+                response = await asyncio.wait_for(self._exchange(conn, payload, method), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                conn[1].close()
+                if not reused:
+                    raise
+                # The server may have dropped an idle keep-alive connection: retry once on a fresh one
+                conn = await self._connect()
+                try:
+                    response = await asyncio.wait_for(self._exchange(conn, payload, method), self.timeout)
+                except BaseException:
+                    conn[1].close()
+                    raise
+            except BaseException:
+                conn[1].close()
+                raise
+            if response.keep_alive():
+                self._idle.append(conn)
+            else:
+                conn[1].close()
+            return response
+
+    async def close(self):
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+
+class Client:
+    """Routes absolute URLs to one ConnectionPool per (scheme, host, port)."""
+
+    def __init__(self, connections=8, timeout=30.0):
+        self.connections = connections
+        self.timeout = timeout
+        self.pools = {}
+
+    def pool(self, url):
+        parts = urlsplit(url)
+        use_ssl = parts.scheme == 'https'
+        key = (parts.scheme, parts.hostname, parts.port or (443 if use_ssl else 80))
+        pool = self.pools.get(key)
+        if pool is None:
+            pool = self.pools[key] = ConnectionPool(key[1], key[2], use_ssl, self.connections, self.timeout)
+        return pool
+
+    async def request(self, method, url, headers=None, body=b''):
+        parts = urlsplit(url)
+        target = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        return await self.pool(url).request(method, target, headers, body)
+
+    async def close(self):
+        for pool in self.pools.values():
+            await pool.close()
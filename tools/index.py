@@ -0,0 +1,214 @@
+"""Route index over the Gateway Postman collection.
+
+Items are stored in a path-segment trie keyed by service prefix (``auth``,
+``apps``, ``payments``...) and the rest of the templated path, with the HTTP
+method recorded per entry. Example ``response[].originalRequest`` URLs are
+indexed alongside the requests themselves so rules find both through the
+same lookup instead of substring-scanning ``url.raw`` on every item.
+
+Lookup patterns are slash-separated segments (case-insensitive). ``*`` matches
+exactly one segment and ``**`` any number of segments; a templated segment such
+as ``{id}``, ``:id``, ``{{var}}`` or a literal GUID is stored as ``{}`` and
+matched by ``{}``, ``*`` or any ``{name}``/``:name`` in the pattern.
+"""
+import re
+
+PARAM = '{}'
+
+_GUID = re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$')
+_SEPARATORS = re.compile(r'[/\s]+')
+
+
+def _segment_key(segment):
+    if segment.startswith(':') or (segment.startswith('{') and segment.endswith('}')) or _GUID.match(segment):
+        return PARAM
+    return segment.lower()
+
+
+def split_path(raw):
+    """Templated path segments of a raw Postman URL, without host and query string."""
+    raw = raw.split('?', 1)[0].split('#', 1)[0]
+    if raw.startswith('{{'):
+        end = raw.find('}}')
+        raw = raw[end + 2:] if end != -1 else ''
+    elif '://' in raw:
+        raw = raw.split('://', 1)[1]
+        raw = raw[raw.find('/'):] if '/' in raw else ''
+    # originalRequest URLs were exported with spaces instead of slashes ("/apps api Apps")
+    return [_segment_key(s) for s in _SEPARATORS.split(raw) if s]
+
+
+def request_path(request):
+    url = request.get('url', {}) if isinstance(request, dict) else {}
+    if isinstance(url, dict):
+        return split_path(url.get('raw', ''))
+    if isinstance(url, str):
+        return split_path(url)
+    return []
+
+
+def route_key(request):
+    """(METHOD, templated path) identifying the endpoint a request documents."""
+    return ((request.get('method') or '').upper(), tuple(request_path(request)))
+
+
+def compile_pattern(pattern):
+    segments = []
+    for s in _SEPARATORS.split(pattern):
+        if not s:
+            continue
+        segments.append(s if s in ('*', '**') else _segment_key(s))
+    return segments
+
+
+def _match_segments(pattern, path, prefix):
+    if not pattern:
+        return prefix or not path
+    head = pattern[0]
+    if head == '**':
+        return any(_match_segments(pattern[1:], path[i:], prefix) for i in range(len(path) + 1))
+    if not path:
+        return False
+    if head == '*' or head == path[0]:
+        return _match_segments(pattern[1:], path[1:], prefix)
+    return False
+
+
+def route_matches(request, pattern, method=None, prefix=True):
+    """True if a single request (or originalRequest) sits on the given route."""
+    if method and (request.get('method') or '').upper() != method.upper():
+        return False
+    return _match_segments(compile_pattern(pattern), request_path(request), prefix)
+
+
+class RouteEntry:
+    __slots__ = ('item', 'request', 'method', 'path', 'example', 'order')
+
+    def __init__(self, item, request, method, path, example, order):
+        self.item = item
+        self.request = request
+        self.method = method
+        self.path = path
+        self.example = example
+        self.order = order
+
+
+class RouteNode:
+    __slots__ = ('children', 'entries')
+
+    def __init__(self):
+        self.children = {}
+        self.entries = []
+
+    def walk(self):
+        yield self
+        for child in self.children.values():
+            yield from child.walk()
+
+
+class RouteIndex:
+    def __init__(self):
+        self.root = RouteNode()
+        self.size = 0
+
+    @classmethod
+    def build(cls, items):
+        """Index request items (see ``tools.engine.iter_items``) in the order given."""
+        index = cls()
+        for order, item in enumerate(items):
+            index.add(item, item['request'], False, order)
+            responses = item.get('response')
+            if isinstance(responses, list):
+                for resp in responses:
+                    orig_req = resp.get('originalRequest') if isinstance(resp, dict) else None
+                    if isinstance(orig_req, dict):
+                        index.add(item, orig_req, True, order)
+        return index
+
+    def add(self, item, request, example, order):
+        method = (request.get('method') or '').upper()
+        self.insert(item, method, request_path(request), example, order, request)
+
+    def insert(self, item, method, path, example, order, request=None):
+        """Index any object (e.g. a README section) under a method and templated path."""
+        node = self.root
+        for segment in path:
+            node = node.children.setdefault(segment, RouteNode())
+        node.entries.append(RouteEntry(item, request, method, path, example, order))
+        self.size += 1
+
+    def services(self):
+        return sorted(self.root.children)
+
+    def _nodes(self, node, pattern, prefix):
+        if not pattern:
+            if prefix:
+                yield from node.walk()
+            else:
+                yield node
+            return
+        head = pattern[0]
+        if head == '**':
+            for descendant in node.walk():
+                yield from self._nodes(descendant, pattern[1:], prefix)
+        elif head == '*':
+            for child in node.children.values():
+                yield from self._nodes(child, pattern[1:], prefix)
+        elif head in node.children:
+            yield from self._nodes(node.children[head], pattern[1:], prefix)
+
+    def lookup(self, pattern, method=None, examples=False, prefix=True):
+        """Entries on the route (and, with prefix, under it), in collection order.
+
+        ``examples`` selects which URLs are searched: False for the requests
+        only, True for example originalRequests only, None for both.
+        """
+        method = method.upper() if method else None
+        seen = set()
+        found = []
+        for node in self._nodes(self.root, compile_pattern(pattern), prefix):
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+            for entry in node.entries:
+                if method and entry.method != method:
+                    continue
+                if examples is not None and entry.example != examples:
+                    continue
+                found.append(entry)
+        found.sort(key=lambda e: e.order)
+        return found
+
+    def items(self, pattern, method=None, examples=False, prefix=True):
+        """Distinct collection items with a request (or example) on the route, in collection order."""
+        items = []
+        seen = set()
+        for entry in self.lookup(pattern, method, examples, prefix):
+            if id(entry.item) not in seen:
+                seen.add(id(entry.item))
+                items.append(entry.item)
+        return items
+
+    def resolve(self, path, method=None):
+        """Request entries whose templated route matches a concrete path such as ``/auth/api/Auth/users/42``.
+
+        Literal segments win over parameters, so ``/auth/api/Auth/users/sessions``
+        prefers a literal ``sessions`` route to ``users/{id}``.
+        """
+        segments = split_path(path)
+        method = method.upper() if method else None
+
+        def walk(node, i):
+            if i == len(segments):
+                entries = [e for e in node.entries if not e.example and (method is None or e.method == method)]
+                return entries or None
+            segment = segments[i]
+            for key in (segment, PARAM):
+                child = node.children.get(key)
+                if child is not None:
+                    found = walk(child, i + 1)
+                    if found:
+                        return found
+            return None
+
+        return walk(self.root, 0) or []
@@ -0,0 +1,272 @@
+"""Open-loop asyncio load generator compiled from the Gateway Postman collection.
+
+Every request item becomes a PlannedRequest: variables (``{{gateway_url}}``,
+``{{jwt_token}}``...) and path templates (``{id}``, ``:id``) are filled from
+``--var`` values, bearer auth becomes an Authorization header and raw bodies
+are sent as-is. Requests are drawn from a weighted mix and started on a
+Poisson schedule at ``--rate`` per second regardless of how fast responses
+come back (open loop), over a bounded keep-alive pool per target. With
+``--synthetic-bodies`` every JSON body is regenerated per request from its
+template (see ``tools.samples``), so writes do not all hit the same row or
+cache key.
+
+Latency is measured from each request's scheduled start, so time spent
+waiting for a pooled connection counts and a slow server cannot hide its
+backlog (no coordinated omission). The report gives throughput and
+p50/p95/p99 per route and per YARP route prefix (``/auth/*``, ``/users/*``...).
+Literal GUID and numeric path segments are reported as ``{id}``, so requests
+to the same endpoint share one route whatever ids the collection used.
+
+    python -m tools.loadgen --stub --rate 200 --duration 10
+    python -m tools.loadgen --target http://localhost:7032 --weight 'GET auth/**=5' --var jwt_token=...
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+
+from tools.engine import COLLECTION_PATH, iter_items, load_collection
+from tools.http import Client
+from tools.index import request_path, route_matches
+from tools.samples import SchemaGenerator
+from tools.stub import StubServer
+
+DEFAULT_ID = '00000000-0000-0000-0000-000000000001'
+
+_VARIABLE = re.compile(r'\{\{(\w+)\}\}')
+_PATH_PARAM = re.compile(r'(?<=/)(?:\{(\w+)\}|:(\w+))(?=/|\?|$)')
+_ID_SEGMENT = re.compile(r'(?<=/)(?:[0-9a-fA-F]{8}-(?:[0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}|\d+)(?=/|$)')
+
+
+class PlannedRequest:
+    __slots__ = ('name', 'method', 'route', 'service', 'url', 'headers', 'body', 'item', 'bodies')
+
+    def __init__(self, name, method, route, service, url, headers, body, item):
+        self.name = name
+        self.method = method
+        self.route = route
+        self.service = service
+        self.url = url
+        self.headers = headers
+        self.body = body
+        self.item = item
+        self.bodies = None
+
+
+def _fill(text, variables):
+    return _VARIABLE.sub(lambda m: str(variables.get(m.group(1), DEFAULT_ID)), text)
+
+
+def compile_plan(collection, variables):
+    """One PlannedRequest per request item, ready to send against ``variables['gateway_url']``."""
+    plan = []
+    for item in iter_items(collection):
+        req = item['request']
+        url = req.get('url', {})
+        raw = url.get('raw', '') if isinstance(url, dict) else str(url)
+        if not raw:
+            continue
+        method = (req.get('method') or 'GET').upper()
+        path = raw.split('?', 1)[0].replace('{{gateway_url}}', '') or '/'
+        segments = request_path(req)
+        url_text = _PATH_PARAM.sub(lambda m: str(variables.get(m.group(1) or m.group(2), DEFAULT_ID)), raw)
+        headers = {}
+        for h in req.get('header', []):
+            if isinstance(h, dict) and h.get('key') and not h.get('disabled'):
+                headers[h['key']] = _fill(str(h.get('value', '')), variables)
+        auth = req.get('auth') or {}
+        if auth.get('type') == 'bearer':
+            token = next((b.get('value') for b in auth.get('bearer', []) if b.get('key') == 'token'), '')
+            headers['Authorization'] = f"Bearer {_fill(token, variables)}"
+        body = req.get('body') or {}
+        payload = _fill(body.get('raw', ''), variables).encode('utf-8') if body.get('mode') == 'raw' else b''
+        plan.append(PlannedRequest(item.get('name', path), method, f"{method} {_ID_SEGMENT.sub('{id}', path)}",
+                                   segments[0] if segments else '', _fill(url_text, variables), headers, payload, item))
+    return plan
+
+
+def attach_synthetic_bodies(plan, seed=None, vary_ids=False):
+    """Give every request with a JSON object/array body an endless deterministic stream of varied bodies."""
+    for planned in plan:
+        try:
+            template = json.loads(planned.body) if planned.body else None
+        except ValueError:
+            continue
+        if isinstance(template, (dict, list)):
+            planned.bodies = SchemaGenerator(template, planned.route, seed or 0, vary_ids).bodies(256)
+
+
+def parse_weights(specs):
+    """'[METHOD ]route-pattern=weight' specs, first match wins (route patterns as in tools.index)."""
+    weights = []
+    for spec in specs:
+        pattern, sep, weight = spec.rpartition('=')
+        if not sep:
+            raise ValueError(f"Weight must look like PATTERN=WEIGHT: {spec}")
+        method, _, route = pattern.strip().rpartition(' ')
+        weights.append((method or None, route, float(weight)))
+    return weights
+
+
+def weigh(plan, weights):
+    result = []
+    for planned in plan:
+        request = planned.item['request']
+        weight = next((w for method, route, w in weights if route_matches(request, route, method)), 1.0)
+        result.append(weight)
+    return result
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, -(-q * len(sorted_values) // 100) - 1)]
+
+
+class RouteMetrics:
+    __slots__ = ('latencies', 'errors', 'statuses')
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.statuses = {}
+
+    def summary(self, elapsed):
+        values = sorted(self.latencies)
+        ms = lambda v: None if v is None else round(v * 1000, 2)
+        return {
+            'requests': len(values),
+            'errors': self.errors,
+            'statuses': dict(sorted(self.statuses.items())),
+            'rps': round(len(values) / elapsed, 2) if elapsed else None,
+            'p50_ms': ms(_percentile(values, 50)),
+            'p95_ms': ms(_percentile(values, 95)),
+            'p99_ms': ms(_percentile(values, 99)),
+            'max_ms': ms(values[-1] if values else None),
+        }
+
+
+async def run_load(plan, rate, duration, weights=None, connections=8, seed=None, timeout=30.0):
+    """Drive the plan open-loop; returns the report dict."""
+    rng = random.Random(seed)
+    mix = weigh(plan, weights or [])
+    if not any(mix):
+        raise ValueError("Every request in the plan has weight 0")
+    client = Client(connections, timeout)
+    routes = {}
+    services = {}
+    tasks = []
+    loop = asyncio.get_running_loop()
+
+    async def issue(planned, scheduled):
+        metrics = (routes.setdefault(planned.route, RouteMetrics()), services.setdefault(planned.service, RouteMetrics()))
+        try:
+            body = next(planned.bodies) if planned.bodies else planned.body
+            response = await client.request(planned.method, planned.url, planned.headers, body)
+            status = response.status
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+            status = None
+        latency = loop.time() - scheduled
+        for m in metrics:
+            m.latencies.append(latency)
+            key = str(status) if status else 'error'
+            m.statuses[key] = m.statuses.get(key, 0) + 1
+            if status is None or status >= 500:
+                m.errors += 1
+
+    start = loop.time()
+    at = start
+    while True:
+        at += rng.expovariate(rate)
+        if at - start >= duration:
+            break
+        delay = at - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        planned = rng.choices(plan, mix)[0]
+        tasks.append(asyncio.create_task(issue(planned, at)))
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - start
+    await client.close()
+
+    total = RouteMetrics()
+    for m in routes.values():
+        total.latencies.extend(m.latencies)
+        total.errors += m.errors
+        for status, count in m.statuses.items():
+            total.statuses[status] = total.statuses.get(status, 0) + count
+    return {
+        'rate': rate,
+        'duration_s': round(elapsed, 3),
+        'connections_opened': sum(p.opened for p in client.pools.values()),
+        'total': total.summary(elapsed),
+        'services': {f"/{s}/*": m.summary(elapsed) for s, m in sorted(services.items())},
+        'routes': {r: m.summary(elapsed) for r, m in sorted(routes.items())},
+    }
+
+
+def format_report(report):
+    header = f"{'route':<70} {'reqs':>6} {'err':>4} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}"
+    lines = [f"target {report.get('target', '')}  rate {report['rate']}/s  elapsed {report['duration_s']}s  "
+             f"connections {report['connections_opened']}", '', header]
+    for section in ('services', 'routes'):
+        for name, s in report[section].items():
+            lines.append(f"{name[:70]:<70} {s['requests']:>6} {s['errors']:>4} {s['rps']:>8} "
+                         f"{s['p50_ms']:>8} {s['p95_ms']:>8} {s['p99_ms']:>8}")
+        lines.append('')
+    t = report['total']
+    lines.append(f"{'total':<70} {t['requests']:>6} {t['errors']:>4} {t['rps']:>8} {t['p50_ms']:>8} {t['p95_ms']:>8} {t['p99_ms']:>8}")
+    return '\n'.join(lines)
+
+
+async def _main(args):
+    collection = load_collection(args.collection)
+    variables = dict(v.split('=', 1) for v in args.var)
+    stub = None
+    if args.stub:
+        stub = await StubServer(collection, args.stub_latency_ms / 1000).start()
+        target = stub.url
+    else:
+        target = args.target
+    variables.setdefault('gateway_url', target.rstrip('/'))
+    plan = compile_plan(collection, variables)
+    if args.synthetic_bodies:
+        attach_synthetic_bodies(plan, args.seed, args.vary_ids)
+    try:
+        report = await run_load(plan, args.rate, args.duration, parse_weights(args.weight),
+                                args.connections, args.seed, args.timeout)
+        report['target'] = variables['gateway_url']
+        return report
+    finally:
+        if stub:
+            await stub.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Open-loop load test generated from the Gateway Postman collection.")
+    parser.add_argument('--collection', default=COLLECTION_PATH)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--target', help="Gateway base URL, e.g. http://localhost:7032")
+    target.add_argument('--stub', action='store_true', help="run against an in-process stub serving the example responses")
+    parser.add_argument('--stub-latency-ms', type=float, default=0.0, help="fixed latency added by the stub")
+    parser.add_argument('--rate', type=float, default=50.0, help="mean arrivals per second (Poisson)")
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds of arrivals")
+    parser.add_argument('--connections', type=int, default=8, help="keep-alive connections per target")
+    parser.add_argument('--weight', action='append', default=[], metavar='[METHOD ]ROUTE=W',
+                        help="relative weight for matching requests, e.g. 'GET auth/**=5' or 'payments/**=0'")
+    parser.add_argument('--var', action='append', default=[], metavar='NAME=VALUE', help="collection variable value")
+    parser.add_argument('--seed', type=int, help="seed for the arrival schedule, request mix and synthetic bodies")
+    parser.add_argument('--synthetic-bodies', action='store_true',
+                        help="send a freshly generated body (tools.samples) with every JSON request")
+    parser.add_argument('--vary-ids', action='store_true', help="with --synthetic-bodies, also vary GUID fields")
+    parser.add_argument('--timeout', type=float, default=30.0)
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(_main(args))
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""Streaming reader and DbCommand analyzer for the captured Serilog / EF Core logs.
+
+The dumps (``auth_logs.txt``, ``ms_auth_logs.txt``, ``app_logs.txt``...) are a
+mix of UTF-16 (with BOM, as written by PowerShell redirection) and UTF-8 copies.
+``iter_records`` detects the encoding, reads the file through ``mmap`` with an
+incremental decoder and yields one Record per ``[HH:MM:SS LVL]`` entry, with
+continuation lines (SQL text, stack traces) attached. Nothing but the current
+record is held in memory, so multi-GB captures are processed in constant space.
+
+``analyze`` summarises ``Executed DbCommand (NNms)`` durations per service:
+p50/p95/p99 come from an exact per-millisecond histogram and the slowest
+commands from a bounded heap.
+
+    python -m tools.logs auth_logs.txt users=users_logs_utf8.txt --top 5
+"""
+import argparse
+import codecs
+import heapq
+import itertools
+import json
+import mmap
+import os
+import re
+from collections import Counter
+
+WINDOW = 1 << 20
+
+RECORD_HEADER = re.compile(r'^\[(\d\d:\d\d:\d\d) ([A-Z]{3})\] ?(.*)$')
+DB_COMMAND = re.compile(r"^(Executed|Failed executing) DbCommand \((\d+)ms\) \[Parameters=\[(.*?)\], CommandType='(\w+)', CommandTimeout='(\d+)'\]")
+
+
+def detect_encoding(head):
+    """Codec for a file from its first bytes: BOM first, then the NUL pattern of BOM-less UTF-16."""
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if head.startswith(codecs.BOM_UTF16_LE) or head.startswith(codecs.BOM_UTF16_BE):
+        return 'utf-16'
+    sample = head[:4096]
+    if len(sample) >= 4:
+        if sample[1::2].count(0) > len(sample) // 4 and sample[0::2].count(0) == 0:
+            return 'utf-16-le'
+        if sample[0::2].count(0) > len(sample) // 4 and sample[1::2].count(0) == 0:
+            return 'utf-16-be'
+    return 'utf-8'
+
+
+def iter_lines(path, window=WINDOW):
+    """Decoded lines (without line terminators) of a log file, read window by window through mmap."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            decoder = codecs.getincrementaldecoder(detect_encoding(mm[:4096]))(errors='replace')
+            pending = ''
+            for offset in range(0, len(mm), window):
+                pending += decoder.decode(mm[offset:offset + window])
+                lines = pending.split('\n')
+                pending = lines.pop()
+                for line in lines:
+                    yield line.rstrip('\r')
+            pending += decoder.decode(b'', final=True)
+            if pending:
+                yield pending.rstrip('\r')
+
+
+def service_from_path(path):
+    """'ms_auth_logs.txt' -> 'auth', 'users_logs_utf8.txt' -> 'users'."""
+    stem = os.path.splitext(os.path.basename(path))[0].lower()
+    for suffix in ('_utf8', '_utf16', '_logs', '_log'):
+        if stem.endswith(suffix):
+            stem = stem[:-len(suffix)]
+    if stem.startswith('ms_'):
+        stem = stem[3:]
+    return stem
+
+
+class Record:
+    __slots__ = ('service', 'source', 'time', 'level', 'message', 'lines', 'line_no')
+
+    def __init__(self, service, source, time, level, message, line_no):
+        self.service = service
+        self.source = source
+        self.time = time
+        self.level = level
+        self.message = message
+        self.lines = []
+        self.line_no = line_no
+
+    @property
+    def text(self):
+        return '\n'.join(itertools.chain((self.message,), self.lines))
+
+    def db_command(self):
+        """(status, duration ms, parameters, sql) for EF Core command records, else None."""
+        m = DB_COMMAND.match(self.message)
+        if not m:
+            return None
+        return m.group(1), int(m.group(2)), m.group(3), '\n'.join(self.lines).strip()
+
+
+def iter_records(path, service=None):
+    service = service or service_from_path(path)
+    record = None
+    for line_no, line in enumerate(iter_lines(path), 1):
+        m = RECORD_HEADER.match(line)
+        if m:
+            if record is not None:
+                yield record
+            record = Record(service, path, m.group(1), m.group(2), m.group(3), line_no)
+        elif record is not None:
+            record.lines.append(line)
+        # Lines before the first header (a truncated capture) have no record to belong to
+    if record is not None:
+        yield record
+
+
+def percentile(histogram, total, q):
+    """Exact nearest-rank percentile from a {value: count} histogram."""
+    if not total:
+        return None
+    rank = max(1, -(-q * total // 100))
+    seen = 0
+    for value in sorted(histogram):
+        seen += histogram[value]
+        if seen >= rank:
+            return value
+
+
+class CommandStats:
+    def __init__(self, top=10):
+        self.top = top
+        self.histogram = Counter()
+        self.count = 0
+        self.failed = 0
+        self.total_ms = 0
+        self.slowest = []
+        self._seq = itertools.count()
+
+    def add(self, record, status, duration, sql):
+        self.histogram[duration] += 1
+        self.count += 1
+        self.total_ms += duration
+        if status != 'Executed':
+            self.failed += 1
+        entry = (duration, next(self._seq), record.time, record.source, record.line_no, sql)
+        if len(self.slowest) < self.top:
+            heapq.heappush(self.slowest, entry)
+        elif duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def summary(self):
+        return {
+            'commands': self.count,
+            'failed': self.failed,
+            'total_ms': self.total_ms,
+            'mean_ms': round(self.total_ms / self.count, 2) if self.count else None,
+            'p50_ms': percentile(self.histogram, self.count, 50),
+            'p95_ms': percentile(self.histogram, self.count, 95),
+            'p99_ms': percentile(self.histogram, self.count, 99),
+            'max_ms': max(self.histogram) if self.histogram else None,
+            'slowest': [
+                {'duration_ms': d, 'time': t, 'source': src, 'line': n, 'sql': sql}
+                for d, _, t, src, n, sql in sorted(self.slowest, key=lambda e: (-e[0], e[1]))
+            ],
+        }
+
+
+def analyze(sources, top=10):
+    """Per-service DbCommand statistics for (service, path) pairs; a service may span several files."""
+    stats = {}
+    for service, path in sources:
+        for record in iter_records(path, service):
+            command = record.db_command()
+            if command is None:
+                continue
+            status, duration, _, sql = command
+            stats.setdefault(record.service, CommandStats(top)).add(record, status, duration, sql)
+    return {service: s.summary() for service, s in sorted(stats.items())}
+
+
+def parse_source(arg):
+    """'path' or 'service=path'."""
+    service, sep, path = arg.partition('=')
+    if not sep:
+        return service_from_path(arg), arg
+    return service, path
+
+
+def format_report(report, sql_width=100):
+    lines = [f"{'service':<12} {'commands':>8} {'failed':>6} {'mean':>8} {'p50':>6} {'p95':>6} {'p99':>6} {'max':>6}"]
+    for service, s in report.items():
+        lines.append(f"{service:<12} {s['commands']:>8} {s['failed']:>6} {s['mean_ms']:>8} "
+                     f"{s['p50_ms']:>6} {s['p95_ms']:>6} {s['p99_ms']:>6} {s['max_ms']:>6}")
+    for service, s in report.items():
+        lines.append('')
+        lines.append(f"Slowest commands ({service}):")
+        for c in s['slowest']:
+            sql = ' '.join(c['sql'].split())
+            where = f"{os.path.basename(c['source'])}:{c['line']}"
+            lines.append(f"  {c['duration_ms']:>6}ms  {c['time']}  {where:<24} {sql[:sql_width]}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="DbCommand latency report for captured EF Core / Serilog logs.")
+    parser.add_argument('sources', nargs='+', metavar='[SERVICE=]PATH')
+    parser.add_argument('--top', type=int, default=10, help="slowest commands to list per service")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = analyze([parse_source(s) for s in args.sources], args.top)
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+
+
+if __name__ == '__main__':
+    main()
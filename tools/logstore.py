@@ -0,0 +1,582 @@
+"""Columnar, time-indexed store for the captured service logs.
+
+``ingest`` parses the dumps once (through ``tools.logs.iter_records``) into
+typed columns held in ``array.array``:
+
+    ts        int64    epoch seconds (the logs carry HH:MM:SS only; see below)
+    level     uint8    index into the interned levels
+    service   uint16   index into the interned services
+    template  uint32   message with numbers and GUIDs replaced by <*>, interned
+    args      uint64 offset + uint32 length of the replaced values in the text heap
+    detail    uint64 offset + uint32 length of the continuation lines (SQL, stack
+                       traces) in the text heap; length 0 = none
+    duration  float32  ms from "(NNms)" / "in NN ms", NaN when absent
+    source    uint16   file the record came from, with its line number in ``line``
+
+Only the low-cardinality pools (levels, services, templates, sources) are
+interned into the JSON header. Args and details are nearly one per record,
+so they go to a UTF-8 text heap after the columns. It is read only when a
+record is rendered; filters, counts and stats never touch it.
+
+Each ingested source is sorted on its own and appended as a segment, a run of
+rows sorted by ``ts``, so ingest costs the size of the new batch and not of
+the store. Within a segment the column itself is the time index: a range is
+two bisects, and a time-of-day window ("10:55 to 11:00 on any day") is two
+bisects per day. The matches of every segment are merged in time order.
+Level, service, template and duration filters compare small integers inside
+the ranges only. Once there are more than ``MAX_SEGMENTS``, ingest merges
+them into one (``compact`` does it on demand). Unchanged sources (size,
+mtime, SHA-256) are skipped on re-ingest, and a changed one replaces its old
+rows.
+
+Each source needs a date. Pass it as ``path@YYYY-MM-DD``. Otherwise it is
+inferred from the file's mtime, counting midnight rollovers back from the
+last record.
+
+    python -m tools.logstore ingest auth_logs.txt users=users_logs.txt@2026-10-17
+    python -m tools.logstore query --between 10:55 11:00 --level WRN
+    python -m tools.logstore query --service auth --template DbCommand --min-duration 100 --count-by template
+    python -m tools.logstore compact
+"""
+import argparse
+import array
+import bisect
+import calendar
+import datetime
+import hashlib
+import heapq
+import itertools
+import json
+import math
+import os
+import re
+import struct
+import time
+from collections import Counter
+
+from tools.config import CONFIG
+from tools.logs import iter_records, parse_source
+from tools.writer import atomic_open
+
+STORE_FILE = '.logstore'
+MAGIC = b'MSLOGS\x02\n'
+_HEADER_LEN = struct.Struct('<I')
+DAY = 86400
+MAX_SEGMENTS = 16
+
+COLUMNS = (
+    ('ts', 'q'),
+    ('level', 'B'),
+    ('service', 'H'),
+    ('template', 'I'),
+    ('args_off', 'Q'),
+    ('args_len', 'I'),
+    ('detail_off', 'Q'),
+    ('detail_len', 'I'),
+    ('duration', 'f'),
+    ('source', 'H'),
+    ('line', 'I'),
+)
+POOLS = ('levels', 'services', 'templates', 'sources')
+
+VARIABLE = re.compile(r'[0-9a-fA-F]{8}-(?:[0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12}|(?<![\w@.-])-?\d+(?:\.\d+)?(?!\d)')
+DURATION = re.compile(r'\((\d+(?:\.\d+)?) ?ms\)|\bin (\d+(?:\.\d+)?) ?ms\b')
+PLACEHOLDER = '<*>'
+_SEP = '\x1f'
+
+
+def split_template(message):
+    """(template, args): variable tokens become a NUL marker in the template and are returned in order."""
+    args = []
+
+    def repl(m):
+        args.append(m.group(0))
+        return '\0'
+
+    return VARIABLE.sub(repl, message), args
+
+
+def render_template(template, args):
+    parts = template.split('\0')
+    out = [parts[0]]
+    for arg, part in zip(args, parts[1:]):
+        out.append(arg)
+        out.append(part)
+    return ''.join(out)
+
+
+def _tod(hms):
+    h, m, s = hms.split(':')
+    return int(h) * 3600 + int(m) * 60 + int(s)
+
+
+def infer_start_date(path, tods):
+    """Date of the first record: the mtime's date, less one day per midnight rollover in the file."""
+    mtime = datetime.datetime.fromtimestamp(os.stat(path).st_mtime)
+    days = sum(1 for a, b in zip(tods, tods[1:]) if b < a)
+    if tods and tods[-1] > mtime.hour * 3600 + mtime.minute * 60 + mtime.second:
+        days += 1
+    return mtime.date() - datetime.timedelta(days=days)
+
+
+def parse_spec(arg):
+    """'[service=]path[@YYYY-MM-DD]' -> (service, path, date or None)."""
+    service, path = parse_source(arg)
+    head, sep, tail = path.rpartition('@')
+    if sep and re.fullmatch(r'\d{4}-\d\d-\d\d', tail):
+        return service, head, datetime.date.fromisoformat(tail)
+    return service, path, None
+
+
+def parse_when(value):
+    """('abs', epoch) for 'YYYY-MM-DD[ HH:MM[:SS]]', ('tod', seconds) for 'HH:MM[:SS]'."""
+    value = value.strip().replace('T', ' ')
+    if re.fullmatch(r'\d\d?:\d\d(:\d\d)?', value):
+        return 'tod', _tod(value if value.count(':') == 2 else value + ':00')
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return 'abs', calendar.timegm(time.strptime(value, fmt))
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised time: {value!r}")
+
+
+class Interner:
+    __slots__ = ('values', 'ids')
+
+    def __init__(self, values=()):
+        self.values = list(values)
+        self.ids = {v: i for i, v in enumerate(self.values)}
+
+    def __call__(self, value):
+        i = self.ids.get(value)
+        if i is None:
+            i = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return i
+
+    def __len__(self):
+        return len(self.values)
+
+
+def _fingerprint(path):
+    st = os.stat(path)
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': h.hexdigest()}
+
+
+class TextHeap:
+    """Append-only UTF-8 bytes addressed by (offset, length), loaded from the store file on first use."""
+
+    def __init__(self, data=b'', loader=None, size=0):
+        self._data = None if loader else bytearray(data)
+        self._loader = loader
+        self._size = size
+        self._batch = {}  # text -> (offset, length), shared by repeats within one ingest
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = bytearray(self._loader())
+            self._loader = None
+        return self._data
+
+    def add(self, text):
+        if not text:
+            return 0, 0
+        ref = self._batch.get(text)
+        if ref is None:
+            raw = text.encode('utf-8')
+            ref = self._batch[text] = (len(self.data), len(raw))
+            self.data.extend(raw)
+        return ref
+
+    def __len__(self):
+        return self._size if self._data is None else len(self._data)
+
+    def get(self, offset, length):
+        return self.data[offset:offset + length].decode('utf-8') if length else ''
+
+    def end_batch(self):
+        self._batch.clear()
+
+
+def _heap_loader(path, offset, size):
+    mtime_ns = os.stat(path).st_mtime_ns
+
+    def load():
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_mtime_ns != mtime_ns:
+                raise ValueError(f"{path} changed since it was loaded")
+            f.seek(offset)
+            return f.read(size)
+
+    return load
+
+
+class LogStore:
+    def __init__(self):
+        self.columns = {name: array.array(code) for name, code in COLUMNS}
+        self.levels = Interner()
+        self.services = Interner()
+        self.templates = Interner()
+        self.text = TextHeap()
+        self.sources = Interner()
+        self.source_meta = {}
+        self.segments = []  # [start, end, [source ids]]: rows [start, end) sorted by ts
+
+    def __len__(self):
+        return len(self.columns['ts'])
+
+    # -- persistence
+
+    @classmethod
+    def load(cls, path):
+        store = cls()
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a log store of this version; rebuild it with ingest")
+            (length,) = _HEADER_LEN.unpack(f.read(_HEADER_LEN.size))
+            header = json.loads(f.read(length))
+            for name, code, nbytes in header['columns']:
+                column = array.array(code)
+                column.frombytes(f.read(nbytes))
+                store.columns[name] = column
+            store.text = TextHeap(loader=_heap_loader(path, f.tell(), header['text_bytes']),
+                                  size=header['text_bytes'])
+        for pool in POOLS:
+            setattr(store, pool, Interner(header['pools'][pool]))
+        store.source_meta = header['source_meta']
+        store.segments = header['segments']
+        return store
+
+    def save(self, path):
+        header = {
+            'rows': len(self),
+            'columns': [[name, code, len(self.columns[name]) * self.columns[name].itemsize] for name, code in COLUMNS],
+            'pools': {pool: getattr(self, pool).values for pool in POOLS},
+            'source_meta': self.source_meta,
+            'segments': self.segments,
+            'text_bytes': len(self.text.data),
+        }
+        raw = json.dumps(header, separators=(',', ':')).encode('utf-8')
+        with atomic_open(path, binary=True) as f:
+            f.write(MAGIC)
+            f.write(_HEADER_LEN.pack(len(raw)))
+            f.write(raw)
+            for name, _ in COLUMNS:
+                self.columns[name].tofile(f)
+            f.write(self.text.data)
+
+    # -- ingest
+
+    def _drop_source(self, source_id):
+        """Remove a source's rows. Segments without it are copied as slices, in C; only the
+        segments it shares with other sources are filtered row by row."""
+        if not any(source_id in sources for _, _, sources in self.segments):
+            return
+        old = self.columns
+        columns = {name: array.array(code) for name, code in COLUMNS}
+        segments = []
+        for start, end, sources in self.segments:
+            if sources == [source_id]:
+                continue
+            if source_id in sources:
+                keep = [i for i in range(start, end) if old['source'][i] != source_id]
+                for name, code in COLUMNS:
+                    columns[name].extend(array.array(code, [old[name][i] for i in keep]))
+                sources = [s for s in sources if s != source_id]
+            else:
+                for name, _ in COLUMNS:
+                    columns[name].extend(old[name][start:end])
+            new_start = segments[-1][1] if segments else 0
+            if len(columns['ts']) > new_start:
+                segments.append([new_start, len(columns['ts']), sources])
+        self.columns.update(columns)
+        self.segments = segments
+
+    def _permute(self, order, start=0):
+        """Reorder rows [start, start + len(order)) of every column."""
+        for name, code in COLUMNS:
+            column = self.columns[name]
+            column[start:start + len(order)] = array.array(code, [column[i] for i in order])
+
+    def compact(self):
+        """Merge every segment into one sorted run."""
+        if len(self.segments) <= 1:
+            return False
+        ts = self.columns['ts']
+        # heapq.merge is stable across its inputs, so equal timestamps keep segment order
+        order = list(heapq.merge(*(range(start, end) for start, end, _ in self.segments), key=ts.__getitem__))
+        self._permute(order)
+        self.segments = [[0, len(ts), sorted({s for seg in self.segments for s in seg[2]})]]
+        self._compact_text()
+        return True
+
+    def _compact_text(self):
+        """Rewrite the text heap with only the bytes live rows point at (replaced sources leave garbage)."""
+        data, heap, moved = self.text.data, TextHeap(), {}
+        for field in ('args', 'detail'):
+            offsets, lengths = self.columns[f'{field}_off'], self.columns[f'{field}_len']
+            for i in range(len(offsets)):
+                if lengths[i]:
+                    ref = (offsets[i], lengths[i])
+                    if ref not in moved:
+                        moved[ref] = len(heap.data)
+                        heap.data.extend(data[ref[0]:ref[0] + ref[1]])
+                    offsets[i] = moved[ref]
+        self.text = heap
+
+    def ingest(self, specs):
+        """Add (service, path, date) sources; returns {path: rows added} (None for unchanged sources)."""
+        added = {}
+        cols = self.columns
+        for service, path, date in specs:
+            key = os.path.abspath(path)
+            meta = _fingerprint(path)
+            old = self.source_meta.get(key)
+            if old and old['sha256'] == meta['sha256'] and old['service'] == service and \
+                    (date is None or old['date'] == date.isoformat()):
+                added[path] = None
+                continue
+            source_id = self.sources(key)
+            if old:
+                self._drop_source(source_id)
+            start = len(cols['ts'])
+            tods = array.array('i')
+            service_id = self.services(service)
+            for record in iter_records(path, service):
+                template, args = split_template(record.message)
+                m = DURATION.search(record.message)
+                tods.append(_tod(record.time))
+                cols['level'].append(self.levels(record.level))
+                cols['service'].append(service_id)
+                cols['template'].append(self.templates(template))
+                offset, length = self.text.add(_SEP.join(args))
+                cols['args_off'].append(offset)
+                cols['args_len'].append(length)
+                offset, length = self.text.add('\n'.join(record.lines).strip())
+                cols['detail_off'].append(offset)
+                cols['detail_len'].append(length)
+                cols['duration'].append(float(m.group(1) or m.group(2)) if m else math.nan)
+                cols['source'].append(source_id)
+                cols['line'].append(record.line_no)
+            date = date or infer_start_date(path, tods)
+            day = calendar.timegm(date.timetuple())
+            previous = None
+            for tod in tods:
+                if previous is not None and tod < previous:
+                    day += DAY
+                cols['ts'].append(day + tod)
+                previous = tod
+            meta.update(service=service, date=date.isoformat(), rows=len(tods))
+            self.source_meta[key] = meta
+            end = len(cols['ts'])
+            added[path] = end - start
+            if end > start:
+                ts = cols['ts']
+                if any(ts[i] > ts[i + 1] for i in range(start, end - 1)):
+                    # Stable: records sharing a second keep their file order
+                    self._permute(sorted(range(start, end), key=ts.__getitem__), start)
+                self.segments.append([start, end, [source_id]])
+        self.text.end_batch()
+        if len(self.segments) > MAX_SEGMENTS:
+            self.compact()
+        return added
+
+    # -- queries
+
+    def _ranges(self, lo, hi, since=None, until=None, between=None):
+        """Row ranges within the sorted segment [lo, hi) for an absolute window, optionally narrowed
+        to a time of day on every day."""
+        ts = self.columns['ts']
+        if lo >= hi:
+            return []
+        if between is None:
+            return [(lo if since is None else bisect.bisect_left(ts, since, lo, hi),
+                     hi if until is None else bisect.bisect_left(ts, until, lo, hi))]
+        first, last = ts[lo] - ts[lo] % DAY, ts[hi - 1] - ts[hi - 1] % DAY
+        tod_from, tod_to = between
+        ranges = []
+        wraps = tod_to <= tod_from
+        # A window that wraps midnight and opens the day before still covers the first day's early hours
+        for day in range(first - DAY if wraps else first, last + DAY, DAY):
+            start, end = day + tod_from, day + tod_to
+            if wraps:
+                end += DAY
+            start = max(start, since) if since is not None else start
+            end = min(end, until) if until is not None else end
+            if start < end:
+                ranges.append((bisect.bisect_left(ts, start, lo, hi), bisect.bisect_left(ts, end, lo, hi)))
+        return ranges
+
+    def select(self, since=None, until=None, between=None, levels=None, services=None, template=None,
+               min_duration=None, limit=None):
+        """Row numbers in time order. ``between`` is (from, to) seconds after midnight, end exclusive."""
+        cols = self.columns
+        tests = []
+        if levels:
+            ids = {self.levels.ids[lv] for lv in levels if lv in self.levels.ids}
+            tests.append((cols['level'], ids))
+        if services:
+            ids = {self.services.ids[s] for s in services if s in self.services.ids}
+            tests.append((cols['service'], ids))
+        if template:
+            needle = template.lower()
+            ids = {i for i, t in enumerate(self.templates.values) if needle in t.replace('\0', PLACEHOLDER).lower()}
+            tests.append((cols['template'], ids))
+        if any(not ids for _, ids in tests):
+            return []
+        duration = cols['duration']
+
+        def scan(start, end):
+            for lo, hi in self._ranges(start, end, since, until, between):
+                for i in range(lo, hi):
+                    if all(column[i] in ids for column, ids in tests) and \
+                            (min_duration is None or duration[i] >= min_duration):
+                        yield i
+
+        scans = [scan(start, end) for start, end, _ in self.segments]
+        rows = scans[0] if len(scans) == 1 else heapq.merge(*scans, key=cols['ts'].__getitem__)
+        return list(itertools.islice(rows, limit or None))
+
+    def record(self, i):
+        cols = self.columns
+        args = self.text.get(cols['args_off'][i], cols['args_len'][i])
+        duration = cols['duration'][i]
+        return {
+            'time': datetime.datetime.fromtimestamp(cols['ts'][i], datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+            'level': self.levels.values[cols['level'][i]],
+            'service': self.services.values[cols['service'][i]],
+            'message': render_template(self.templates.values[cols['template'][i]], args.split(_SEP) if args else []),
+            'duration_ms': None if math.isnan(duration) else round(duration, 3),
+            'detail': self.text.get(cols['detail_off'][i], cols['detail_len'][i]),
+            'source': _display(self.sources.values[cols['source'][i]]),
+            'line': cols['line'][i],
+        }
+
+    def count_by(self, rows, column):
+        """Counter of level / service / template names over the given rows."""
+        pool = {'level': self.levels, 'service': self.services, 'template': self.templates}[column].values
+        values = self.columns[column]
+        counts = Counter(values[i] for i in rows)
+        return Counter({pool[k].replace('\0', PLACEHOLDER): v for k, v in counts.items()})
+
+    def stats(self):
+        return {
+            'rows': len(self),
+            'bytes': sum(len(c) * c.itemsize for c in self.columns.values()),
+            'text_bytes': len(self.text),
+            'segments': len(self.segments),
+            'templates': len(self.templates),
+            'with_detail': sum(1 for n in self.columns['detail_len'] if n),
+            'services': dict(self.count_by(range(len(self)), 'service')),
+            'levels': dict(self.count_by(range(len(self)), 'level')),
+            'sources': {_display(k): {'service': m['service'], 'date': m['date'], 'rows': m['rows']}
+                        for k, m in self.source_meta.items()},
+        }
+
+
+def _display(path):
+    rel = os.path.relpath(path, CONFIG['root'])
+    return path if rel.startswith('..') else rel.replace(os.sep, '/')
+
+
+def open_store(path):
+    """The store at path, or an empty one if it is missing or from an older format (it is rebuilt from the sources)."""
+    if not os.path.exists(path):
+        return LogStore()
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            return LogStore()
+    return LogStore.load(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Columnar time-indexed store for the captured service logs.")
+    parser.add_argument('--store', default=os.path.join(CONFIG['root'], STORE_FILE))
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    commands = parser.add_subparsers(dest='command', required=True)
+    ingest = commands.add_parser('ingest', help="add or refresh log files")
+    ingest.add_argument('sources', nargs='+', metavar='[SERVICE=]PATH[@YYYY-MM-DD]')
+    query = commands.add_parser('query', help="select records")
+    query.add_argument('--since', help="YYYY-MM-DD[ HH:MM[:SS]]")
+    query.add_argument('--until', help="YYYY-MM-DD[ HH:MM[:SS]] (exclusive)")
+    query.add_argument('--between', nargs=2, metavar=('FROM', 'TO'), help="time of day window on every day, HH:MM[:SS]")
+    query.add_argument('--level', action='append', help="repeatable, e.g. --level WRN --level ERR")
+    query.add_argument('--service', action='append', help="repeatable")
+    query.add_argument('--template', help="case-insensitive substring of the message template")
+    query.add_argument('--min-duration', type=float, help="only records with a duration of at least this many ms")
+    query.add_argument('--limit', type=int, default=50, help="records to print (0 = all)")
+    query.add_argument('--count-by', choices=('level', 'service', 'template'), help="print counts instead of records")
+    commands.add_parser('stats', help="summarise the store")
+    commands.add_parser('compact', help="merge the store's segments into one sorted run")
+    args = parser.parse_args(argv)
+
+    if args.command == 'ingest':
+        store = open_store(args.store)
+        started = time.perf_counter()
+        added = store.ingest([parse_spec(s) for s in args.sources])
+        if any(added.values()):
+            store.save(args.store)
+        for path, rows in added.items():
+            print(f"{path}: {'unchanged' if rows is None else f'{rows} records'}")
+        print(f"{len(store)} records, {len(store.templates)} templates ({(time.perf_counter() - started) * 1000:.1f} ms)")
+        return
+
+    started = time.perf_counter()
+    try:
+        store = LogStore.load(args.store)
+    except (OSError, ValueError) as exc:
+        parser.error(str(exc))
+    loaded = time.perf_counter()
+    if args.command == 'compact':
+        segments = len(store.segments)
+        if store.compact():
+            store.save(args.store)
+        print(f"{segments} segment(s) -> {len(store.segments)} ({(time.perf_counter() - loaded) * 1000:.1f} ms)")
+        return
+    if args.command == 'stats':
+        print(json.dumps(store.stats(), indent=2))
+        return
+
+    window = {}
+    for name in ('since', 'until'):
+        if getattr(args, name):
+            kind, value = parse_when(getattr(args, name))
+            if kind != 'abs':
+                parser.error(f"--{name} needs a date")
+            window[name] = value
+    if args.between:
+        (k1, v1), (k2, v2) = map(parse_when, args.between)
+        if k1 != 'tod' or k2 != 'tod':
+            parser.error("--between takes times of day")
+        window['between'] = (v1, v2)
+    limit = None if args.count_by else args.limit or None
+    rows = store.select(levels=args.level, services=args.service, template=args.template,
+                        min_duration=args.min_duration, limit=limit, **window)
+    queried = time.perf_counter()
+    timing = f"{len(rows)} records (load {(loaded - started) * 1000:.1f} ms, query {(queried - loaded) * 1000:.2f} ms)"
+    if args.count_by:
+        counts = store.count_by(rows, args.count_by).most_common()
+        if args.json:
+            print(json.dumps(dict(counts), indent=2))
+        else:
+            for name, n in counts:
+                print(f"{n:>8}  {name}")
+            print(timing)
+        return
+    records = [store.record(i) for i in rows]
+    if args.json:
+        print(json.dumps(records, indent=2))
+        return
+    for r in records:
+        print(f"{r['time']} {r['level']} {r['service']:<10} {r['message'][:160]}")
+    print(timing)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""Per-rule instrumentation for the collection and README passes.
+
+Pass a Profile to ``run``/``run_stream``/``run_readme`` and it records, for
+every rule: items visited (the rule's predicate was evaluated) versus
+matched (its transform ran), wall time, and bodies parsed and marked dirty
+while it ran (for README section rules, matched counts the sections the
+rule actually changed). The passes add phase timings (parse, index, rules, flush,
+diff, write) and counters (items, bodies serialised, bytes read and
+written). Without a Profile the engine takes its uninstrumented path.
+
+Scripts expose it through ``add_profile_arguments``: ``--profile`` prints
+the table, ``--profile-json PATH`` writes the JSON. Two JSON files from
+different runs can be compared to catch regressions as the collection grows:
+
+    python -m tools.profile before.json after.json --threshold 25
+"""
+import argparse
+import contextlib
+import json
+import sys
+import time
+
+PROFILE_VERSION = 1
+
+
+class RuleStats:
+    __slots__ = ('name', 'rule_set', 'kind', 'visited', 'matched', 'seconds', 'parsed', 'dirtied')
+
+    def __init__(self, name, rule_set, kind):
+        self.name = name
+        self.rule_set = rule_set
+        self.kind = kind
+        self.visited = 0
+        self.matched = 0
+        self.seconds = 0.0
+        self.parsed = 0
+        self.dirtied = 0
+
+    def to_dict(self):
+        return {'name': self.name, 'rule_set': self.rule_set, 'kind': self.kind, 'visited': self.visited,
+                'matched': self.matched, 'ms': round(self.seconds * 1000, 3),
+                'bodies_parsed': self.parsed, 'bodies_dirtied': self.dirtied}
+
+
+class Profile:
+    def __init__(self):
+        self.rules = {}
+        self.phases = {}
+        self.counters = {}
+
+    def rule(self, rule, kind='collection'):
+        key = (kind, rule.name)
+        if key not in self.rules:
+            self.rules[key] = RuleStats(rule.name, getattr(rule, 'rule_set', None), kind)
+        return self.rules[key]
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def to_dict(self):
+        return {
+            'version': PROFILE_VERSION,
+            'phases_ms': {k: round(v * 1000, 3) for k, v in self.phases.items()},
+            'counters': dict(self.counters),
+            'rules': [s.to_dict() for s in self.rules.values()],
+        }
+
+
+class NullProfile:
+    """Stand-in so the passes can time phases unconditionally when no profile was requested."""
+
+    def __bool__(self):
+        return False
+
+    def phase(self, name):
+        return contextlib.nullcontext()
+
+    def count(self, name, n=1):
+        pass
+
+
+NULL_PROFILE = NullProfile()
+
+
+def format_table(profile):
+    data = profile.to_dict() if isinstance(profile, Profile) else profile
+    lines = [f"{'rule':<34} {'kind':<10} {'visited':>8} {'matched':>8} {'ms':>9} {'parsed':>7} {'dirtied':>8}"]
+    for r in data['rules']:
+        lines.append(f"{r['name'][:34]:<34} {r['kind']:<10} {r['visited']:>8} {r['matched']:>8} {r['ms']:>9.3f} "
+                     f"{r['bodies_parsed']:>7} {r['bodies_dirtied']:>8}")
+    lines.append('')
+    lines.append('  '.join(f"{k} {v:.3f}ms" for k, v in data['phases_ms'].items()))
+    lines.append('  '.join(f"{k} {v}" for k, v in data['counters'].items()))
+    return '\n'.join(lines)
+
+
+def add_profile_arguments(parser):
+    parser.add_argument('--profile', action='store_true', help="print per-rule timings and counters")
+    parser.add_argument('--profile-json', metavar='PATH', help="write the profile as JSON ('-' for stdout)")
+
+
+def profile_from_args(args):
+    return Profile() if args.profile or args.profile_json else None
+
+
+def report(profile, args):
+    """Print and/or save the profile as requested on the command line."""
+    if profile is None:
+        return
+    if args.profile:
+        print(format_table(profile))
+    if args.profile_json == '-':
+        print(json.dumps(profile.to_dict(), indent=2))
+    elif args.profile_json:
+        with open(args.profile_json, 'w', encoding='utf-8') as f:
+            json.dump(profile.to_dict(), f, indent=2)
+
+
+def compare(before, after, threshold=20.0, min_ms=0.5):
+    """Rows (name, before ms, after ms, change %, regressed) for rules and phases present in both runs.
+
+    A row regresses when it got ``threshold`` percent slower and by at least ``min_ms``.
+    """
+    rows = []
+
+    def add(name, old, new):
+        change = (new - old) / old * 100 if old else (0.0 if not new else float('inf'))
+        rows.append((name, old, new, change, change > threshold and new - old >= min_ms))
+
+    old_rules = {(r['kind'], r['name']): r for r in before['rules']}
+    for r in after['rules']:
+        old = old_rules.get((r['kind'], r['name']))
+        if old:
+            add(f"{r['kind']}:{r['name']}", old['ms'], r['ms'])
+    for name, ms in after['phases_ms'].items():
+        if name in before['phases_ms']:
+            add(f"phase:{name}", before['phases_ms'][name], ms)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two --profile-json outputs.")
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=20.0, help="percent slowdown counted as a regression")
+    parser.add_argument('--min-ms', type=float, default=0.5, help="ignore slowdowns smaller than this")
+    args = parser.parse_args(argv)
+
+    with open(args.before, 'r', encoding='utf-8') as f:
+        before = json.load(f)
+    with open(args.after, 'r', encoding='utf-8') as f:
+        after = json.load(f)
+    rows = compare(before, after, args.threshold, args.min_ms)
+    print(f"{'':<46} {'before':>9} {'after':>9} {'change':>8}")
+    for name, old, new, change, regressed in rows:
+        print(f"{name[:46]:<46} {old:>9.3f} {new:>9.3f} {change:>+7.1f}%{'  REGRESSION' if regressed else ''}")
+    for key in sorted(set(before['counters']) | set(after['counters'])):
+        old, new = before['counters'].get(key), after['counters'].get(key)
+        if old != new:
+            print(f"{key}: {old} -> {new}")
+    if any(row[4] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
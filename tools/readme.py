@@ -0,0 +1,209 @@
+"""Section-indexed model of the Gateway README.
+
+The endpoint documentation is a run of ``#### `METHOD` /path`` sections, one
+per collection request. The README is scanned once into literal chunks and
+Section objects, and the sections are indexed in a RouteIndex by the same
+route key the collection uses (method plus templated path segments). README
+edits are registered as section rules next to the collection rules
+(``@rules.section(route=...)``) and only touch the sections they select;
+when the caller passes the routes that changed in the collection, every
+other section is left alone. Unchanged sections are written back verbatim.
+"""
+import os
+import re
+import time
+
+from tools.index import PARAM, RouteIndex, split_path
+from tools.profile import NULL_PROFILE
+from tools.writer import write_text
+
+_HEADING = re.compile(r'#{1,4} ')
+_ENDPOINT = re.compile(r'#### `([A-Z]+)` (\S+)')
+_FENCE = re.compile(r'^```(\w*)[ \t]*\n(.*?)^```[ \t]*$', re.M | re.S)
+
+
+class Section:
+    """One ``#### `METHOD` /path`` block, from its heading up to the next heading."""
+
+    __slots__ = ('method', 'path', 'key', 'text', 'original', 'order')
+
+    def __init__(self, method, path, text, order):
+        self.method = method
+        self.path = path
+        self.key = (method, tuple(split_path(path)))
+        self.text = self.original = text
+        self.order = order
+
+    @property
+    def dirty(self):
+        return self.text != self.original
+
+    def fences(self, lang='json'):
+        """(start, end) offsets of the contents of each fenced block in the given language."""
+        return [m.span(2) for m in _FENCE.finditer(self.text) if m.group(1) == lang]
+
+    def map_fences(self, fn, lang='json'):
+        """Replace each fenced block's contents with ``fn(contents)``."""
+        parts = []
+        pos = 0
+        for start, end in self.fences(lang):
+            parts.append(self.text[pos:start])
+            parts.append(fn(self.text[start:end]))
+            pos = end
+        parts.append(self.text[pos:])
+        self.text = ''.join(parts)
+
+    def _field(self, label):
+        return re.search(r'^\*\*' + re.escape(label) + r':\*\*[ \t]*\n(.*)$', self.text, re.M)
+
+    def field(self, label):
+        """The line following a ``**Label:**`` line, or None."""
+        m = self._field(label)
+        return m.group(1) if m else None
+
+    def set_field(self, label, value):
+        m = self._field(label)
+        if m:
+            self.text = self.text[:m.start(1)] + value + self.text[m.end(1):]
+
+    def __repr__(self):
+        return f"Section({self.method} {self.path})"
+
+
+def _close(chunks, text, start, end, endpoint):
+    if start == end:
+        return
+    if endpoint is None:
+        chunks.append(text[start:end])
+    else:
+        chunks.append(Section(endpoint[0], endpoint[1], text[start:end], len(chunks)))
+
+
+def _shape(key):
+    return key[0], tuple(segment for segment in key[1] if segment != PARAM)
+
+
+class ReadmeDocument:
+    def __init__(self, text, chunks):
+        self.text = text
+        self.chunks = chunks
+        self.sections = [c for c in chunks if isinstance(c, Section)]
+        self.index = RouteIndex()
+        for section in self.sections:
+            self.index.insert(section, section.method, list(section.key[1]), False, section.order)
+
+    @classmethod
+    def parse(cls, text):
+        """Split the README into literal chunks and endpoint sections in a single line scan."""
+        chunks = []
+        start = 0
+        current = None
+        in_fence = False
+        pos = 0
+        for line in text.splitlines(keepends=True):
+            if line.startswith('```'):
+                in_fence = not in_fence
+            elif not in_fence and _HEADING.match(line):
+                _close(chunks, text, start, pos, current)
+                start = pos
+                m = _ENDPOINT.match(line)
+                current = (m.group(1), m.group(2)) if m else None
+            pos += len(line)
+        _close(chunks, text, start, pos, current)
+        return cls(text, chunks)
+
+    def lookup(self, route=None, method=None):
+        if route is None:
+            return [s for s in self.sections if method is None or s.method == method.upper()]
+        return self.index.items(route, method)
+
+    def section(self, method, path):
+        """The section documenting a concrete request, e.g. ``('GET', '/apps/api/Apps/42')``."""
+        entries = self.index.resolve(path, method)
+        return entries[0].item if entries else None
+
+    def documenting(self, keys):
+        """Sections for a set of collection route keys.
+
+        A key with no exact section falls back to the one section with the same
+        method and literal segments, since some documented paths omit a parameter
+        the collection URL carries (``users/{id}/apps/status`` vs ``users/{id}/apps/{appId}/status``).
+        """
+        by_key = {s.key: s for s in self.sections}
+        by_shape = {}
+        for s in self.sections:
+            by_shape.setdefault(_shape(s.key), []).append(s)
+        found = set()
+        for key in keys:
+            if key in by_key:
+                found.add(id(by_key[key]))
+            elif len(by_shape.get(_shape(key), ())) == 1:
+                found.add(id(by_shape[_shape(key)][0]))
+        return [s for s in self.sections if id(s) in found]
+
+    def render(self):
+        return ''.join(c if isinstance(c, str) else c.text for c in self.chunks)
+
+
+class SectionRule:
+    """A README edit, ``transform(section)``, applied to the sections on its route."""
+
+    def __init__(self, name, transform, route=None, method=None, rule_set=None):
+        self.name = name
+        self.rule_set = rule_set
+        self.transform = transform
+        self.route = route
+        self.method = method
+
+    def __repr__(self):
+        return f"SectionRule({self.name!r})"
+
+
+def apply_sections(readme, rules, changed=None, profile=None):
+    """Run the section rules over the sections they select, in document order.
+
+    ``changed`` is an optional set of route keys (see ``tools.index.route_key``);
+    when given, only sections documenting those requests are regenerated.
+    Returns a name -> sections-visited count.
+    """
+    rules = list(rules)
+    targets = {r.name: {id(s) for s in readme.lookup(r.route, r.method)} for r in rules}
+    visited = {r.name: 0 for r in rules}
+    stats = {r.name: profile.rule(r, 'readme') for r in rules} if profile else None
+    for section in readme.sections if changed is None else readme.documenting(changed):
+        for r in rules:
+            if id(section) in targets[r.name]:
+                if stats is None:
+                    r.transform(section)
+                else:
+                    s = stats[r.name]
+                    started = time.perf_counter()
+                    before = section.text
+                    r.transform(section)
+                    s.seconds += time.perf_counter() - started
+                    s.visited += 1
+                    s.matched += section.text != before
+                visited[r.name] += 1
+    return visited
+
+
+def run_readme(path, *rule_sets, changed=None, dry_run=None, profile=None):
+    """Apply the rule sets' section rules to the README at path.
+
+    Returns whether the file changed, or the unified diff in dry-run mode.
+    """
+    profile = profile or NULL_PROFILE
+    rules = [r for rs in rule_sets for r in rs.sections]
+    with profile.phase('readme_parse'):
+        with open(path, 'r', encoding='utf-8') as f:
+            readme = ReadmeDocument.parse(f.read())
+    with profile.phase('readme_rules'):
+        apply_sections(readme, rules, changed, profile or None)
+    with profile.phase('readme_write'):
+        text = readme.render()
+        result = write_text(path, readme.text, text, dry_run)
+    profile.count('readme_sections', len(readme.sections))
+    profile.count('readme_sections_changed', sum(s.dirty for s in readme.sections))
+    profile.count('bytes_written', os.path.getsize(path) if result is True else 0)
+    return result
+
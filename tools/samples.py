@@ -0,0 +1,326 @@
+"""Realistic sample values for request payloads, single or in bulk.
+
+``VALUE_RULES`` is the declarative table behind ``realistic_value`` (used by
+``inject_real_data.py``): each rule lists the key substrings it claims, the
+constant written into the collection and a column generator for bulk data.
+The table is compiled once into a single anchored regex whose alternatives
+are tried in table order, so the first rule wins exactly as the old
+if-chain did, and the rule chosen for each key name is memoized.
+
+Bulk mode compiles a request body template into per-field column
+generators. Rows are produced a batch at a time, one column per field, each
+column drawing from its own ``random.Random`` seeded from (seed, route,
+field path), so the output is reproducible, independent of the batch size
+and stable when fields are added elsewhere in the schema. Emails and
+default strings embed the row number, so every row is distinct.
+
+    python -m tools.samples --route 'auth/api/Auth/register' --count 1000000 --seed 7 --out register.ndjson
+"""
+import argparse
+import functools
+import json
+import random
+import re
+import sys
+import time
+import uuid
+
+from tools.engine import COLLECTION_PATH, iter_items, load_collection
+from tools.index import RouteIndex
+
+BATCH_SIZE = 4096
+
+_GUID = re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$')
+_VARIABLE = re.compile(r'\{\{\w+\}\}')
+
+FIRST_NAMES = ['John', 'Maria', 'Ahmed', 'Li', 'Sofia', 'Omar', 'Emma', 'Yusuf', 'Chen', 'Lucas', 'Fatima', 'Noah',
+               'Aisha', 'Mateo', 'Hana', 'Ivan', 'Priya', 'Kofi', 'Elena', 'Kenji']
+LAST_NAMES = ['Doe', 'Garcia', 'Hassan', 'Wang', 'Rossi', 'Khalil', 'Smith', 'Demir', 'Liu', 'Silva', 'Nasser',
+              'Brown', 'Okafor', 'Lopez', 'Sato', 'Petrov', 'Patel', 'Mensah', 'Novak', 'Tanaka']
+DOMAINS = ['ump.com', 'example.com', 'mail.test', 'corp.local', 'users.dev']
+WORDS = ['fast', 'secure', 'payment', 'profile', 'update', 'weekly', 'report', 'premium', 'mobile', 'account',
+         'verified', 'support', 'message', 'travel', 'service', 'daily', 'offer', 'local', 'music', 'market']
+USER_AGENTS = ['Mozilla/5.0 (Windows NT 10.0; Win64; x64)', 'Mozilla/5.0 (Macintosh; Intel Mac OS X 14_4)',
+               'Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X)', 'Mozilla/5.0 (Linux; Android 14; Pixel 8)',
+               'okhttp/4.12.0']
+ROLES = ['Admin', 'User', 'Manager', 'Viewer', 'Support']
+CURRENCIES = ['USD', 'EUR', 'GBP', 'EGP', 'SAR', 'AED', 'JPY']
+COUNTRIES = ['US', 'GB', 'DE', 'EG', 'SA', 'AE', 'FR', 'JP', 'BR', 'IN']
+
+
+def _constant(value):
+    return lambda rng, start, n: [value] * n
+
+
+def _choice(values):
+    return lambda rng, start, n: [rng.choice(values) for _ in range(n)]
+
+
+def _email(rng, start, n):
+    return [f"{rng.choice(FIRST_NAMES).lower()}.{rng.choice(LAST_NAMES).lower()}.{start + i}@{rng.choice(DOMAINS)}"
+            for i in range(n)]
+
+
+def _password(rng, start, n):
+    return [f"{rng.choice(WORDS).title()}{rng.randrange(100, 1000)}!{rng.choice(WORDS)}" for _ in range(n)]
+
+
+def _phone(rng, start, n):
+    return [f"+1555{rng.randrange(10 ** 7):07d}" for _ in range(n)]
+
+
+def _full_name(rng, start, n):
+    return [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" for _ in range(n)]
+
+
+def _url(rng, start, n):
+    return [f"https://{rng.choice(DOMAINS)}/media/{start + i}/{rng.choice(WORDS)}.jpg" for i in range(n)]
+
+
+def _sentence(rng, start, n):
+    return [' '.join(rng.choices(WORDS, k=rng.randrange(6, 14))).capitalize() + '.' for _ in range(n)]
+
+
+def _color(rng, start, n):
+    return [f"#{rng.getrandbits(24):06X}" for _ in range(n)]
+
+
+def _ip(rng, start, n):
+    return [f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}" for _ in range(n)]
+
+
+def _uniform(low, high, digits):
+    return lambda rng, start, n: [round(rng.uniform(low, high), digits) for _ in range(n)]
+
+
+def _date(rng, start, n):
+    # Spread over 2025-2026 so date-range filters and indexes see real variety
+    base = 1735689600
+    return [time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(base + rng.randrange(2 * 365 * 86400))) for _ in range(n)]
+
+
+def _guid(rng, start, n):
+    return [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(n)]
+
+
+class ValueRule:
+    __slots__ = ('name', 'keys', 'value', 'column')
+
+    def __init__(self, name, keys, value, column):
+        self.name = name
+        self.keys = keys
+        self.value = value
+        self.column = column
+
+    def __repr__(self):
+        return f"ValueRule({self.name!r})"
+
+
+# First matching rule wins; keys are matched as substrings of the lower-cased field name
+VALUE_RULES = [
+    ValueRule('email', ('email',), "admin@ump.com", _email),
+    ValueRule('password', ('password',), "SecureP@ssw0rd!", _password),
+    ValueRule('phone', ('phone',), "+15551234567", _phone),
+    ValueRule('full_name', ('firstname', 'displayname'), "John Doe", _full_name),
+    ValueRule('last_name', ('lastname',), "Doe", _choice(LAST_NAMES)),
+    ValueRule('url', ('url',), "https://example.com/image.jpg", _url),
+    ValueRule('description', ('description', 'bio'),
+              "This is a realistic description generated for testing purposes.", _sentence),
+    ValueRule('color', ('color', 'theme'), "#FFFFFF", _color),
+    ValueRule('ip_address', ('ipaddress',), "192.168.1.1", _ip),
+    ValueRule('user_agent', ('useragent',), "Mozilla/5.0 (Windows NT 10.0; Win64; x64)", _choice(USER_AGENTS)),
+    ValueRule('role', ('role',), "Admin", _choice(ROLES)),
+    ValueRule('currency', ('currency',), "USD", _choice(CURRENCIES)),
+    ValueRule('country', ('country',), "US", _choice(COUNTRIES)),
+    ValueRule('status', ('status',), 1, lambda rng, start, n: [rng.randrange(4) for _ in range(n)]),
+    ValueRule('latitude', ('latitude',), 34.0522, _uniform(-60.0, 70.0, 4)),
+    ValueRule('longitude', ('longitude',), -118.2437, _uniform(-180.0, 180.0, 4)),
+    ValueRule('json', ('json',), "{}", _constant("{}")),
+    ValueRule('date', ('date',), "2026-03-02T12:00:00Z", _date),
+]
+
+
+def compile_rules(rules):
+    # At position 0 each alternative scans the whole key before the next one is tried,
+    # so the leftmost-alternative semantics of `re` reproduce the table's priority order
+    return re.compile('^(?:' + '|'.join(
+        '.*?(' + '|'.join(re.escape(k) for k in rule.keys) + ')' for rule in rules) + ')', re.S)
+
+
+_MATCHER = compile_rules(VALUE_RULES)
+
+
+@functools.lru_cache(maxsize=4096)
+def rule_for(key):
+    """The VALUE_RULES entry claiming a field name, or None."""
+    m = _MATCHER.match(key.lower())
+    return VALUE_RULES[m.lastindex - 1] if m else None
+
+
+def realistic_value(key, val_type):
+    """Constant realistic value for a field, from its name or else the type of its current value."""
+    rule = rule_for(key)
+    if rule is not None:
+        return rule.value
+
+    # Defaults by type
+    if isinstance(val_type, bool):
+        return True
+    if isinstance(val_type, int):
+        return 100
+    if isinstance(val_type, float):
+        return 99.99
+    if isinstance(val_type, str):
+        if _GUID.match(val_type):
+            return val_type  # keep existing Guids like userIds or appIds
+        return f"Sample payload for {key}"
+
+    return val_type
+
+
+def column_for(key, value, vary_ids=False):
+    """Bulk column generator for one field, given its name and template value."""
+    rule = rule_for(key) if key is not None else None
+    # Placeholder strings take the rule's column; other values only when the types agree
+    if rule is not None and (isinstance(value, str) or type(value) is type(rule.value)):
+        return rule.column
+    if isinstance(value, bool):
+        return lambda rng, start, n: [rng.random() < 0.5 for _ in range(n)]
+    if isinstance(value, int):
+        return lambda rng, start, n: [rng.randrange(1, 10000) for _ in range(n)]
+    if isinstance(value, float):
+        return _uniform(1.0, 1000.0, 2)
+    if isinstance(value, str):
+        if _GUID.match(value) or _VARIABLE.fullmatch(value):
+            # Ids reference seeded rows, so they stay fixed unless asked to vary
+            return _guid if vary_ids else _constant(value)
+        return lambda rng, start, n: [f"Sample payload for {key} #{start + i}" for i in range(n)]
+    return _constant(value)
+
+
+class SchemaGenerator:
+    """Deterministic rows shaped like a JSON body template."""
+
+    def __init__(self, template, label='', seed=0, vary_ids=False):
+        self.template = template
+        self.label = label
+        self.columns = []
+        self.shape = self._compile(template, None, (), seed, vary_ids)
+        self.flat = isinstance(template, dict) and all(isinstance(v, int) for v in self.shape[1].values())
+        self.produced = 0
+
+    def _compile(self, value, key, path, seed, vary_ids):
+        if isinstance(value, dict):
+            return ('dict', {k: self._compile(v, k, path + (k,), seed, vary_ids) for k, v in value.items()})
+        if isinstance(value, list):
+            return ('list', [self._compile(v, key, path + (i,), seed, vary_ids) for i, v in enumerate(value)])
+        rng = random.Random(f"{seed}:{self.label}:{'/'.join(map(str, path))}")
+        self.columns.append((rng, column_for(key, value, vary_ids)))
+        return len(self.columns) - 1
+
+    def _build(self, shape, row):
+        if isinstance(shape, int):
+            return row[shape]
+        kind, children = shape
+        if kind == 'dict':
+            return {k: self._build(v, row) for k, v in children.items()}
+        return [self._build(v, row) for v in children]
+
+    def batch(self, n):
+        """The next n rows."""
+        start = self.produced
+        self.produced += n
+        if not self.columns:
+            return [self._build(self.shape, ()) for _ in range(n)]
+        columns = [column(rng, start, n) for rng, column in self.columns]
+        if self.flat:
+            keys = list(self.shape[1])
+            order = [self.shape[1][k] for k in keys]
+            return [dict(zip(keys, values)) for values in zip(*(columns[i] for i in order))]
+        return [self._build(self.shape, row) for row in zip(*columns)]
+
+    def bodies(self, batch_size=BATCH_SIZE):
+        """Endless iterator of encoded JSON bodies, generated a batch at a time."""
+        while True:
+            for row in self.batch(batch_size):
+                yield json.dumps(row, separators=(',', ':')).encode('utf-8')
+
+
+def request_label(request):
+    """'METHOD /path' as the load generator reports routes."""
+    url = request.get('url', {})
+    raw = url.get('raw', '') if isinstance(url, dict) else str(url)
+    path = raw.split('?', 1)[0].replace('{{gateway_url}}', '') or '/'
+    return f"{(request.get('method') or 'GET').upper()} {path}"
+
+
+def body_template(request):
+    """The parsed raw JSON body of a request, or None when it has none."""
+    body = request.get('body') or {}
+    if body.get('mode') != 'raw' or not body.get('raw', '').strip():
+        return None
+    try:
+        template = json.loads(body['raw'])
+    except ValueError:
+        return None
+    return template if isinstance(template, (dict, list)) else None
+
+
+def generators(collection, routes=None, method=None, seed=0, vary_ids=False):
+    """A SchemaGenerator per request item (optionally restricted to route patterns) with a JSON body."""
+    items = list(iter_items(collection))
+    if routes:
+        index = RouteIndex.build(items)
+        selected = {id(i) for route in routes for i in index.items(route, method)}
+        items = [i for i in items if id(i) in selected]
+    elif method:
+        items = [i for i in items if (i['request'].get('method') or '').upper() == method.upper()]
+    result = []
+    for item in items:
+        template = body_template(item['request'])
+        if template is not None:
+            label = request_label(item['request'])
+            result.append(SchemaGenerator(template, label, seed, vary_ids))
+    return result
+
+
+def write_ndjson(out, gens, count, batch_size=BATCH_SIZE):
+    """Write ``count`` rows per generator as {"route", "body"} lines, interleaved batch by batch."""
+    written = 0
+    for start in range(0, count, batch_size):
+        n = min(batch_size, count - start)
+        for gen in gens:
+            prefix = '{"route":' + json.dumps(gen.label) + ',"body":'
+            out.writelines(prefix + json.dumps(row, separators=(',', ':')) + '}\n' for row in gen.batch(n))
+            written += n
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream synthetic request bodies shaped like the collection's payloads.")
+    parser.add_argument('--collection', default=COLLECTION_PATH)
+    parser.add_argument('--route', action='append', help="route pattern to generate for (tools.index syntax); default all")
+    parser.add_argument('--method', help="only requests with this HTTP method")
+    parser.add_argument('--count', type=int, default=1000, help="rows per request schema")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--vary-ids', action='store_true', help="generate fresh GUIDs instead of keeping the template ids")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--out', default='-', help="NDJSON output file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    gens = generators(load_collection(args.collection), args.route, args.method, args.seed, args.vary_ids)
+    if not gens:
+        parser.error("no request with a JSON body matches")
+    started = time.perf_counter()
+    if args.out == '-':
+        written = write_ndjson(sys.stdout, gens, args.count, args.batch_size)
+    else:
+        with open(args.out, 'w', encoding='utf-8', newline='\n') as out:
+            written = write_ndjson(out, gens, args.count, args.batch_size)
+    elapsed = time.perf_counter() - started
+    print(f"{written} rows for {len(gens)} schema(s) in {elapsed:.2f}s ({written / elapsed:,.0f} rows/s)",
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
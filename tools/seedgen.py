@@ -0,0 +1,495 @@
+"""Bulk seed-data compiler for the Payments and Notifications databases.
+
+The hand-written seeds (``payment_configs.json``, ``notification_configs.json``)
+are expanded into large synthetic datasets for load and perf environments:
+
+    PaymentsDb       AppPaymentProviders  seed gateways x apps
+                     Plans                --plans-per-app per app
+                     Subscriptions        --subscriptions, each a user on a plan
+                     Transactions         --transactions, mostly subscription charges
+    NotificationsDb  NotificationConfigs  seed providers, global and per app tenant
+                     UserNotifications    --notifications
+
+Columns follow the EF entities in declaration order (Id first), which is the
+order ``EnsureCreated`` gives the tables. Rows are referentially consistent
+without keeping them in memory. A GUID encodes its table and row index, and
+each subscription's user, plan, gateway and start date are a hash of its
+index, so a transaction recomputes the subscription it charges, and dates
+the charge on one of its billing cycles, instead of looking it up. Only the
+plans (a few per app) are held. Everything else is generated and written a
+batch at a time, so memory is flat whatever the row counts. Output is
+deterministic for a given ``--seed``.
+
+Formats, one file per table (split every ``--rows-per-file`` rows, rounded up
+to whole batches of 4096):
+
+- ``bcp``: tab-separated UTF-8 plus an XML format file. ``load.sql`` inserts
+  through ``OPENROWSET(BULK ...)`` with explicit column lists, so it does not
+  depend on the table's column order. ``bcp ... -c -C 65001 -f Table.xml``
+  works too.
+- ``csv``: RFC 4180 with a header row, for ``BULK INSERT ... (FORMAT = 'CSV')``.
+- ``sql``: ``INSERT ... VALUES`` batches of at most 1000 rows (SQL Server's
+  limit for a row constructor), with ``GO`` every ``--go-every`` statements.
+
+    python -m tools.seedgen --out /tmp/seed --subscriptions 1000000 --transactions 5000000 --format bcp
+    python -m tools.seedgen --bench --subscriptions 200000
+"""
+import argparse
+import csv
+import datetime
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+
+from tools.config import CONFIG
+from tools.samples import CURRENCIES, WORDS
+
+BATCH_SIZE = 4096
+SQL_ROWS_PER_INSERT = 1000
+
+SEED_FILES = {
+    'PaymentsDb': os.path.join('Payments', 'Payments.Infrastructure', 'Persistence', 'Seed', 'payment_configs.json'),
+    'NotificationsDb': os.path.join('Notifications', 'Notifications.Infrastructure', 'Persistence', 'Seed',
+                                    'notification_configs.json'),
+}
+DEFAULT_APPS = ['FitIT', 'Wissler']
+TIERS = ['Basic', 'Standard', 'Plus', 'Premium', 'Pro', 'Business', 'Enterprise', 'Family']
+INTERVALS = [('Monthly', 30), ('Yearly', 365)]
+SUBSCRIPTION_STATUS = (['Active', 'Cancelled', 'PastDue'], [80, 15, 5])
+TRANSACTION_STATUS = (['Success', 'Failed', 'Pending'], [92, 5, 3])
+ONE_OFF_SHARE = 10  # percent of transactions not tied to a subscription
+EPOCH = datetime.datetime(2025, 1, 1)
+SPAN_SECONDS = 365 * 86400
+
+_MASK = (1 << 64) - 1
+
+
+def _mix(x):
+    """splitmix64 finaliser: a cheap, well-spread hash of an integer."""
+    x = (x + 0x9E3779B97F4A7C15) & _MASK
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK
+    return x ^ (x >> 31)
+
+
+def _tag(name):
+    """32-bit per-table tag for GUID prefixes and hash keys, from the full table name."""
+    return int.from_bytes(hashlib.blake2b(name.encode('ascii'), digest_size=4).digest(), 'big')
+
+
+def _timestamp(seconds):
+    return (EPOCH + datetime.timedelta(seconds=seconds)).isoformat(' ')
+
+
+def _money(cents):
+    return f"{cents // 100}.{cents % 100:02d}"
+
+
+class Column:
+    __slots__ = ('name', 'type', 'nullable')
+
+    def __init__(self, name, type, nullable=False):
+        self.name = name
+        self.type = type
+        self.nullable = nullable
+
+
+class Table:
+    def __init__(self, database, name, columns, count, rows):
+        self.database = database
+        self.name = name
+        self.columns = columns
+        self.count = count
+        self.rows = rows  # rows(start, n) -> list of tuples
+
+
+def _load_seed(root, database):
+    with open(os.path.join(root, SEED_FILES[database]), 'r', encoding='utf-8-sig') as f:
+        return json.load(f)
+
+
+class Dataset:
+    """Row generators for every table, derived from the seed files and the requested sizes."""
+
+    def __init__(self, root, apps=None, users=100000, plans_per_app=6, subscriptions=100000, transactions=500000,
+                 notifications=200000, seed=0):
+        self.seed = seed
+        self.apps = apps or DEFAULT_APPS
+        self.users = users
+        self.subscriptions = subscriptions
+        self.payment_seeds = _load_seed(root, 'PaymentsDb')
+        self.notification_seeds = _load_seed(root, 'NotificationsDb')
+        enabled = [s['GatewayName'] for s in self.payment_seeds if s.get('IsEnabled')]
+        self.gateways = enabled or [s['GatewayName'] for s in self.payment_seeds] or ['Mock']
+        self._sub_key = self._key('Subscriptions')
+        self.plans = self._plans(plans_per_app)
+        self.tables = self._tables(transactions, notifications)
+
+    def guid_prefix(self, table):
+        return f"{_tag(table):08x}-{self.seed & 0xffff:04x}-4000-8000-"
+
+    def guid(self, table, i):
+        return f"{self.guid_prefix(table)}{i:012x}"
+
+    def _key(self, name):
+        return _mix((self.seed << 32) ^ _tag(name))
+
+    def _rng(self, table, start):
+        # Batches start on multiples of BATCH_SIZE, so the stream is the same however the output is split
+        return random.Random(f"{self.seed}:{table}:{start}")
+
+    def _plans(self, per_app):
+        rng = random.Random(f"{self.seed}:Plans")
+        plans = []
+        for app in self.apps:
+            for k in range(per_app):
+                interval, days = INTERVALS[k % len(INTERVALS)]
+                cents = rng.randrange(299, 4999) * (10 if interval == 'Yearly' else 1)
+                plans.append((self.guid('Plans', len(plans)), f"{app} {TIERS[k // 2 % len(TIERS)]} {interval}", app,
+                              _money(cents), rng.choice(CURRENCIES[:3]), interval,
+                              f"price_{rng.getrandbits(64):016x}", 1, days))
+        return plans
+
+    def subscription(self, i):
+        """(user index, plan index, gateway, start second) of subscription i, recomputable from i alone."""
+        h = _mix(self._sub_key + i)
+        return (h % self.users, (h >> 24) % len(self.plans), self.gateways[(h >> 48) % len(self.gateways)],
+                _mix(h) % SPAN_SECONDS)
+
+    def _subscription_rows(self, start, n):
+        rng = self._rng('Subscriptions', start)
+        statuses = rng.choices(*SUBSCRIPTION_STATUS, k=n)
+        ids, users = self.guid_prefix('Subscriptions'), self.guid_prefix('Users')
+        plans, subscription, seed = self.plans, self.subscription, self.seed
+        rows = []
+        for j in range(n):
+            i = start + j
+            user, plan, gateway, started = subscription(i)
+            status = statuses[j]
+            next_billing = None if status == 'Cancelled' else _timestamp(started + plans[plan][8] * 86400)
+            rows.append((f"{ids}{i:012x}", f"{users}{user:012x}", plans[plan][0], status,
+                         f"sub_{_mix(i ^ seed):016x}", _timestamp(started), next_billing, gateway))
+        return rows
+
+    def _transaction_rows(self, start, n):
+        rng = self._rng('Transactions', start)
+        statuses = rng.choices(*TRANSACTION_STATUS, k=n)
+        one_off = [rng.randrange(SPAN_SECONDS) for _ in range(n)]
+        ids, subs, users = self.guid_prefix('Transactions'), self.guid_prefix('Subscriptions'), self.guid_prefix('Users')
+        key, plans, subscription, gateways = self._key('Transactions'), self.plans, self.subscription, self.gateways
+        rows = []
+        for j in range(n):
+            i = start + j
+            h = _mix(key + i)
+            if self.subscriptions and h % 100 >= ONE_OFF_SHARE:
+                sub = (h >> 8) % self.subscriptions
+                user, plan, gateway, started = subscription(sub)
+                subscription_id = f"{subs}{sub:012x}"
+                amount, currency = plans[plan][3], plans[plan][4]
+                # A renewal on one of the billing dates since the subscription started
+                period = plans[plan][8] * 86400
+                cycle = _mix(h) % ((SPAN_SECONDS - started) // period + 1)
+                created = started + cycle * period + (h >> 52) % 3600
+            else:
+                user, subscription_id, gateway = (h >> 8) % self.users, None, gateways[(h >> 40) % len(gateways)]
+                amount, currency = _money(rng.randrange(100, 20000)), rng.choice(CURRENCIES)
+                created = one_off[j]
+            status = statuses[j]
+            reference = f"txn_{_mix(h):016x}"
+            response = f'{{"id":"{reference}","status":"{status.lower()}","gateway":"{gateway}"}}'
+            rows.append((f"{ids}{i:012x}", subscription_id, f"{users}{user:012x}", amount, currency,
+                         status, reference, gateway, response, _timestamp(created)))
+        return rows
+
+    def _notification_rows(self, start, n):
+        rng = self._rng('UserNotifications', start)
+        ids, users, count = self.guid_prefix('UserNotifications'), self.guid_prefix('Users'), self.users
+        rows = []
+        for j in range(n):
+            i = start + j
+            words = rng.sample(WORDS, 6)
+            title = f"{words[0].capitalize()} {words[1]} {words[2]}"
+            message = f"Your {words[3]} {words[4]} is {words[5]}."
+            link = f"/notifications/{i}" if rng.random() < 0.3 else None
+            rows.append((f"{ids}{i:012x}", f"{users}{rng.randrange(count):012x}", title, message,
+                         int(rng.random() < 0.6), _timestamp(rng.randrange(SPAN_SECONDS)), link))
+        return rows
+
+    def _tables(self, transactions, notifications):
+        providers = [(self.guid('AppPaymentProviders', k), app, s['GatewayName'], int(bool(s.get('IsEnabled'))),
+                      s['ConfigJson'])
+                     for k, (app, s) in enumerate((app, s) for app in self.apps for s in self.payment_seeds)]
+        configs = [(self.guid('NotificationConfigs', k), s['Type'], s['Provider'], s['ConfigJson'],
+                    int(bool(s.get('IsActive'))), tenant)
+                   for k, (tenant, s) in enumerate((t, s) for t in [None] + self.apps for s in self.notification_seeds)]
+        guid = lambda name, nullable=False: Column(name, 'uniqueidentifier', nullable)
+        text = lambda name, nullable=False: Column(name, 'nvarchar', nullable)
+        bit = lambda name: Column(name, 'bit')
+        money = lambda name: Column(name, 'decimal(18,2)')
+        when = lambda name, nullable=False: Column(name, 'datetime2', nullable)
+        fixed = lambda rows: lambda start, n: rows[start:start + n]
+        return [
+            Table('PaymentsDb', 'AppPaymentProviders',
+                  [guid('Id'), text('AppId'), text('GatewayName'), bit('IsEnabled'), text('ConfigJson')],
+                  len(providers), fixed(providers)),
+            Table('PaymentsDb', 'Plans',
+                  [guid('Id'), text('Name'), text('AppId'), money('Amount'), text('Currency'), text('Interval'),
+                   text('ProviderPlanId'), bit('IsActive')],
+                  len(self.plans), fixed([p[:8] for p in self.plans])),
+            Table('PaymentsDb', 'Subscriptions',
+                  [guid('Id'), guid('UserId'), guid('PlanId'), text('Status'), text('ProviderSubscriptionId'),
+                   when('StartDate'), when('NextBillingDate', True), text('PaymentGateway')],
+                  self.subscriptions, self._subscription_rows),
+            Table('PaymentsDb', 'Transactions',
+                  [guid('Id'), guid('SubscriptionId', True), guid('UserId'), money('Amount'), text('Currency'),
+                   text('Status'), text('ProviderTransactionId'), text('PaymentGateway'), text('GatewayResponse'),
+                   when('CreatedAt')],
+                  transactions, self._transaction_rows),
+            Table('NotificationsDb', 'NotificationConfigs',
+                  [guid('Id'), text('Type'), text('Provider'), text('ConfigJson'), bit('IsActive'),
+                   text('TenantId', True)],
+                  len(configs), fixed(configs)),
+            Table('NotificationsDb', 'UserNotifications',
+                  [guid('Id'), guid('UserId'), text('Title'), text('Message'), bit('IsRead'), when('CreatedAt'),
+                   text('Link', True)],
+                  notifications, self._notification_rows),
+        ]
+
+
+def iter_batches(table, batch_size=BATCH_SIZE):
+    for start in range(0, table.count, batch_size):
+        yield table.rows(start, min(batch_size, table.count - start))
+
+
+# Writers: write(out, table, rows) for one batch, plus header/footer per file
+
+def _sql_literal(column):
+    if column.type == 'nvarchar':
+        return lambda v: 'NULL' if v is None else "N'" + v.replace("'", "''") + "'"
+    if column.type in ('uniqueidentifier', 'datetime2'):
+        return lambda v: 'NULL' if v is None else f"'{v}'"
+    return lambda v: 'NULL' if v is None else str(v)
+
+
+class SqlWriter:
+    extension = 'sql'
+
+    def __init__(self, go_every=10):
+        self.go_every = go_every
+        self.statements = 0
+
+    def header(self, out, table):
+        self.literals = [_sql_literal(c) for c in table.columns]
+        self.prefix = f"INSERT INTO dbo.[{table.name}] ({', '.join(f'[{c.name}]' for c in table.columns)}) VALUES\n"
+        self.statements = 0
+        out.write(f"USE [{table.database}];\nGO\nSET NOCOUNT ON;\n")
+
+    def write(self, out, table, rows):
+        literals = self.literals
+        for k in range(0, len(rows), SQL_ROWS_PER_INSERT):
+            values = ',\n'.join('(' + ', '.join(f(v) for f, v in zip(literals, row)) + ')'
+                                for row in rows[k:k + SQL_ROWS_PER_INSERT])
+            out.write(self.prefix + values + ';\n')
+            self.statements += 1
+            if self.statements % self.go_every == 0:
+                out.write('GO\n')
+
+    def footer(self, out, table):
+        out.write('GO\n')
+
+
+class CsvWriter:
+    extension = 'csv'
+
+    def header(self, out, table):
+        self.writer = csv.writer(out, lineterminator='\n')
+        self.writer.writerow([c.name for c in table.columns])
+
+    def write(self, out, table, rows):
+        self.writer.writerows(rows)
+
+    def footer(self, out, table):
+        pass
+
+
+class BcpWriter:
+    """Tab-separated character data for bcp -c / OPENROWSET with a format file; generated values never contain tabs or newlines."""
+
+    extension = 'tsv'
+
+    def header(self, out, table):
+        pass
+
+    def write(self, out, table, rows):
+        out.write(''.join('\t'.join('' if v is None else str(v) for v in row) + '\n' for row in rows))
+
+    def footer(self, out, table):
+        pass
+
+
+WRITERS = {'sql': SqlWriter, 'csv': CsvWriter, 'bcp': BcpWriter}
+
+_XML_TYPES = {'uniqueidentifier': 'SQLUNIQUEID', 'nvarchar': 'SQLNVARCHAR', 'bit': 'SQLBIT',
+              'decimal(18,2)': 'SQLDECIMAL" PRECISION="18" SCALE="2', 'datetime2': 'SQLDATETIME2'}
+
+
+def format_file(table):
+    """XML bcp format file for the tab-separated files (fields by position, columns by name)."""
+    last = len(table.columns)
+    terminators = ['\\t'] * (last - 1) + ['\\n']
+    fields = '\n'.join(f'  <FIELD ID="{i}" xsi:type="CharTerm" TERMINATOR="{t}" />'
+                       for i, t in enumerate(terminators, 1))
+    columns = '\n'.join(f'  <COLUMN SOURCE="{i}" NAME="{c.name}" xsi:type="{_XML_TYPES[c.type]}" />'
+                        for i, c in enumerate(table.columns, 1))
+    return ('<?xml version="1.0"?>\n<BCPFORMAT xmlns="http://schemas.microsoft.com/sqlserver/2004/bulkload/format" '
+            'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">\n'
+            f' <RECORD>\n{fields}\n </RECORD>\n <ROW>\n{columns}\n </ROW>\n</BCPFORMAT>\n')
+
+
+def load_statement(table, fmt, path, directory):
+    names = ', '.join(f'[{c.name}]' for c in table.columns)
+    if fmt == 'bcp':
+        formatfile = os.path.join(directory, table.name + '.xml')
+        return (f"INSERT INTO dbo.[{table.name}] WITH (TABLOCK) ({names})\nSELECT {names}\n"
+                f"FROM OPENROWSET(BULK N'{path}', FORMATFILE = N'{formatfile}', CODEPAGE = '65001') AS src;\nGO\n")
+    return (f"BULK INSERT dbo.[{table.name}] FROM N'{path}'\nWITH (FORMAT = 'CSV', FIRSTROW = 2, CODEPAGE = '65001', "
+            f"ROWTERMINATOR = '0x0a', KEEPNULLS, TABLOCK, BATCHSIZE = 100000);\nGO\n")
+
+
+def _file_names(table, extension, rows_per_file):
+    files = max(1, -(-table.count // rows_per_file))
+    if files == 1:
+        return [f"{table.name}.{extension}"]
+    return [f"{table.name}.{k:04d}.{extension}" for k in range(1, files + 1)]
+
+
+def compile_tables(dataset, out_dir, fmt='bcp', rows_per_file=1000000, go_every=10, only=None):
+    """Write every table; returns per-table stats. Parents are written (and loaded) before children."""
+    # Whole batches per file keep the generated stream identical however the output is split
+    rows_per_file = -(-rows_per_file // BATCH_SIZE) * BATCH_SIZE
+    stats = []
+    scripts = {}
+    for table in dataset.tables:
+        if only and table.name not in only:
+            continue
+        directory = os.path.join(out_dir, table.database)
+        os.makedirs(directory, exist_ok=True)
+        writer = WRITERS[fmt](go_every) if fmt == 'sql' else WRITERS[fmt]()
+        names = _file_names(table, writer.extension, rows_per_file)
+        if fmt == 'bcp':
+            with open(os.path.join(directory, table.name + '.xml'), 'w', encoding='utf-8') as f:
+                f.write(format_file(table))
+        started = time.perf_counter()
+        written = 0
+        for k, name in enumerate(names):
+            path = os.path.join(directory, name)
+            first, last = k * rows_per_file, min(table.count, (k + 1) * rows_per_file)
+            with open(path, 'w', encoding='utf-8', newline='') as out:
+                writer.header(out, table)
+                for start in range(first, last, BATCH_SIZE):
+                    writer.write(out, table, table.rows(start, min(BATCH_SIZE, last - start)))
+                writer.footer(out, table)
+            written += os.path.getsize(path)
+            if fmt != 'sql':
+                scripts.setdefault(table.database, []).append(load_statement(table, fmt, os.path.abspath(path), os.path.abspath(directory)))
+            else:
+                scripts.setdefault(table.database, []).append(f":r {os.path.abspath(path)}\n")
+        elapsed = time.perf_counter() - started
+        stats.append({'database': table.database, 'table': table.name, 'rows': table.count, 'files': len(names),
+                      'bytes': written, 'seconds': round(elapsed, 3),
+                      'rows_per_s': round(table.count / elapsed) if elapsed else None,
+                      'mb_per_s': round(written / elapsed / 1e6, 1) if elapsed else None})
+    for database, statements in scripts.items():
+        header = f"-- Generated by tools/seedgen.py; run with sqlcmd{' -i' if fmt == 'sql' else ''}\n"
+        with open(os.path.join(out_dir, database, 'load.sql'), 'w', encoding='utf-8') as f:
+            f.write(header + (f"USE [{database}];\nGO\n" if fmt != 'sql' else '') + ''.join(statements))
+    return stats
+
+
+class _Sink:
+    """Counts what would have been written."""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, text):
+        self.bytes += len(text)
+
+
+def benchmark(dataset, formats=('bcp', 'csv', 'sql')):
+    """Generation alone, then generation plus encoding for each format, without touching the disk."""
+    results = []
+    for table in dataset.tables:
+        if table.count < BATCH_SIZE:
+            continue
+        started = time.perf_counter()
+        for _ in iter_batches(table):
+            pass
+        generate = time.perf_counter() - started
+        row = {'table': table.name, 'rows': table.count, 'generate_rows_per_s': round(table.count / generate)}
+        for fmt in formats:
+            writer, sink = WRITERS[fmt](), _Sink()
+            started = time.perf_counter()
+            writer.header(sink, table)
+            for rows in iter_batches(table):
+                writer.write(sink, table, rows)
+            elapsed = time.perf_counter() - started
+            row[f"{fmt}_rows_per_s"] = round(table.count / elapsed)
+            row[f"{fmt}_mb_per_s"] = round(sink.bytes / elapsed / 1e6, 1)
+        results.append(row)
+    return results
+
+
+def peak_rss_mb():
+    """Peak resident set size in MB, or None where the resource module is missing (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Expand the Payments/Notifications seed files into bulk-load files.")
+    parser.add_argument('--out', help="output directory (one subdirectory per database)")
+    parser.add_argument('--format', choices=sorted(WRITERS), default='bcp')
+    parser.add_argument('--apps', nargs='+', default=DEFAULT_APPS, help="AppIds / tenants to generate data for")
+    parser.add_argument('--users', type=int, default=100000, help="distinct user ids referenced")
+    parser.add_argument('--plans-per-app', type=int, default=6)
+    parser.add_argument('--subscriptions', type=int, default=100000)
+    parser.add_argument('--transactions', type=int, default=500000)
+    parser.add_argument('--notifications', type=int, default=200000)
+    parser.add_argument('--table', action='append', help="only write these tables (repeatable)")
+    parser.add_argument('--rows-per-file', type=int, default=1000000, help="split large tables into files of this many rows")
+    parser.add_argument('--go-every', type=int, default=10, help="sql format: GO after this many INSERT statements")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--bench', action='store_true', help="measure generation and encoding throughput without writing")
+    parser.add_argument('--json', action='store_true', help="print stats as JSON")
+    args = parser.parse_args(argv)
+    if not args.bench and not args.out:
+        parser.error("--out is required unless --bench is given")
+
+    dataset = Dataset(CONFIG['root'], args.apps, args.users, args.plans_per_app, args.subscriptions,
+                      args.transactions, args.notifications, args.seed)
+    started = time.perf_counter()
+    if args.bench:
+        results = benchmark(dataset)
+    else:
+        results = compile_tables(dataset, args.out, args.format, args.rows_per_file, args.go_every, args.table)
+    elapsed = time.perf_counter() - started
+    if args.json:
+        print(json.dumps({'results': results, 'seconds': round(elapsed, 3), 'peak_rss_mb': peak_rss_mb()}, indent=2))
+        return
+    for r in results:
+        print('  '.join(f"{k} {v}" for k, v in r.items()))
+    peak = peak_rss_mb()
+    print(f"{sum(r['rows'] for r in results)} rows in {elapsed:.2f}s" + (f", peak RSS {peak} MB" if peak is not None else ''))
+
+
+if __name__ == '__main__':
+    main()
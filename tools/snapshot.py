@@ -0,0 +1,355 @@
+"""Content-addressed snapshots of API responses, captured from the collection.
+
+``capture`` compiles every request of the Gateway collection (as the load
+generator does, see ``tools.loadgen.compile_plan``) and sends them
+concurrently over pooled keep-alive connections. Only GET/HEAD requests are
+sent unless ``--all-methods`` is given. Each response body is normalised:
+
+- the encoding is detected (UTF-16 with or without BOM, UTF-8 with BOM),
+- JSON is re-serialised with sorted keys and no insignificant whitespace,
+- other text gets ``\\n`` line endings.
+
+The normalised body is stored once under its SHA-256 in
+``objects/ab/cdef...``, zlib-compressed, so identical bodies cost nothing
+across requests and runs. A run is a small manifest mapping each request to
+its status, content type, latency and body hash. ``import`` turns
+hand-captured files (``api_out.txt``, the UTF-16 ``api_output.json``) into a
+run the same way.
+
+``diff`` compares two runs structurally: requests added or removed, status
+changes and, for JSON bodies, the JSON Pointer of every value that changed.
+Key order and formatting never show up as differences.
+
+    python -m tools.snapshot capture --stub
+    python -m tools.snapshot capture --target http://localhost:7032 --var jwt_token=... --name before
+    python -m tools.snapshot import legacy api_out.txt api_out2.txt api_out3.txt api_output.json
+    python -m tools.snapshot import old apps=api_out.txt && python -m tools.snapshot import new apps=api_out2.txt
+    python -m tools.snapshot diff before after --ignore createdAt --ignore updatedAt
+"""
+import argparse
+import asyncio
+import datetime
+import fnmatch
+import hashlib
+import json
+import os
+import time
+import zlib
+
+from tools.config import CONFIG
+from tools.engine import COLLECTION_PATH, load_collection
+from tools.http import Client
+from tools.loadgen import compile_plan
+from tools.logs import detect_encoding
+from tools.stub import StubServer
+from tools.writer import atomic_open, atomic_write, diff, pointer
+
+STORE_DIR = '.snapshots'
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+def normalize(raw):
+    """(kind, bytes): 'json' bodies re-serialised canonically, 'text' with normalised newlines, else 'binary'."""
+    if not raw:
+        return 'empty', b''
+    encoding = detect_encoding(raw[:4096])
+    try:
+        text = raw.decode(encoding)
+    except UnicodeDecodeError:
+        return 'binary', raw
+    try:
+        value = json.loads(text)
+    except ValueError:
+        return 'text', text.replace('\r\n', '\n').encode('utf-8')
+    return 'json', json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class SnapshotStore:
+    def __init__(self, root):
+        self.root = root
+        self.objects = os.path.join(root, 'objects')
+        self.runs = os.path.join(root, 'runs')
+        self.written = 0
+        self.written_bytes = 0
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects, digest[:2], digest[2:])
+
+    def put(self, data):
+        """Store bytes under their SHA-256; returns the digest. Existing objects are not rewritten."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            packed = zlib.compress(data, 6)
+            with atomic_open(path, binary=True) as f:
+                f.write(packed)
+            self.written += 1
+            self.written_bytes += len(packed)
+        return digest
+
+    def get(self, digest):
+        with open(self._object_path(digest), 'rb') as f:
+            return zlib.decompress(f.read())
+
+    def save_run(self, name, run):
+        os.makedirs(self.runs, exist_ok=True)
+        atomic_write(os.path.join(self.runs, name + '.json'), json.dumps(run, indent=2, sort_keys=True))
+
+    def has_run(self, name):
+        return os.path.exists(os.path.join(self.runs, name + '.json'))
+
+    def load_run(self, name):
+        with open(os.path.join(self.runs, name + '.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def run_names(self):
+        """Run names, oldest first."""
+        if not os.path.isdir(self.runs):
+            return []
+        runs = [n[:-5] for n in os.listdir(self.runs) if n.endswith('.json')]
+        return sorted(runs, key=lambda n: (self.load_run(n)['created'], n))
+
+    def disk_usage(self):
+        total = count = 0
+        for directory, _, names in os.walk(self.objects):
+            for name in names:
+                total += os.path.getsize(os.path.join(directory, name))
+                count += 1
+        return count, total
+
+
+def _entry_keys(plan):
+    """Stable key per planned request: its route, with #2, #3... for repeats."""
+    seen = {}
+    keys = []
+    for planned in plan:
+        n = seen[planned.route] = seen.get(planned.route, 0) + 1
+        keys.append(planned.route if n == 1 else f"{planned.route} #{n}")
+    return keys
+
+
+def _record(store, status, content_type, raw, ms=None):
+    kind, body = normalize(raw)
+    entry = {'status': status, 'content_type': content_type, 'kind': kind, 'body': store.put(body), 'bytes': len(raw)}
+    if ms is not None:
+        entry['ms'] = ms
+    return entry
+
+
+async def capture(store, plan, connections=8, timeout=30.0, all_methods=False):
+    """Send the plan concurrently; returns the run's entries keyed by request."""
+    client = Client(connections, timeout)
+    entries = {}
+
+    async def fetch(key, planned):
+        started = time.perf_counter()
+        try:
+            response = await client.request(planned.method, planned.url, planned.headers, planned.body)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as exc:
+            entries[key] = {'error': f"{type(exc).__name__}: {exc}"}
+            return
+        ms = round((time.perf_counter() - started) * 1000, 2)
+        entries[key] = _record(store, response.status, response.headers.get('content-type', ''), response.body, ms)
+        entries[key]['url'] = planned.url
+
+    try:
+        await asyncio.gather(*(fetch(key, planned) for key, planned in zip(_entry_keys(plan), plan)
+                               if all_methods or planned.method in SAFE_METHODS))
+    finally:
+        await client.close()
+    return dict(sorted(entries.items()))
+
+
+def import_files(store, specs):
+    """Entries for hand-captured response files given as '[KEY=]PATH' (the key defaults to the file name)."""
+    entries = {}
+    for spec in specs:
+        key, sep, path = spec.partition('=')
+        if not sep:
+            key, path = os.path.basename(spec), spec
+        with open(path, 'rb') as f:
+            raw = f.read()
+        entries[key] = _record(store, None, '', raw)
+    return entries
+
+
+def _at(doc, path):
+    for key in path:
+        doc = doc[key]
+    return doc
+
+
+def _ignored(path, patterns):
+    return any(fnmatch.fnmatchcase(str(key), p) for key in path for p in patterns)
+
+
+def diff_runs(store, old, new, ignore=()):
+    """{'added', 'removed', 'changed': {key: [change...]}, 'unchanged'} between two run manifests."""
+    old_entries, new_entries = old['entries'], new['entries']
+    result = {'added': sorted(set(new_entries) - set(old_entries)),
+              'removed': sorted(set(old_entries) - set(new_entries)),
+              'changed': {}, 'unchanged': 0}
+    for key in sorted(set(old_entries) & set(new_entries)):
+        a, b = old_entries[key], new_entries[key]
+        changes = []
+        if a.get('error') != b.get('error'):
+            changes.append({'op': 'error', 'old': a.get('error'), 'new': b.get('error')})
+        if a.get('status') != b.get('status'):
+            changes.append({'op': 'status', 'old': a.get('status'), 'new': b.get('status')})
+        if a.get('body') != b.get('body') and a.get('body') and b.get('body'):
+            old_body, new_body = store.get(a['body']), store.get(b['body'])
+            if a['kind'] == b['kind'] == 'json':
+                old_value, new_value = json.loads(old_body), json.loads(new_body)
+                for op, path in diff(old_value, new_value):
+                    if _ignored(path, ignore):
+                        continue
+                    change = {'op': op, 'path': pointer(path)}
+                    if op != 'add':
+                        change['old'] = _at(old_value, path)
+                    if op != 'remove':
+                        change['new'] = _at(new_value, path)
+                    changes.append(change)
+            else:
+                changes.append({'op': 'body', 'old': a['body'][:12], 'new': b['body'][:12]})
+        if changes:
+            result['changed'][key] = changes
+        else:
+            result['unchanged'] += 1
+    return result
+
+
+def _short(value, width=60):
+    text = json.dumps(value, ensure_ascii=False)
+    return text if len(text) <= width else text[:width - 3] + '...'
+
+
+def format_diff(result):
+    lines = [f"+ {k}" for k in result['added']] + [f"- {k}" for k in result['removed']]
+    for key, changes in result['changed'].items():
+        lines.append(f"~ {key}")
+        for c in changes:
+            where = c.get('path', c['op'])
+            if c['op'] == 'add':
+                lines.append(f"    + {where}: {_short(c['new'])}")
+            elif c['op'] == 'remove':
+                lines.append(f"    - {where}: {_short(c['old'])}")
+            else:
+                lines.append(f"    ~ {where}: {_short(c['old'])} -> {_short(c['new'])}")
+    lines.append(f"{len(result['added'])} added, {len(result['removed'])} removed, "
+                 f"{len(result['changed'])} changed, {result['unchanged']} unchanged")
+    return '\n'.join(lines)
+
+
+def _new_run(store, name, target, entries):
+    created = datetime.datetime.now(datetime.timezone.utc)
+    if name is None:
+        # Millisecond timestamp, plus a counter should two captures still land in the same millisecond
+        base = f"{created:%Y%m%d-%H%M%S}-{created.microsecond // 1000:03d}"
+        name, n = base, 2
+        while store.has_run(name):
+            name, n = f"{base}-{n}", n + 1
+    return {'name': name, 'created': created.isoformat(timespec='milliseconds'), 'target': target, 'entries': entries}
+
+
+async def _capture(args, store):
+    collection = load_collection(args.collection)
+    variables = dict(v.split('=', 1) for v in args.var)
+    stub = None
+    if args.stub:
+        stub = await StubServer(collection, args.stub_latency_ms / 1000).start()
+        target = stub.url
+    else:
+        target = args.target
+    variables.setdefault('gateway_url', target.rstrip('/'))
+    try:
+        entries = await capture(store, compile_plan(collection, variables), args.connections, args.timeout,
+                                args.all_methods)
+    finally:
+        if stub:
+            await stub.close()
+    return variables['gateway_url'], entries
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Capture, store and diff API response snapshots.")
+    parser.add_argument('--store', default=os.path.join(CONFIG['root'], STORE_DIR))
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    cap = commands.add_parser('capture', help="capture every collection request")
+    cap.add_argument('--collection', default=COLLECTION_PATH)
+    target = cap.add_mutually_exclusive_group(required=True)
+    target.add_argument('--target', help="Gateway base URL, e.g. http://localhost:7032")
+    target.add_argument('--stub', action='store_true', help="capture from an in-process stub serving the example responses")
+    cap.add_argument('--stub-latency-ms', type=float, default=0.0)
+    cap.add_argument('--var', action='append', default=[], metavar='NAME=VALUE', help="collection variable value")
+    cap.add_argument('--connections', type=int, default=8, help="keep-alive connections per target")
+    cap.add_argument('--timeout', type=float, default=30.0)
+    cap.add_argument('--all-methods', action='store_true', help="also send POST/PUT/PATCH/DELETE requests")
+    cap.add_argument('--name', help="run name (default: UTC timestamp with milliseconds)")
+    cap.add_argument('--replace', action='store_true', help="overwrite an existing run of the same --name")
+
+    imp = commands.add_parser('import', help="store hand-captured response files as a run")
+    imp.add_argument('name')
+    imp.add_argument('files', nargs='+', metavar='[KEY=]PATH')
+    imp.add_argument('--replace', action='store_true', help="overwrite an existing run of the same name")
+
+    dif = commands.add_parser('diff', help="structural diff of two runs (default: the last two)")
+    dif.add_argument('old', nargs='?')
+    dif.add_argument('new', nargs='?')
+    dif.add_argument('--ignore', action='append', default=[], metavar='KEY',
+                     help="skip changes under matching keys (glob), e.g. --ignore '*At'")
+
+    show = commands.add_parser('show', help="print a stored body")
+    show.add_argument('run')
+    show.add_argument('key')
+
+    commands.add_parser('list', help="list runs")
+    args = parser.parse_args(argv)
+
+    store = SnapshotStore(args.store)
+    if args.command in ('capture', 'import'):
+        if args.name and store.has_run(args.name) and not args.replace:
+            parser.error(f"run {args.name!r} already exists (pass --replace to overwrite it)")
+        started = time.perf_counter()
+        if args.command == 'capture':
+            target, entries = asyncio.run(_capture(args, store))
+            run = _new_run(store, args.name, target, entries)
+        else:
+            run = _new_run(store, args.name, None, import_files(store, args.files))
+        store.save_run(run['name'], run)
+        objects, size = store.disk_usage()
+        errors = sum(1 for e in run['entries'].values() if 'error' in e)
+        print(f"{run['name']}: {len(run['entries'])} responses ({errors} errors) in "
+              f"{time.perf_counter() - started:.2f}s; {store.written} new objects ({store.written_bytes} bytes), "
+              f"store holds {objects} objects ({size} bytes)")
+    elif args.command == 'diff':
+        names = store.run_names()
+        old = args.old or (names[-2] if len(names) >= 2 else None)
+        new = args.new or (names[-1] if names else None)
+        if old is None or new is None:
+            parser.error("need two runs to diff")
+        result = diff_runs(store, store.load_run(old), store.load_run(new), args.ignore)
+        print(json.dumps(result, indent=2, ensure_ascii=False) if args.json else format_diff(result))
+        if result['added'] or result['removed'] or result['changed']:
+            raise SystemExit(1)
+    elif args.command == 'show':
+        entry = store.load_run(args.run)['entries'][args.key]
+        body = store.get(entry['body']).decode('utf-8', errors='replace')
+        print(json.dumps(json.loads(body), indent=2, ensure_ascii=False) if entry['kind'] == 'json' else body)
+    else:
+        rows = []
+        for name in store.run_names():
+            run = store.load_run(name)
+            rows.append({'name': name, 'created': run['created'], 'target': run['target'],
+                         'responses': len(run['entries']), 'bodies': len({e.get('body') for e in run['entries'].values()})})
+        if args.json:
+            print(json.dumps(rows, indent=2))
+        else:
+            for r in rows:
+                print(f"{r['name']:<20} {r['created']}  {r['responses']:>4} responses, {r['bodies']:>4} distinct bodies  {r['target'] or ''}")
+
+
+if __name__ == '__main__':
+    main()
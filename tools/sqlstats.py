@@ -0,0 +1,196 @@
+"""SQL fingerprinting and N+1 detection over captured EF Core command logs.
+
+Each ``Executed DbCommand`` SQL text is normalised into a fingerprint:
+comments dropped, string/numeric literals and ``@parameter`` names replaced
+by ``?``, parameter lists and multi-row ``VALUES`` collapsed, whitespace
+squashed. Commands are grouped by fingerprint with count, total and mean
+duration.
+
+To spot N+1 patterns the records are also cut into request windows. The
+ASP.NET ``Request starting`` / ``Request finished`` messages delimit a window;
+commands outside any request (startup seeding, background consumers) are
+windowed by time, a new window starting after ``gap`` seconds without a
+command. A fingerprint repeated ``threshold`` or more times inside one window
+is reported as a likely N+1. The log format carries no request id, so
+interleaved concurrent requests are attributed to the most recent one.
+
+    python -m tools.sqlstats auth_logs.txt users_logs_utf8.txt --threshold 5
+"""
+import argparse
+import hashlib
+import json
+import re
+
+from tools.logs import iter_records, parse_source
+
+_COMMENTS = re.compile(r'--[^\n]*|/\*.*?\*/', re.DOTALL)
+_STRINGS = re.compile(r"N?'(?:[^']|'')*'")
+_PARAMS = re.compile(r'@\w+')
+_NUMBERS = re.compile(r'(?<![\w\]\.@])(?:0x[0-9A-Fa-f]+|\d+(?:\.\d+)?)(?![\w\[])')
+_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_ROWS = re.compile(r'\(\?\+\)(?:\s*,\s*\(\?\+\))+')
+_SPACES = re.compile(r'\s+')
+
+REQUEST_STARTING = re.compile(r'^Request starting (?:HTTP/[\d.]+ )?(\w+) (\S+)')
+REQUEST_FINISHED = re.compile(r'^Request finished ')
+
+
+def normalize(sql):
+    sql = _COMMENTS.sub(' ', sql)
+    sql = _STRINGS.sub('?', sql)
+    sql = _PARAMS.sub('?', sql)
+    sql = _NUMBERS.sub('?', sql)
+    sql = _LISTS.sub('(?+)', sql)
+    sql = _ROWS.sub('(?+)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def fingerprint(sql):
+    """(fingerprint id, normalised SQL)."""
+    normalized = normalize(sql)
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:12], normalized
+
+
+class FingerprintStats:
+    __slots__ = ('id', 'sql', 'count', 'total_ms', 'max_ms', 'services')
+
+    def __init__(self, fp_id, sql):
+        self.id = fp_id
+        self.sql = sql
+        self.count = 0
+        self.total_ms = 0
+        self.max_ms = 0
+        self.services = set()
+
+    def add(self, service, duration):
+        self.count += 1
+        self.total_ms += duration
+        self.max_ms = max(self.max_ms, duration)
+        self.services.add(service)
+
+    def summary(self):
+        return {
+            'fingerprint': self.id,
+            'count': self.count,
+            'total_ms': self.total_ms,
+            'mean_ms': round(self.total_ms / self.count, 2),
+            'max_ms': self.max_ms,
+            'services': sorted(self.services),
+            'sql': self.sql,
+        }
+
+
+def _seconds(hhmmss):
+    h, m, s = hhmmss.split(':')
+    return int(h) * 3600 + int(m) * 60 + int(s)
+
+
+class _Window:
+    __slots__ = ('service', 'label', 'start', 'end', 'last', 'counts')
+
+    def __init__(self, service, label, time):
+        self.service = service
+        self.label = label
+        self.start = time
+        self.end = time
+        self.last = _seconds(time)
+        self.counts = {}
+
+    def add(self, fp_id, duration, time):
+        count, total = self.counts.get(fp_id, (0, 0))
+        self.counts[fp_id] = (count + 1, total + duration)
+        self.end = time
+        self.last = _seconds(time)
+
+
+def analyze(sources, threshold=5, gap=1):
+    """Returns (fingerprint summaries by total time, N+1 suspects by repeated count)."""
+    groups = {}
+    suspects = []
+
+    def close(window):
+        if window is None:
+            return
+        for fp_id, (count, total) in window.counts.items():
+            if count >= threshold:
+                suspects.append({
+                    'fingerprint': fp_id,
+                    'service': window.service,
+                    'window': window.label,
+                    'start': window.start,
+                    'end': window.end,
+                    'count': count,
+                    'total_ms': total,
+                    'sql': groups[fp_id].sql,
+                })
+
+    for service, path in sources:
+        request = None
+        background = None
+        for record in iter_records(path, service):
+            started = REQUEST_STARTING.match(record.message)
+            if started:
+                close(request)
+                request = _Window(record.service, f"{started.group(1)} {started.group(2)}", record.time)
+                continue
+            if REQUEST_FINISHED.match(record.message):
+                close(request)
+                request = None
+                continue
+            command = record.db_command()
+            if command is None:
+                continue
+            _, duration, _, sql = command
+            fp_id, normalized = fingerprint(sql)
+            stats = groups.get(fp_id)
+            if stats is None:
+                stats = groups[fp_id] = FingerprintStats(fp_id, normalized)
+            stats.add(record.service, duration)
+
+            window = request
+            if window is None:
+                # Outside a request: a pause longer than `gap` starts a new background window
+                if background is None or not 0 <= _seconds(record.time) - background.last <= gap:
+                    close(background)
+                    background = _Window(record.service, 'background', record.time)
+                window = background
+            window.add(fp_id, duration, record.time)
+        close(request)
+        close(background)
+
+    ranked = sorted((g.summary() for g in groups.values()), key=lambda g: (-g['total_ms'], -g['count']))
+    suspects.sort(key=lambda s: (-s['count'], -s['total_ms']))
+    return ranked, suspects
+
+
+def format_report(ranked, suspects, top=20, sql_width=100):
+    lines = [f"{'fingerprint':<12} {'count':>6} {'total':>8} {'mean':>8} {'max':>6}  services / sql"]
+    for g in ranked[:top]:
+        lines.append(f"{g['fingerprint']:<12} {g['count']:>6} {g['total_ms']:>8} {g['mean_ms']:>8} {g['max_ms']:>6}  "
+                     f"{','.join(g['services'])}: {g['sql'][:sql_width]}")
+    lines.append('')
+    lines.append(f"Likely N+1 ({len(suspects)} burst(s)):")
+    for s in suspects[:top]:
+        lines.append(f"  {s['fingerprint']}  x{s['count']:<5} {s['total_ms']:>6}ms  {s['service']} {s['start']}-{s['end']} "
+                     f"[{s['window']}]  {s['sql'][:sql_width]}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Group EF Core commands by SQL fingerprint and flag likely N+1 bursts.")
+    parser.add_argument('sources', nargs='+', metavar='[SERVICE=]PATH')
+    parser.add_argument('--threshold', type=int, default=5, help="repeats of one fingerprint in a window that count as N+1")
+    parser.add_argument('--gap', type=int, default=1, help="seconds of silence that end a background (non-request) window")
+    parser.add_argument('--top', type=int, default=20, help="rows to show per table")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    ranked, suspects = analyze([parse_source(s) for s in args.sources], args.threshold, args.gap)
+    if args.json:
+        print(json.dumps({'fingerprints': ranked, 'n_plus_one': suspects}, indent=2))
+    else:
+        print(format_report(ranked, suspects, args.top))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,264 @@
+"""Streaming transform mode for very large Postman collections.
+
+Instead of loading the whole collection, ``run_stream`` reads it through an
+incremental tokenizer and walks the ``item`` tree folder by folder. Folder
+objects are never materialised: their ``item`` arrays are streamed element by
+element, and only a single request item (with its example responses) is parsed
+at a time, run through the rules and written out before the next one is read.
+Memory is bounded by the largest single item rather than the file size.
+
+Output uses the same layout as ``json.dump(data, f, indent=2)`` and goes to a
+temp file that replaces the collection only if its content differs. As in
+``SourceDocument``, non-ASCII text is written as is when the collection
+already contains any and escaped otherwise; ``run_stream`` checks with a
+binary pre-scan that stops at the first non-ASCII byte.
+"""
+import copy
+import filecmp
+import json
+import os
+import time
+
+from tools.engine import RunContext
+from tools.index import route_key
+from tools.profile import NULL_PROFILE
+from tools.writer import atomic_open, diff
+
+CHUNK_SIZE = 1 << 16
+SCAN_SIZE = 1 << 20
+
+_WHITESPACE = ' \t\n\r'
+
+
+class JsonStream:
+    """Incremental tokenizer over a text file: values are decoded from a sliding buffer."""
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self, size=None):
+        if self.eof:
+            return False
+        chunk = self.f.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop what has been consumed so the buffer only ever holds the value being decoded
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character without consuming it ('' at end of input)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise json.JSONDecodeError(f"Expecting {char!r}", self.buf, self.pos)
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        # Each failed decode restarts from self.pos, so the read size doubles on every retry:
+        # a value spanning many chunks is decoded O(log n) times instead of once per chunk
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Most likely the value continues in the next chunk
+                if self._fill(size):
+                    size *= 2
+                    continue
+                raise
+            # A number at the very end of the buffer may still have digits to come
+            if end == len(self.buf) and not self.eof and isinstance(value, (int, float)):
+                if self._fill(size):
+                    size *= 2
+                    continue
+            self.pos = end
+            return value
+
+
+class _Emitter:
+    """Writes members of nested containers with json.dump(indent=...) layout."""
+
+    def __init__(self, out, indent, ensure_ascii=True):
+        self.out = out
+        self.indent = ' ' * indent if isinstance(indent, int) else indent
+        self.ensure_ascii = ensure_ascii
+
+    def member(self, level, first):
+        self.out.write(('\n' if first else ',\n') + self.indent * level)
+
+    def close(self, char, level, empty):
+        self.out.write(char if empty else '\n' + self.indent * level + char)
+
+    def key(self, key):
+        self.out.write(json.dumps(key, ensure_ascii=self.ensure_ascii) + ': ')
+
+    def value(self, value, level):
+        rendered = json.dumps(value, indent=self.indent, ensure_ascii=self.ensure_ascii)
+        self.out.write(rendered.replace('\n', '\n' + self.indent * level))
+
+
+def _stream_items(stream, emit, level, visit):
+    # The '[' of an "item" array has been consumed and emitted
+    first = True
+    while stream.peek() != ']':
+        if not first:
+            stream.expect(',')
+        emit.member(level + 1, first)
+        if stream.peek() == '{':
+            _stream_node(stream, emit, level + 1, visit)
+        else:
+            emit.value(stream.value(), level + 1)
+        first = False
+    stream.expect(']')
+    emit.close(']', level, first)
+
+
+def _stream_node(stream, emit, level, visit):
+    """Stream one object from an item array: folders are descended, request items parsed whole."""
+    stream.expect('{')
+    pending = []
+    opened = False
+    first = True
+    while stream.peek() != '}':
+        if pending or not first:
+            stream.expect(',')
+        key = stream.value()
+        stream.expect(':')
+        if key == 'item' and stream.peek() == '[':
+            # A folder: write out what was buffered so far and stream its children
+            if not opened:
+                emit.out.write('{')
+                opened = True
+            for k, v in pending:
+                emit.member(level + 1, first)
+                emit.key(k)
+                emit.value(v, level + 1)
+                first = False
+            pending = []
+            emit.member(level + 1, first)
+            emit.key(key)
+            stream.expect('[')
+            emit.out.write('[')
+            _stream_items(stream, emit, level + 1, visit)
+            first = False
+        elif opened:
+            emit.member(level + 1, first)
+            emit.key(key)
+            emit.value(stream.value(), level + 1)
+            first = False
+        else:
+            pending.append((key, stream.value()))
+    stream.expect('}')
+    if opened:
+        emit.close('}', level, first)
+        return
+    node = dict(pending)
+    if 'request' in node:
+        visit(node)
+    emit.value(node, level)
+
+
+def is_ascii(path):
+    """Whether the file is pure ASCII, read in binary chunks (the in-memory path uses ``text.isascii()``)."""
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(SCAN_SIZE), b''):
+            if not chunk.isascii():
+                return False
+    return True
+
+
+def transform_stream(src, out, rules, ctx, indent=2, chunk_size=CHUNK_SIZE, profile=None, ensure_ascii=True):
+    """Copy the collection from ``src`` to ``out``, applying the rules item by item."""
+    rules = list(rules)
+    ctx.matched = {r.name: 0 for r in rules}
+    stats = {r.name: profile.rule(r) for r in rules} if profile else None
+    bodies = ctx.bodies
+
+    def visit(item):
+        before = None
+        if profile:
+            profile.count('items')
+        for r in rules:
+            if stats is not None:
+                s = stats[r.name]
+                parsed, dirtied = bodies.parsed, bodies.dirtied
+                started = time.perf_counter()
+            selected = r.selects(item)
+            if selected:
+                if before is None:
+                    before = copy.deepcopy(item)
+                r.transform(item, ctx)
+                ctx.matched[r.name] += 1
+            if stats is not None:
+                s.seconds += time.perf_counter() - started
+                s.visited += 1
+                s.matched += selected
+                s.parsed += bodies.parsed - parsed
+                s.dirtied += bodies.dirtied - dirtied
+        # Bodies belong to this item only; write them back and let the item be freed
+        ctx.bodies.release()
+        if before is not None and isinstance(item['request'], dict) and next(diff(before, item), None):
+            ctx.changed.add(route_key(item['request']))
+
+    stream = JsonStream(src, chunk_size)
+    emit = _Emitter(out, indent, ensure_ascii)
+    stream.expect('{')
+    out.write('{')
+    first = True
+    while stream.peek() != '}':
+        if not first:
+            stream.expect(',')
+        key = stream.value()
+        stream.expect(':')
+        emit.member(1, first)
+        emit.key(key)
+        if key == 'item' and stream.peek() == '[':
+            stream.expect('[')
+            out.write('[')
+            _stream_items(stream, emit, 1, visit)
+        else:
+            emit.value(stream.value(), 1)
+        first = False
+    stream.expect('}')
+    emit.close('}', 0, first)
+    if stream.peek() != '':
+        raise json.JSONDecodeError("Extra data", stream.buf, stream.pos)
+
+
+def run_stream(path, *rule_sets, indent=2, chunk_size=CHUNK_SIZE, profile=None):
+    """Streaming counterpart of ``tools.engine.run``; routed rules are matched per item."""
+    profile = profile or NULL_PROFILE
+    rules = [r for rs in rule_sets for r in rs]
+    ctx = RunContext()
+
+    def changed(tmp_path):
+        ctx.written = not filecmp.cmp(tmp_path, path, shallow=False)
+        return ctx.written
+
+    bytes_read = os.path.getsize(path)
+    with profile.phase('stream'):
+        ensure_ascii = is_ascii(path)
+        with open(path, 'r', encoding='utf-8') as src, atomic_open(path, keep=changed) as out:
+            transform_stream(src, out, rules, ctx, indent, chunk_size, profile or None, ensure_ascii)
+    profile.count('bodies_parsed', ctx.bodies.parsed)
+    profile.count('bodies_serialized', ctx.bodies.serialized)
+    profile.count('bytes_read', bytes_read)
+    profile.count('bytes_written', os.path.getsize(path) if ctx.written else 0)
+    return ctx
@@ -0,0 +1,107 @@
+"""Local stub of the Gateway that answers from the collection's example responses.
+
+Incoming requests are resolved against the RouteIndex (method plus templated
+path) and answered with the first example response of the matching item:
+its status code, headers and body. Unknown routes get a 404. An optional
+fixed latency makes the stub usable for calibrating the load generator.
+
+    python -m tools.stub --port 7032 --latency-ms 5
+"""
+import argparse
+import asyncio
+import json
+
+from tools.engine import COLLECTION_PATH, iter_items, load_collection
+from tools.http import encode_message, read_body, read_head
+from tools.index import RouteIndex
+
+REASONS = {200: 'OK', 201: 'Created', 204: 'No Content', 400: 'Bad Request', 404: 'Not Found'}
+
+
+def _example_response(item):
+    for resp in item.get('response') or []:
+        if isinstance(resp, dict):
+            headers = {h['key']: h['value'] for h in resp.get('header', []) if isinstance(h, dict) and 'key' in h}
+            return resp.get('code', 200), resp.get('status') or '', headers, (resp.get('body') or '').encode('utf-8')
+    return 200, 'OK', {'Content-Type': 'application/json'}, b'{}'
+
+
+class StubServer:
+    def __init__(self, collection, latency=0.0):
+        self.index = RouteIndex.build(iter_items(collection))
+        self.latency = latency
+        self.port = None
+        self.served = 0
+        self._server = None
+
+    def respond(self, method, target):
+        entries = self.index.resolve(target, method)
+        if not entries:
+            body = json.dumps({'error': f"No route for {method} {target}"}).encode('utf-8')
+            return 404, 'Not Found', {'Content-Type': 'application/json'}, body
+        return _example_response(entries[0].item)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                start, headers = await read_head(reader)
+                if start is None:
+                    break
+                method, target, _ = start.split(' ', 2)
+                await read_body(reader, headers)
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                status, reason, resp_headers, body = self.respond(method, target)
+                resp_headers = dict(resp_headers)
+                resp_headers['Content-Length'] = str(len(body))
+                close = headers.get('connection', '').lower() == 'close'
+                if close:
+                    resp_headers['Connection'] = 'close'
+                writer.write(encode_message(f"HTTP/1.1 {status} {reason or REASONS.get(status, '')}", resp_headers, body))
+                await writer.drain()
+                self.served += 1
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Server shutdown while the connection sat idle between requests
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=0):
+        self._server = await asyncio.start_server(self.handle, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+
+async def _serve(args):
+    stub = await StubServer(load_collection(args.collection), args.latency_ms / 1000).start(args.host, args.port)
+    print(f"Stub gateway listening on http://{args.host}:{stub.port}")
+    await stub._server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the collection's example responses as a local Gateway stub.")
+    parser.add_argument('--collection', default=COLLECTION_PATH)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7032)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help="fixed delay added to every response")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""One-pass multi-pattern substitution.
+
+A mapping of literal strings to replacements is compiled once into a single
+regex alternation ordered longest-first. Python's regex engine tries the
+alternatives left to right at each position, so every scan position takes the
+longest key that matches there (leftmost-longest), independent of the order
+the mapping was written in. Each file is processed in one linear pass, in
+fixed-size chunks so memory does not grow with the file.
+"""
+import json
+import re
+import string
+
+from tools.writer import atomic_open
+
+CHUNK_SIZE = 1 << 16
+
+
+class Substitution:
+    def __init__(self, mapping):
+        if not mapping or any(not key for key in mapping):
+            raise ValueError("Substitution needs at least one non-empty key")
+        self.mapping = dict(mapping)
+        keys = sorted(self.mapping, key=lambda k: (-len(k), k))
+        self.pattern = re.compile('|'.join(re.escape(k) for k in keys))
+        self.longest = len(keys[0])
+        self.count = 0
+
+    @classmethod
+    def from_config(cls, path):
+        """Load ``{"variables": {...}, "replacements": {...}}``; replacements may use ``${variable}``."""
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        variables = config.get('variables', {})
+        return cls({key: string.Template(value).substitute(variables)
+                    for key, value in config['replacements'].items()})
+
+    def _replace(self, match):
+        self.count += 1
+        return self.mapping[match.group(0)]
+
+    def apply(self, text):
+        return self.pattern.sub(self._replace, text)
+
+    def apply_chunks(self, chunks):
+        """Yield the substituted text of an iterable of chunks; matches may span chunk boundaries."""
+        carry = ''
+        for chunk in chunks:
+            buf = carry + chunk
+            # Anything starting before `safe` has its longest possible match inside buf
+            safe = len(buf) - (self.longest - 1)
+            out = []
+            pos = 0
+            for match in self.pattern.finditer(buf):
+                if match.start() >= safe:
+                    break
+                out.append(buf[pos:match.start()])
+                out.append(self._replace(match))
+                pos = match.end()
+            cut = max(pos, safe)
+            out.append(buf[pos:cut])
+            carry = buf[cut:]
+            yield ''.join(out)
+        if carry:
+            yield self.apply(carry)
+
+
+def substitute_file(path, substitution, chunk_size=CHUNK_SIZE):
+    """Apply the substitution to a file in one streaming pass. Returns the number of replacements.
+
+    The file is rewritten atomically, and only when something was replaced.
+    """
+    before = substitution.count
+    with open(path, 'r', encoding='utf-8') as src, \
+            atomic_open(path, keep=lambda tmp: substitution.count > before) as out:
+        for text in substitution.apply_chunks(iter(lambda: src.read(chunk_size), '')):
+            out.write(text)
+    return substitution.count - before
@@ -0,0 +1,214 @@
+"""Watch mode: keep the collection, README and rules resident and patch incrementally.
+
+A Session holds the parsed collection (source spans plus working data), a
+fingerprint per request item, the README section model and the rule sets.
+When the collection changes on disk only the items whose fingerprint is new
+go through the rules, and only the README sections documenting the routes
+that changed are regenerated. When the README changes, only sections whose
+text changed go through the section rules. The session's own writes are
+recognised by content and ignored.
+
+Files are watched with inotify through ctypes on Linux (the directory is
+watched, so editors that save by rename are seen) and by polling ``stat``
+elsewhere. Bursts of events are debounced before a refresh.
+"""
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import select
+import struct
+import sys
+import time
+
+from tools.engine import apply_rules, changed_routes, iter_items
+from tools.index import route_key
+from tools.readme import ReadmeDocument, apply_sections
+from tools.writer import SourceDocument, diff, write_json, write_text
+
+DEBOUNCE = 0.05
+
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+_EVENT = struct.Struct('iIII')
+
+
+class PollingWatcher:
+    """Portable fallback: compares (mtime, size, inode) of each file every ``interval`` seconds."""
+
+    def __init__(self, paths, interval=0.25):
+        self.paths = [os.path.abspath(p) for p in paths]
+        self.interval = interval
+        self.state = {p: self._stat(p) for p in self.paths}
+
+    @staticmethod
+    def _stat(path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def wait(self, timeout=None):
+        """Block until at least one file changed (or timeout); returns the changed paths."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = set()
+            for path in self.paths:
+                current = self._stat(path)
+                if current != self.state[path]:
+                    self.state[path] = current
+                    changed.add(path)
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+            time.sleep(self.interval)
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify on the files' directories, filtered to the watched names."""
+
+    def __init__(self, paths):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.paths = {}
+        watches = {}
+        for path in paths:
+            directory, name = os.path.split(os.path.abspath(path))
+            if directory not in watches:
+                wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE)
+                if wd < 0:
+                    os.close(self.fd)
+                    raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+                watches[directory] = wd
+            self.paths[(watches[directory], os.fsencode(name))] = os.path.join(directory, name)
+
+    def _read(self):
+        changed = set()
+        data = os.read(self.fd, 65536)
+        pos = 0
+        while pos < len(data):
+            wd, _, _, length = _EVENT.unpack_from(data, pos)
+            name = data[pos + _EVENT.size:pos + _EVENT.size + length].rstrip(b'\0')
+            pos += _EVENT.size + length
+            path = self.paths.get((wd, name))
+            if path:
+                changed.add(path)
+        return changed
+
+    def wait(self, timeout=None):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        return self._read() if readable else set()
+
+    def close(self):
+        os.close(self.fd)
+
+
+def make_watcher(paths, poll=None):
+    """inotify where available, polling otherwise (or when a poll interval is forced)."""
+    if poll is None and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(paths, poll or 0.25)
+
+
+def fingerprint(item):
+    return hashlib.sha1(json.dumps(item, sort_keys=True).encode('utf-8')).digest()
+
+
+def _read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+class Session:
+    """Resident collection, README and rules for one pair of files."""
+
+    def __init__(self, collection_path, readme_path, rule_sets):
+        self.collection_path = collection_path
+        self.readme_path = readme_path
+        self.rules = [r for rs in rule_sets for r in rs]
+        self.section_rules = [r for rs in rule_sets for r in rs.sections]
+        self.collection_text = None
+        self.fingerprints = set()
+        self.readme = None
+
+    def _load_readme(self):
+        text = _read(self.readme_path)
+        if self.readme is None or text != self.readme.text:
+            self.readme = ReadmeDocument.parse(text)
+        return self.readme
+
+    def _write_readme(self, changed):
+        readme = self._load_readme()
+        apply_sections(readme, self.section_rules, changed)
+        text = readme.render()
+        written = write_text(self.readme_path, readme.text, text)
+        if written:
+            self.readme = ReadmeDocument.parse(text)
+        return written
+
+    def refresh_collection(self, full=False):
+        """Re-apply the rules to new or edited items. Returns a summary dict, or None if nothing changed."""
+        text = _read(self.collection_path)
+        if text == self.collection_text and not full:
+            return None
+        source = SourceDocument.parse(text)
+        data = json.loads(source.text)
+        items = list(iter_items(data))
+        edited = items if full else [i for i in items if fingerprint(i) not in self.fingerprints]
+        ctx = apply_rules(data, self.rules, only=edited)
+        changes = list(diff(source.value, data))
+        written = write_json(self.collection_path, source, data, changes=changes)
+        routes = changed_routes(changes, data) | {route_key(i['request']) for i in edited if isinstance(i['request'], dict)}
+        self.collection_text = _read(self.collection_path) if written else text
+        self.fingerprints = {fingerprint(i) for i in items}
+        readme_written = self._write_readme(None if full else routes)
+        return {'items': len(edited), 'matched': {k: v for k, v in ctx.matched.items() if v},
+                'collection_written': written, 'readme_written': readme_written}
+
+    def refresh_readme(self):
+        """Re-apply the section rules to README sections edited on disk."""
+        if self.readme is not None and _read(self.readme_path) == self.readme.text:
+            return None
+        before = {(s.key, s.text) for s in self.readme.sections} if self.readme else set()
+        readme = self._load_readme()
+        edited = {s.key for s in readme.sections if (s.key, s.text) not in before}
+        if not edited:
+            return None
+        return {'sections': len(edited), 'readme_written': self._write_readme(edited)}
+
+
+def serve(session, watcher, log=print):
+    """Refresh the session on every change the watcher reports; runs until interrupted."""
+    started = time.perf_counter()
+    log(f"initial refresh: {session.refresh_collection(full=True)} ({(time.perf_counter() - started) * 1000:.1f} ms)")
+    collection = os.path.abspath(session.collection_path)
+    readme = os.path.abspath(session.readme_path)
+    while True:
+        changed = watcher.wait()
+        # Editors and our own writes arrive as bursts; let them settle before reading
+        while True:
+            more = watcher.wait(DEBOUNCE)
+            if not more:
+                break
+            changed |= more
+        started = time.perf_counter()
+        for path, refresh in ((collection, session.refresh_collection), (readme, session.refresh_readme)):
+            if path in changed:
+                try:
+                    summary = refresh()
+                except (OSError, ValueError) as exc:
+                    # A half-saved file fails to parse; the next save triggers another refresh
+                    log(f"{os.path.basename(path)}: {exc}")
+                    continue
+                if summary:
+                    log(f"{os.path.basename(path)}: {summary} ({(time.perf_counter() - started) * 1000:.1f} ms)")
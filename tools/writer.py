@@ -0,0 +1,260 @@
+"""Format-preserving, atomic writers for the collection and the README.
+
+``SourceDocument`` parses JSON while recording the character span of every
+value. After rules have edited a working copy, ``json_patch`` computes an
+RFC 6902 patch against the original values and ``SourceDocument.splice``
+rewrites only the spans those operations touch: replaced values in place,
+and containers that gained or lost members re-serialised at their original
+indentation. Everything else keeps its original bytes.
+
+Writes go to a temporary file in the target directory and are moved into
+place with ``os.replace``, so an interrupted run never leaves a truncated
+file behind. ``dry_run='patch'`` or ``dry_run='diff'`` returns the JSON Patch
+or unified diff instead of writing.
+"""
+import contextlib
+import difflib
+import json
+import os
+import re
+import tempfile
+from json.decoder import scanstring
+
+DRY_RUN_MODES = ('patch', 'diff')
+
+_WS = re.compile(r'[ \t\n\r]*')
+_INDENT = re.compile(r'[ \t]*')
+_NUMBER = re.compile(r'-?(?:0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?')
+_CONSTANTS = {'true': True, 'false': False, 'null': None}
+
+
+class SourceDocument:
+    def __init__(self, text, value, spans):
+        self.text = text
+        self.value = value
+        self.spans = spans
+        self.ensure_ascii = text.isascii()
+        indented = re.search(r'\n([ \t]+)\S', text)
+        self.indent = indented.group(1) if indented else None
+
+    @classmethod
+    def parse(cls, text):
+        spans = {}
+        end = _WS.match(text, 0).end()
+        value, end = _parse_value(text, end, (), spans)
+        end = _WS.match(text, end).end()
+        if end != len(text):
+            raise json.JSONDecodeError("Extra data", text, end)
+        return cls(text, value, spans)
+
+    def _line_indent(self, pos):
+        line_start = self.text.rfind('\n', 0, pos) + 1
+        return _INDENT.match(self.text, line_start).group(0)
+
+    def _render(self, value, pos):
+        rendered = json.dumps(value, indent=self.indent, ensure_ascii=self.ensure_ascii)
+        if self.indent is None:
+            return rendered
+        return rendered.replace('\n', '\n' + self._line_indent(pos))
+
+    def splice(self, changes, data):
+        """Apply (op, path) changes from ``diff`` to the source text, touching only the affected spans."""
+        rewrite = set()
+        for op, path in changes:
+            # Containers that gained or lost members are re-serialised as a whole
+            rewrite.add(path if op == 'replace' else path[:-1])
+        # Drop edits nested inside a span that is already being rewritten
+        outermost = [p for p in rewrite if not any(p[:i] in rewrite for i in range(len(p)))]
+        edits = []
+        for path in outermost:
+            start, end = self.spans[path]
+            edits.append((start, end, self._render(_resolve(data, path), start)))
+        edits.sort(reverse=True)
+        text = self.text
+        for start, end, rendered in edits:
+            text = text[:start] + rendered + text[end:]
+        return text
+
+
+def _parse_value(text, pos, path, spans):
+    start = pos
+    ch = text[pos:pos + 1]
+    if ch == '{':
+        value = {}
+        pos = _WS.match(text, pos + 1).end()
+        if text[pos:pos + 1] == '}':
+            pos += 1
+        else:
+            while True:
+                if text[pos:pos + 1] != '"':
+                    raise json.JSONDecodeError("Expecting property name enclosed in double quotes", text, pos)
+                key, pos = scanstring(text, pos + 1)
+                pos = _WS.match(text, pos).end()
+                if text[pos:pos + 1] != ':':
+                    raise json.JSONDecodeError("Expecting ':' delimiter", text, pos)
+                pos = _WS.match(text, pos + 1).end()
+                value[key], pos = _parse_value(text, pos, path + (key,), spans)
+                pos = _WS.match(text, pos).end()
+                ch = text[pos:pos + 1]
+                if ch == '}':
+                    pos += 1
+                    break
+                if ch != ',':
+                    raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+                pos = _WS.match(text, pos + 1).end()
+    elif ch == '[':
+        value = []
+        pos = _WS.match(text, pos + 1).end()
+        if text[pos:pos + 1] == ']':
+            pos += 1
+        else:
+            while True:
+                item, pos = _parse_value(text, pos, path + (len(value),), spans)
+                value.append(item)
+                pos = _WS.match(text, pos).end()
+                ch = text[pos:pos + 1]
+                if ch == ']':
+                    pos += 1
+                    break
+                if ch != ',':
+                    raise json.JSONDecodeError("Expecting ',' delimiter", text, pos)
+                pos = _WS.match(text, pos + 1).end()
+    elif ch == '"':
+        value, pos = scanstring(text, pos + 1)
+    else:
+        for literal, constant in _CONSTANTS.items():
+            if text.startswith(literal, pos):
+                value, pos = constant, pos + len(literal)
+                break
+        else:
+            number = _NUMBER.match(text, pos)
+            if not number:
+                raise json.JSONDecodeError("Expecting value", text, pos)
+            frac, exp = number.groups()
+            value = float(number.group(0)) if frac or exp else int(number.group(0))
+            pos = number.end()
+    spans[path] = (start, pos)
+    return value, pos
+
+
+def _resolve(data, path):
+    for key in path:
+        data = data[key]
+    return data
+
+
+def _same(old, new):
+    # Strict leaf comparison: json distinguishes true/1 and 1/1.0 even though Python does not
+    return type(old) is type(new) and old == new
+
+
+def diff(old, new, path=()):
+    """Yield (op, path) changes turning ``old`` into ``new``, in RFC 6902 application order."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                yield 'remove', path + (key,)
+        for key, value in new.items():
+            if key not in old:
+                yield 'add', path + (key,)
+            else:
+                yield from diff(old[key], value, path + (key,))
+    elif isinstance(old, list) and isinstance(new, list):
+        common = min(len(old), len(new))
+        for i in range(common):
+            yield from diff(old[i], new[i], path + (i,))
+        for i in range(len(old) - 1, common - 1, -1):
+            yield 'remove', path + (i,)
+        for i in range(common, len(new)):
+            yield 'add', path + (i,)
+    elif not _same(old, new):
+        yield 'replace', path
+
+
+def pointer(path):
+    return ''.join('/' + str(key).replace('~', '~0').replace('/', '~1') for key in path)
+
+
+def json_patch(changes, data):
+    """RFC 6902 operations for the changes, with values taken from the new document."""
+    ops = []
+    for op, path in changes:
+        entry = {'op': op, 'path': pointer(path)}
+        if op != 'remove':
+            entry['value'] = _resolve(data, path)
+        ops.append(entry)
+    return ops
+
+
+def unified_diff(path, old_text, new_text):
+    name = os.path.basename(path)
+    return ''.join(difflib.unified_diff(
+        old_text.splitlines(keepends=True), new_text.splitlines(keepends=True),
+        fromfile=f"a/{name}", tofile=f"b/{name}"))
+
+
+@contextlib.contextmanager
+def atomic_open(path, encoding='utf-8', keep=None, newline=None, binary=False):
+    """Open a temp file next to ``path`` for writing and move it over ``path`` on success.
+
+    ``keep(tmp_path)`` may veto the replace (e.g. when the output is identical),
+    in which case the temp file is discarded and the original is left alone.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with (os.fdopen(fd, 'wb') if binary else os.fdopen(fd, 'w', encoding=encoding, newline=newline)) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        if keep is not None and not keep(tmp_path):
+            os.remove(tmp_path)
+            return
+        # mkstemp creates the file 0600; keep the permissions of the file being replaced
+        if os.path.exists(path):
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp_path, 0o666 & ~umask)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write(path, text, encoding='utf-8'):
+    with atomic_open(path, encoding) as f:
+        f.write(text)
+
+
+def write_text(path, original_text, new_text, dry_run=None):
+    """Atomically replace the file if the text changed. Returns the unified diff in dry-run mode."""
+    if dry_run not in (None, 'diff'):
+        raise ValueError(f"Unsupported dry-run mode for text files: {dry_run}")
+    if dry_run:
+        return unified_diff(path, original_text, new_text)
+    if new_text != original_text:
+        atomic_write(path, new_text)
+        return True
+    return False
+
+
+def write_json(path, source, data, dry_run=None, changes=None):
+    """Write ``data`` over the document ``source`` was parsed from, splicing only changed spans.
+
+    ``changes`` may pass in an already computed ``diff(source.value, data)``.
+    Returns whether the file changed, or the JSON Patch / unified diff text in dry-run mode.
+    """
+    if dry_run not in (None,) + DRY_RUN_MODES:
+        raise ValueError(f"Unknown dry-run mode: {dry_run}")
+    if changes is None:
+        changes = list(diff(source.value, data))
+    if dry_run == 'patch':
+        return json.dumps(json_patch(changes, data), indent=2)
+    text = source.splice(changes, data) if changes else source.text
+    if changes and json.loads(text) != data:
+        # Safety net: never write a splice that does not round-trip to the edited document
+        text = json.dumps(data, indent=source.indent, ensure_ascii=source.ensure_ascii)
+    return write_text(path, source.text, text, dry_run)
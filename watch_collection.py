@@ -0,0 +1,25 @@
+# Watch mode: keep the collection and README patched as they are edited, re-running only the affected rules.
+import argparse
+
+from refresh_collection import RULE_SETS
+
+from tools.engine import COLLECTION_PATH, README_PATH
+from tools.watch import Session, make_watcher, serve
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-apply the collection and README rules whenever either file changes.")
+    parser.add_argument('--collection', default=COLLECTION_PATH)
+    parser.add_argument('--readme', default=README_PATH)
+    parser.add_argument('--poll', type=float, metavar='SECONDS',
+                        help="poll file stats at this interval instead of using inotify")
+    args = parser.parse_args()
+
+    session = Session(args.collection, args.readme, RULE_SETS)
+    watcher = make_watcher([args.collection, args.readme], args.poll)
+    print(f"Watching {args.collection} and {args.readme} ({type(watcher).__name__})")
+    try:
+        serve(session, watcher)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()